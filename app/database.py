@@ -1,22 +1,128 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.utils.config import settings
+from app.utils.write_queue import WriteQueue
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-connect_args = {"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+# Sync dialect -> the asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme.split("+")[0], scheme) + separator + rest
+
+
+def uses_production_sqlite(url: str, profile: str) -> bool:
+    return url.startswith("sqlite") and profile == "production" and ":memory:" not in url
+
+
+def sqlite_pragmas() -> dict:
+    """Set on every pooled connection in the production profile"""
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_BYTES,
+        "temp_store": "MEMORY",
+    }
+
+
+def _engine_options(url: str, profile: str) -> dict:
+    connect_args = {"check_same_thread": False} if "sqlite" in url else {}
+    if not uses_production_sqlite(url, profile):
+        return {"connect_args": connect_args}
+    return {
+        "connect_args": {**connect_args, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+
+
+def _tune_sqlite(engine: Engine):
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _tune_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_db_engine(url: str, profile: str) -> Engine:
+    engine = create_engine(url, **_engine_options(url, profile))
+    if uses_production_sqlite(url, profile):
+        _tune_sqlite(engine)
+    return engine
+
+
+def create_async_db_engine(url: str, profile: str) -> AsyncEngine:
+    engine = create_async_engine(async_database_url(url), **_engine_options(url, profile))
+    if uses_production_sqlite(url, profile):
+        _tune_sqlite(engine.sync_engine)
+    return engine
+
+
+def create_session_factory(engine: Engine, write_queue: Optional[WriteQueue] = None) -> sessionmaker:
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if write_queue is not None:
+        write_queue.attach(factory)
+    return factory
+
+
+def create_async_session_factory(
+    engine: AsyncEngine, write_queue: Optional[WriteQueue] = None
+) -> async_sessionmaker:
+    # Objects stay loaded after commit: re-reading expired attributes would
+    # need an await, and handlers serialise them right after committing
+    sync_session_class = type("AsyncWriteSession", (Session,), {}) if write_queue is not None else Session
+    if write_queue is not None:
+        write_queue.attach(sync_session_class, asynchronous=True)
+    return async_sessionmaker(
+        engine, autoflush=False, expire_on_commit=False, sync_session_class=sync_session_class
+    )
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, settings.DATABASE_PROFILE)
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL, settings.DATABASE_PROFILE)
+
+# Global single-writer queue (production SQLite only), shared by worker
+# threads on the sync engine and request handlers on the async engine
+_queue_writes = uses_production_sqlite(SQLALCHEMY_DATABASE_URL, settings.DATABASE_PROFILE)
+write_queue = WriteQueue(settings.SQLITE_BUSY_TIMEOUT_MS / 1000) if _queue_writes else None
+
+SessionLocal = create_session_factory(engine, write_queue)
+AsyncSessionLocal = create_async_session_factory(async_engine, write_queue)
 
 Base = declarative_base()
 
+def init_db():
+    """Create missing tables, then migrate existing ones to the current schema"""
+    import app.models  # noqa: F401 - register every table on Base.metadata
+    from app.migrations import upgrade
+    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
+
 def get_db():
+    """Sync session for code running in worker threads"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Async session for request handlers; queries don't block the event loop"""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Schema Migrations - numbered, forward-only changes to a live database
+- create_all() only creates missing tables; columns and indexes added to
+  tables that already exist go through a migration here
+- Applied versions are recorded in schema_migrations, so each runs once and
+  in order, each in its own transaction
+- Steps are idempotent (columns added only when missing, indexes with
+  IF NOT EXISTS): a database just created from the current models passes
+  through them unchanged, and a migration interrupted after some DDL was
+  committed (pysqlite commits DDL eagerly) simply runs again
+- Migrations spell out their own tables and columns instead of reading the
+  models, so they keep meaning the same thing as the models evolve
+- Works on SQLite and Postgres
+"""
+
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, JSON, String, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    def register(fn: Callable[[Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+    return register
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def _add_columns(conn: Connection, table: str, *columns: Column):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    for column in columns:
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+
+def _create_index(conn: Connection, name: str, table: str, *columns: str):
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+# ─── Migrations ───────────────────────────────────────────────────────────────
+
+@migration(1, "nutrition plan and meal columns")
+def _nutrition_columns(conn: Connection):
+    _add_columns(
+        conn, "nutrition_plans",
+        Column("title", String), Column("description", String),
+        Column("target_protein", Float), Column("target_carbs", Float), Column("target_fat", Float),
+        Column("diet_preference", String), Column("plan_data", JSON),
+    )
+    _add_columns(
+        conn, "meals",
+        Column("name", String), Column("description", String), Column("fiber_g", Float),
+        Column("recipe_steps", JSON), Column("prep_time_minutes", Integer), Column("meal_time", String),
+        Column("is_completed", Boolean), Column("completed_at", DateTime),
+    )
+
+
+@migration(2, "composite indexes for hot queries")
+def _hot_query_indexes(conn: Connection):
+    _create_index(conn, "ix_workout_plans_user_id_is_active", "workout_plans", "user_id", "is_active")
+    _create_index(conn, "ix_nutrition_plans_user_id_is_active", "nutrition_plans", "user_id", "is_active")
+    _create_index(conn, "ix_exercises_workout_plan_id_day_of_week", "exercises", "workout_plan_id", "day_of_week")
+    _create_index(conn, "ix_meals_nutrition_plan_id_day_of_week", "meals", "nutrition_plan_id", "day_of_week")
+    _create_index(conn, "ix_progress_records_user_id_record_type_created_at",
+                  "progress_records", "user_id", "record_type", "created_at")
+    _create_index(conn, "ix_chat_sessions_user_id_session_type_is_active_created_at",
+                  "chat_sessions", "user_id", "session_type", "is_active", "created_at")
+    _create_index(conn, "ix_health_assessments_user_id_created_at", "health_assessments", "user_id", "created_at")
+
+
+# ─── Runner ───────────────────────────────────────────────────────────────────
+
+def _applied_versions(engine: Engine) -> set:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def current_version(engine: Engine) -> int:
+    return max(_applied_versions(engine), default=0)
+
+
+def upgrade(engine: Engine) -> List[int]:
+    """Apply every migration not yet recorded; returns the versions applied"""
+    applied = _applied_versions(engine)
+    ran = []
+    for m in MIGRATIONS:
+        if m.version in applied:
+            continue
+        try:
+            with engine.begin() as conn:
+                m.upgrade(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {"v": m.version, "n": m.name, "t": datetime.utcnow()},
+                )
+        except IntegrityError:
+            # Another worker recorded this version first; its transaction did the work
+            continue
+        print(f"🗄️  Applied migration {m.version}: {m.name}")
+        ran.append(m.version)
+    return ran
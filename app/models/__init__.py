@@ -1,4 +1,5 @@
 from app.models.user import User, UserRole, FitnessGoal, WorkoutPreference, DietPreference
 from app.models.workout import WorkoutPlan, Exercise, WorkoutStatus
 from app.models.nutrition import NutritionPlan, Meal
-from app.models.health import HealthAssessment, ProgressRecord, ChatSession
\ No newline at end of file
+from app.models.health import HealthAssessment, ProgressRecord, ChatSession, ChatSummary
+from app.models.job import GenerationJob, JobStatus
\ No newline at end of file
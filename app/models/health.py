@@ -1,9 +1,10 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Float, JSON
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Float, JSON, Index
 from datetime import datetime
 from app.database import Base
 
 class HealthAssessment(Base):
     __tablename__ = "health_assessments"
+    __table_args__ = (Index("ix_health_assessments_user_id_created_at", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -29,6 +30,10 @@ class HealthAssessment(Base):
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_session_type_is_active_created_at",
+              "user_id", "session_type", "is_active", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -38,8 +43,23 @@ class ChatSession(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id"), unique=True, index=True)
+    summary = Column(String, default="")
+    summarized_until = Column(String, nullable=True)  # timestamp of the newest folded message
+    summarized_messages = Column(Integer, default=0)
+    tokens_before = Column(Integer, default=0)
+    tokens_after = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 class ProgressRecord(Base):
     __tablename__ = "progress_records"
+    __table_args__ = (
+        Index("ix_progress_records_user_id_record_type_created_at", "user_id", "record_type", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,28 +1,50 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, JSON, Float
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, JSON, Float, Index
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class NutritionPlan(Base):
     __tablename__ = "nutrition_plans"
+    __table_args__ = (Index("ix_nutrition_plans_user_id_is_active", "user_id", "is_active"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     plan_name = Column(String)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
     target_calories = Column(Integer)
+    target_protein = Column(Float, nullable=True)
+    target_carbs = Column(Float, nullable=True)
+    target_fat = Column(Float, nullable=True)
     diet_type = Column(String)
+    diet_preference = Column(String, nullable=True)
+    plan_data = Column(JSON, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    meals = relationship("Meal", back_populates="nutrition_plan", order_by="Meal.id")
+
 class Meal(Base):
     __tablename__ = "meals"
+    __table_args__ = (Index("ix_meals_nutrition_plan_id_day_of_week", "nutrition_plan_id", "day_of_week"),)
 
     id = Column(Integer, primary_key=True, index=True)
     nutrition_plan_id = Column(Integer, ForeignKey("nutrition_plans.id"))
     day_of_week = Column(String)
     meal_type = Column(String)
     meal_name = Column(String)
+    name = Column(String, nullable=True)
+    description = Column(String, nullable=True)
     calories = Column(Integer)
     protein_g = Column(Float)
     carbs_g = Column(Float)
     fat_g = Column(Float)
-    ingredients = Column(JSON)
\ No newline at end of file
+    fiber_g = Column(Float, nullable=True)
+    ingredients = Column(JSON)
+    recipe_steps = Column(JSON, nullable=True)
+    prep_time_minutes = Column(Integer, nullable=True)
+    meal_time = Column(String, nullable=True)
+    is_completed = Column(Boolean, default=False)
+    completed_at = Column(DateTime, nullable=True)
+
+    nutrition_plan = relationship("NutritionPlan", back_populates="meals")
\ No newline at end of file
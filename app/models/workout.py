@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Float, JSON, Enum as SQLAlchemyEnum
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Float, JSON, Index, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -11,6 +11,7 @@ class WorkoutStatus(str, enum.Enum):
 
 class WorkoutPlan(Base):
     __tablename__ = "workout_plans"
+    __table_args__ = (Index("ix_workout_plans_user_id_is_active", "user_id", "is_active"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -26,10 +27,11 @@ class WorkoutPlan(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    exercises = relationship("Exercise", back_populates="workout_plan")
+    exercises = relationship("Exercise", back_populates="workout_plan", order_by="Exercise.id")
 
 class Exercise(Base):
     __tablename__ = "exercises"
+    __table_args__ = (Index("ix_exercises_workout_plan_id_day_of_week", "workout_plan_id", "day_of_week"),)
 
     id = Column(Integer, primary_key=True, index=True)
     workout_plan_id = Column(Integer, ForeignKey("workout_plans.id"))
@@ -3,19 +3,36 @@ Admin Router
 Admin dashboard, user management, and platform analytics
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_async_db, engine, async_engine, write_queue
 from app.models.user import User, UserRole
 from app.models.workout import WorkoutPlan
 from app.models.nutrition import NutritionPlan
 from app.models.health import HealthAssessment, ProgressRecord, ChatSession
+from app.models.job import GenerationJob
 from app.utils.auth import get_current_active_user, get_password_hash
+from app.utils.config import settings
+from app.services.plan_cache import plan_cache
+from app.services.ai_agent import ai_agent
+from app.services.job_queue import plan_job_queue
+from app.services.chat_memory import chat_memory
+from app.services.llm_scheduler import llm_scheduler
+from app.services.intent_classifier import intent_classifier
+from app.services.faq_index import faq_index
+from app.services.semantic_cache import semantic_cache
+from app.services.llm_metrics import llm_metrics
+from app.services.plan_speculation import plan_speculator
+from app.services.prompt_templates import prompt_stats
+from app.services.plan_variants import plan_variants
 
 router = APIRouter()
 
@@ -44,34 +61,34 @@ class UserUpdateAdmin(BaseModel):
 @router.get("/dashboard")
 async def admin_dashboard(
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Admin dashboard with platform-wide statistics"""
-    total_users = db.query(func.count(User.id)).scalar()
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
-    total_workouts = db.query(func.count(WorkoutPlan.id)).scalar()
-    total_nutrition_plans = db.query(func.count(NutritionPlan.id)).scalar()
-    total_assessments = db.query(func.count(HealthAssessment.id)).scalar()
-    total_progress_records = db.query(func.count(ProgressRecord.id)).scalar()
+    total_users = await db.scalar(select(func.count(User.id)))
+    active_users = await db.scalar(select(func.count(User.id)).filter(User.is_active == True))
+    total_workouts = await db.scalar(select(func.count(WorkoutPlan.id)))
+    total_nutrition_plans = await db.scalar(select(func.count(NutritionPlan.id)))
+    total_assessments = await db.scalar(select(func.count(HealthAssessment.id)))
+    total_progress_records = await db.scalar(select(func.count(ProgressRecord.id)))
 
     # New users in last 7 days
     week_ago = datetime.now() - timedelta(days=7)
-    new_users_week = (
-        db.query(func.count(User.id))
+    new_users_week = await db.scalar(
+        select(func.count(User.id))
         .filter(User.created_at >= week_ago)
-        .scalar()
     )
 
     # Total charity donations
-    total_charity = db.query(func.sum(User.charity_donations)).scalar() or 0.0
+    total_charity = await db.scalar(select(func.sum(User.charity_donations))) or 0.0
 
     # Recent users
     recent_users = (
-        db.query(User)
-        .order_by(User.created_at.desc())
-        .limit(5)
-        .all()
-    )
+        await db.scalars(
+            select(User)
+            .order_by(User.created_at.desc())
+            .limit(5)
+        )
+    ).all()
 
     return {
         "stats": {
@@ -96,10 +113,10 @@ async def list_users(
     per_page: int = Query(default=20, le=100),
     search: Optional[str] = Query(default=None),
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """List all users with pagination"""
-    query = db.query(User)
+    query = select(User)
     if search:
         query = query.filter(
             (User.full_name.ilike(f"%{search}%")) |
@@ -107,16 +124,17 @@ async def list_users(
             (User.username.ilike(f"%{search}%"))
         )
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
     users = (
-        query.order_by(User.created_at.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
-        .all()
-    )
+        await db.scalars(
+            query.order_by(User.created_at.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+    ).all()
 
     return {
-        "users": [_user_detail(u, db) for u in users],
+        "users": [await _user_detail(u, db) for u in users],
         "total": total,
         "page": page,
         "per_page": per_page,
@@ -128,13 +146,13 @@ async def list_users(
 async def get_user_detail(
     user_id: int,
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get detailed info for a specific user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).filter(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"user": _user_detail(user, db)}
+    return {"user": await _user_detail(user, db)}
 
 
 @router.put("/users/{user_id}")
@@ -142,10 +160,10 @@ async def update_user(
     user_id: int,
     data: UserUpdateAdmin,
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a user's admin-level fields"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).filter(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -159,7 +177,7 @@ async def update_user(
     if data.fitness_level is not None:
         user.fitness_level = data.fitness_level
 
-    db.commit()
+    await db.commit()
     return {"success": True, "message": "User updated", "user": _user_summary(user)}
 
 
@@ -167,17 +185,17 @@ async def update_user(
 async def delete_user(
     user_id: int,
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Permanently delete a user (hard delete)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).filter(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if user.id == admin.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     return {"success": True, "message": f"User {user.username} deleted permanently"}
 
 
@@ -186,25 +204,27 @@ async def delete_user(
 @router.get("/analytics/workouts")
 async def workout_analytics(
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Platform-wide workout analytics"""
-    total_plans = db.query(func.count(WorkoutPlan.id)).scalar()
-    active_plans = db.query(func.count(WorkoutPlan.id)).filter(WorkoutPlan.is_active == True).scalar()
+    total_plans = await db.scalar(select(func.count(WorkoutPlan.id)))
+    active_plans = await db.scalar(select(func.count(WorkoutPlan.id)).filter(WorkoutPlan.is_active == True))
 
     # Top fitness goals
     goal_distribution = (
-        db.query(User.fitness_goal, func.count(User.id))
-        .group_by(User.fitness_goal)
-        .all()
-    )
+        await db.execute(
+            select(User.fitness_goal, func.count(User.id))
+            .group_by(User.fitness_goal)
+        )
+    ).all()
 
     # Top workout preferences
     pref_distribution = (
-        db.query(User.workout_preference, func.count(User.id))
-        .group_by(User.workout_preference)
-        .all()
-    )
+        await db.execute(
+            select(User.workout_preference, func.count(User.id))
+            .group_by(User.workout_preference)
+        )
+    ).all()
 
     return {
         "total_workout_plans": total_plans,
@@ -217,18 +237,18 @@ async def workout_analytics(
 @router.get("/analytics/charity")
 async def charity_analytics(
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Charity donation statistics"""
-    total = db.query(func.sum(User.charity_donations)).scalar() or 0.0
-    max_donor = (
-        db.query(User)
+    total = await db.scalar(select(func.sum(User.charity_donations))) or 0.0
+    max_donor = await db.scalar(
+        select(User)
         .order_by(User.charity_donations.desc())
-        .first()
+        .limit(1)
     )
 
     # Level distribution
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     levels = {"Bronze": 0, "Silver": 0, "Gold": 0, "Platinum": 0}
     for u in users:
         d = u.charity_donations or 0
@@ -249,14 +269,161 @@ async def charity_analytics(
     }
 
 
+@router.get("/analytics/plan-cache")
+async def plan_cache_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Hit/miss counters and size of the generated-plan cache"""
+    return {"plan_cache": await asyncio.to_thread(plan_cache.get_stats)}
+
+
+@router.get("/analytics/llm-coalescing")
+async def llm_coalescing_analytics(
+    admin: User = Depends(require_admin),
+):
+    """How many LLM callers were served by an already in-flight identical call"""
+    return {"single_flight": ai_agent.single_flight.get_stats()}
+
+
+@router.get("/analytics/llm-scheduler")
+async def llm_scheduler_analytics(
+    admin: User = Depends(require_admin),
+):
+    """LLM admission control: queue depth, rate-limit buckets and circuit breaker state"""
+    return {"llm_scheduler": llm_scheduler.get_stats()}
+
+
+@router.get("/analytics/llm-metrics")
+async def llm_metrics_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Per-method latency percentiles, token spend, JSON parse, cache and fallback counts"""
+    return {"llm_metrics": llm_metrics.get_stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(
+    admin: User = Depends(require_admin),
+):
+    """The same agent metrics in Prometheus text exposition format"""
+    return PlainTextResponse(llm_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/analytics/plan-speculation")
+async def plan_speculation_analytics(
+    admin: User = Depends(require_admin),
+):
+    """How often plans started at assessment time were used, still in flight, or thrown away"""
+    return {"plan_speculation": plan_speculator.get_stats()}
+
+
+@router.get("/analytics/intents")
+async def intent_analytics(
+    admin: User = Depends(require_admin),
+):
+    """How many chat messages were answered locally instead of by the LLM"""
+    return {"intent_classifier": intent_classifier.get_stats()}
+
+
+@router.get("/analytics/faq")
+async def faq_analytics(
+    admin: User = Depends(require_admin),
+):
+    """FAQ index hit rate and the LLM time it saved"""
+    return {"faq_index": faq_index.get_stats(llm_scheduler.interactive_latency)}
+
+
+@router.get("/analytics/prompts")
+async def prompt_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Renders and estimated prompt tokens (static prefix vs per-user part) per template version"""
+    return {"prompts": prompt_stats.get_stats()}
+
+
+@router.get("/analytics/plan-variants")
+async def plan_variant_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Precomputed engine plan variants and how often fallbacks were served from them"""
+    return {"plan_variants": plan_variants.get_stats()}
+
+
+@router.get("/analytics/database")
+async def database_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Engine profile, connection pools and the shared single-writer queue state"""
+    return {"database": {
+        "profile": settings.DATABASE_PROFILE,
+        "dialect": engine.dialect.name,
+        "async_driver": async_engine.dialect.driver,
+        "pool": engine.pool.status(),
+        "async_pool": async_engine.pool.status(),
+        "write_queue": write_queue.get_stats() if write_queue else None,
+    }}
+
+
+@router.get("/analytics/semantic-cache")
+async def semantic_cache_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Hit rate, size and lookup latency of the semantic chat cache"""
+    return {"semantic_cache": semantic_cache.get_stats()}
+
+
+@router.get("/analytics/chat-memory")
+async def chat_memory_analytics(
+    admin: User = Depends(require_admin),
+):
+    """Prompt tokens before and after conversation compaction"""
+    return {"chat_memory": chat_memory.get_stats()}
+
+
+@router.get("/analytics/plan-jobs")
+async def plan_job_analytics(
+    admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Background plan generation queue depth and job status counts"""
+    by_status = (
+        await db.execute(
+            select(GenerationJob.status, func.count(GenerationJob.id))
+            .group_by(GenerationJob.status)
+        )
+    ).all()
+    return {
+        **plan_job_queue.get_stats(),
+        "jobs_by_status": {s.value if s else "unknown": c for s, c in by_status},
+    }
+
+
+@router.delete("/plan-cache")
+async def clear_plan_cache(
+    admin: User = Depends(require_admin),
+):
+    """Drop every cached plan (both memory and persistent tiers)"""
+    await asyncio.to_thread(plan_cache.clear)
+    return {"success": True, "message": "Plan cache cleared"}
+
+
+@router.delete("/semantic-cache")
+async def clear_semantic_cache(
+    admin: User = Depends(require_admin),
+):
+    """Drop every cached chat answer"""
+    semantic_cache.clear()
+    return {"success": True, "message": "Semantic cache cleared"}
+
+
 @router.post("/broadcast-message")
 async def broadcast_message(
     message: str,
     admin: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Placeholder: broadcast a system message to all users"""
-    user_count = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
+    user_count = await db.scalar(select(func.count(User.id)).filter(User.is_active == True))
     return {
         "success": True,
         "message": f"Message queued for {user_count} active users",
@@ -280,10 +447,10 @@ def _user_summary(u: User) -> dict:
     }
 
 
-def _user_detail(u: User, db: Session) -> dict:
-    workout_count = db.query(func.count(WorkoutPlan.id)).filter(WorkoutPlan.user_id == u.id).scalar()
-    nutrition_count = db.query(func.count(NutritionPlan.id)).filter(NutritionPlan.user_id == u.id).scalar()
-    progress_count = db.query(func.count(ProgressRecord.id)).filter(ProgressRecord.user_id == u.id).scalar()
+async def _user_detail(u: User, db: AsyncSession) -> dict:
+    workout_count = await db.scalar(select(func.count(WorkoutPlan.id)).filter(WorkoutPlan.user_id == u.id))
+    nutrition_count = await db.scalar(select(func.count(NutritionPlan.id)).filter(NutritionPlan.user_id == u.id))
+    progress_count = await db.scalar(select(func.count(ProgressRecord.id)).filter(ProgressRecord.user_id == u.id))
 
     return {
         **_user_summary(u),
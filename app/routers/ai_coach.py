@@ -3,17 +3,22 @@ AI Fitness Coach Router
 Chat-based AI coaching powered by Groq LLaMA-3.3-70B
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from starlette.background import BackgroundTask
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.health import ChatSession
 from app.utils.auth import get_current_active_user
 from app.services.ai_agent import ai_agent
+from app.services.chat_memory import chat_memory
+from app.services.intent_classifier import intent_classifier
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter()
 
@@ -36,101 +41,99 @@ class ChatResponse(BaseModel):
 @router.post("/chat")
 async def chat_with_coach(
     request: ChatMessage,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Send a message to the AI Fitness Coach"""
+    session = await _get_or_create_session(db, current_user, request.session_id)
 
-    # Get or create session
-    session = None
-    if request.session_id:
-        session = (
-            db.query(ChatSession)
-            .filter(
-                ChatSession.id == request.session_id,
-                ChatSession.user_id == current_user.id,
-                ChatSession.session_type == "ai_coach",
-            )
-            .first()
-        )
-
-    if not session:
-        session = ChatSession(
-            user_id=current_user.id,
-            session_type="ai_coach",
-            messages=[],
-            is_active=True,
-        )
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-
-    # Build conversation history
-    history = session.messages or []
-
-    # Build user context
-    user_context = {
-        "name": current_user.full_name,
-        "age": current_user.age,
-        "gender": current_user.gender,
-        "height": current_user.height,
-        "weight": current_user.weight,
-        "fitness_level": current_user.fitness_level,
-        "fitness_goal": current_user.fitness_goal.value if current_user.fitness_goal else "maintenance",
-        "workout_preference": current_user.workout_preference.value if current_user.workout_preference else "home",
-        "diet_preference": current_user.diet_preference.value if current_user.diet_preference else "vegetarian",
-        "total_workouts": current_user.total_workouts,
-        "streak_points": current_user.streak_points,
-    }
+    # Running summary + the recent turns that fit the token budget
+    memory = await db.run_sync(chat_memory.build_context, session)
+    user_context = _build_user_context(current_user)
 
     # Generate AI response
     try:
-        ai_response = ai_agent.coach_chat(
+        ai_response = await ai_agent.coach_chat_async(
             message=request.message,
             user_data=user_context,
-            conversation_history=history,
+            conversation_history=memory.recent,
+            summary=memory.summary,
         )
     except Exception as e:
         ai_response = _fallback_coach_response(request.message, user_context)
 
-    timestamp = datetime.now().isoformat()
-
-    # Append messages to session
-    messages = list(history)
-    messages.append({"role": "user", "content": request.message, "timestamp": timestamp})
-    messages.append({"role": "assistant", "content": ai_response, "timestamp": timestamp})
-
-    # Keep only last 20 messages to avoid DB bloat
-    if len(messages) > 20:
-        messages = messages[-20:]
-
-    session.messages = messages
-    session.updated_at = datetime.now()
-    db.commit()
+    timestamp = await _save_exchange(db, session, request.message, ai_response, memory.summarized_until)
+    background_tasks.add_task(chat_memory.refresh_summary, session.id)
 
     return {
         "response": ai_response,
         "session_id": session.id,
         "timestamp": timestamp,
+        "memory": memory.token_report(),
     }
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_coach(
+    request: ChatMessage,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream the AI Fitness Coach reply as Server-Sent Events"""
+    session = await _get_or_create_session(db, current_user, request.session_id)
+    session_id = session.id
+    memory = await db.run_sync(chat_memory.build_context, session)
+    user_context = _build_user_context(current_user)
+
+    async def event_stream():
+        yield sse_event("start", {"session_id": session_id, "memory": memory.token_report()})
+        chunks = []
+        try:
+            async for token in ai_agent.stream_chat_with_coach(
+                message=request.message,
+                user_data=user_context,
+                conversation_history=memory.recent,
+                summary=memory.summary,
+            ):
+                chunks.append(token)
+                yield sse_event("token", {"token": token})
+        except Exception as e:
+            print(f"AI coach stream error: {e}")
+        if not chunks:
+            fallback = _fallback_coach_response(request.message, user_context)
+            chunks.append(fallback)
+            yield sse_event("token", {"token": fallback})
+
+        # The request-scoped session may already be closed once streaming
+        # starts, so the finished reply is persisted through a fresh one.
+        async with AsyncSessionLocal() as stream_db:
+            stream_session = await stream_db.scalar(select(ChatSession).filter(ChatSession.id == session_id))
+            timestamp = await _save_exchange(
+                stream_db, stream_session, request.message, "".join(chunks), memory.summarized_until
+            )
+        yield sse_event("done", {"session_id": session_id, "timestamp": timestamp})
+
+    return sse_response(event_stream(), background=BackgroundTask(chat_memory.refresh_summary, session_id))
+
+
 @router.get("/sessions")
 async def get_chat_sessions(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all AI coach chat sessions"""
     sessions = (
-        db.query(ChatSession)
-        .filter(
-            ChatSession.user_id == current_user.id,
-            ChatSession.session_type == "ai_coach",
+        await db.scalars(
+            select(ChatSession)
+            .filter(
+                ChatSession.user_id == current_user.id,
+                ChatSession.session_type == "ai_coach",
+            )
+            .order_by(ChatSession.created_at.desc())
+            .limit(10)
         )
-        .order_by(ChatSession.created_at.desc())
-        .limit(10)
-        .all()
-    )
+    ).all()
     return {
         "sessions": [
             {
@@ -150,16 +153,15 @@ async def get_chat_sessions(
 async def get_session_messages(
     session_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get messages for a specific session"""
-    session = (
-        db.query(ChatSession)
+    session = await db.scalar(
+        select(ChatSession)
         .filter(
             ChatSession.id == session_id,
             ChatSession.user_id == current_user.id,
         )
-        .first()
     )
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -169,15 +171,15 @@ async def get_session_messages(
 @router.post("/new-session")
 async def start_new_session(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Start a fresh coaching session"""
     # Deactivate old sessions
-    db.query(ChatSession).filter(
+    await db.execute(update(ChatSession).filter(
         ChatSession.user_id == current_user.id,
         ChatSession.session_type == "ai_coach",
         ChatSession.is_active == True,
-    ).update({"is_active": False})
+    ).values({"is_active": False}))
 
     session = ChatSession(
         user_id=current_user.id,
@@ -186,8 +188,8 @@ async def start_new_session(
         is_active=True,
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
 
     greeting = (
         f"Hi {current_user.full_name.split()[0]}! 👋 I'm your AI fitness coach. "
@@ -197,20 +199,80 @@ async def start_new_session(
     return {"session_id": session.id, "greeting": greeting}
 
 
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+async def _get_or_create_session(db: AsyncSession, user: User, session_id: Optional[int]) -> ChatSession:
+    session = None
+    if session_id:
+        session = await db.scalar(
+            select(ChatSession)
+            .filter(
+                ChatSession.id == session_id,
+                ChatSession.user_id == user.id,
+                ChatSession.session_type == "ai_coach",
+            )
+        )
+
+    if not session:
+        session = ChatSession(
+            user_id=user.id,
+            session_type="ai_coach",
+            messages=[],
+            is_active=True,
+        )
+        db.add(session)
+        await db.commit()
+        await db.refresh(session)
+    return session
+
+
+def _build_user_context(user: User) -> dict:
+    return {
+        "name": user.full_name,
+        "age": user.age,
+        "gender": user.gender,
+        "height": user.height,
+        "weight": user.weight,
+        "fitness_level": user.fitness_level,
+        "fitness_goal": user.fitness_goal.value if user.fitness_goal else "maintenance",
+        "workout_preference": user.workout_preference.value if user.workout_preference else "home",
+        "diet_preference": user.diet_preference.value if user.diet_preference else "vegetarian",
+        "total_workouts": user.total_workouts,
+        "streak_points": user.streak_points,
+    }
+
+
+async def _save_exchange(
+    db: AsyncSession, session: ChatSession, message: str, ai_response: str, summarized_until: Optional[str]
+) -> str:
+    timestamp = datetime.now().isoformat()
+
+    # Append messages to session
+    messages = list(session.messages or [])
+    messages.append({"role": "user", "content": message, "timestamp": timestamp})
+    messages.append({"role": "assistant", "content": ai_response, "timestamp": timestamp})
+
+    # Bound the stored history, keeping anything the summary has not folded in yet
+    session.messages = chat_memory.trim(messages, summarized_until)
+    session.updated_at = datetime.now()
+    await db.commit()
+    return timestamp
+
+
 # ─── Fallback ─────────────────────────────────────────────────────────────────
 
 def _fallback_coach_response(message: str, user_data: dict) -> str:
-    msg = message.lower()
+    intent = intent_classifier.top_intent(message, ("travel", "nutrition", "morning_routine", "muscle_gain"))
     name = (user_data.get("name") or "Friend").split()[0]
 
-    if any(w in msg for w in ["travel", "trip", "hotel"]):
+    if intent == "travel":
         return (
             f"🌍 No worries {name}! Here's your travel workout:\n\n"
             "• Bodyweight squats (3×20)\n• Push-ups (3×15)\n"
             "• Lunges (3×12 each leg)\n• Plank holds (3×45s)\n\n"
             "No equipment needed! Stay hydrated and get 7-8 hours of sleep. 💪"
         )
-    if any(w in msg for w in ["calori", "nutri", "eat", "diet", "food"]):
+    if intent == "nutrition":
         return (
             "🥗 Based on your profile I recommend 1800-2000 calories daily:\n\n"
             "• Protein: 120-150g (chicken, fish, dal, paneer)\n"
@@ -218,7 +280,7 @@ def _fallback_coach_response(message: str, user_data: dict) -> str:
             "• Fats: 50-70g (nuts, olive oil)\n\n"
             "Drink 2.5-3 litres of water daily! 💧"
         )
-    if any(w in msg for w in ["morning", "routine", "wake"]):
+    if intent == "morning_routine":
         return (
             "🌅 Perfect morning routine:\n\n"
             "6:00 AM – Wake up & drink 500ml water\n"
@@ -228,7 +290,7 @@ def _fallback_coach_response(message: str, user_data: dict) -> str:
             "7:00 AM – Healthy breakfast\n\n"
             "Consistency is key! Start tomorrow! ✨"
         )
-    if any(w in msg for w in ["muscle", "gain", "bulk"]):
+    if intent == "muscle_gain":
         return (
             "💪 For muscle gain:\n\n"
             "• Caloric surplus: +300-500 cal/day\n"
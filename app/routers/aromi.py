@@ -4,18 +4,21 @@ Real-time adaptive health coaching with plan adjustments
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.health import ChatSession
 from app.models.workout import WorkoutPlan
 from app.models.nutrition import NutritionPlan
 from app.utils.auth import get_current_active_user
 from app.services.ai_agent import ai_agent
+from app.services.intent_classifier import intent_classifier
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter()
 
@@ -43,75 +46,16 @@ class DynamicPlanAdjustmentRequest(BaseModel):
 async def aromi_coach_chat(
     request: ArogyaCoachMessage,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Chat with AROMI - the adaptive AI health companion"""
-
-    # Fetch active plans for context
-    active_workout = (
-        db.query(WorkoutPlan)
-        .filter(WorkoutPlan.user_id == current_user.id, WorkoutPlan.is_active == True)
-        .first()
-    )
-    active_nutrition = (
-        db.query(NutritionPlan)
-        .filter(NutritionPlan.user_id == current_user.id, NutritionPlan.is_active == True)
-        .first()
-    )
-
-    # Get or create AROMI session
-    session = None
-    if request.session_id:
-        session = (
-            db.query(ChatSession)
-            .filter(
-                ChatSession.id == request.session_id,
-                ChatSession.user_id == current_user.id,
-                ChatSession.session_type == "aromi",
-            )
-            .first()
-        )
-
-    if not session:
-        session = ChatSession(
-            user_id=current_user.id,
-            session_type="aromi",
-            messages=[],
-            is_active=True,
-        )
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-
+    session = await _get_or_create_session(db, current_user, request.session_id)
     history = session.messages or []
-
-    user_context = {
-        "name": current_user.full_name,
-        "age": current_user.age,
-        "gender": current_user.gender,
-        "height": current_user.height,
-        "weight": current_user.weight,
-        "fitness_level": current_user.fitness_level,
-        "fitness_goal": current_user.fitness_goal.value if current_user.fitness_goal else "maintenance",
-        "diet_preference": current_user.diet_preference.value if current_user.diet_preference else "vegetarian",
-        "total_workouts": current_user.total_workouts,
-        "streak_points": current_user.streak_points,
-        "user_status": request.user_status,
-        "has_workout_plan": active_workout is not None,
-        "has_nutrition_plan": active_nutrition is not None,
-    }
-
-    if active_workout:
-        user_context["workout_plan_name"] = active_workout.plan_name
-        user_context["workout_goal"] = active_workout.fitness_goal
-
-    if active_nutrition:
-        user_context["nutrition_target_calories"] = active_nutrition.target_calories
-        user_context["nutrition_diet_type"] = active_nutrition.diet_type
+    user_context = await _build_user_context(db, current_user, request.user_status)
 
     # Generate AROMI response
     try:
-        aromi_response = ai_agent.aromi_chat(
+        aromi_response = await ai_agent.aromi_chat_async(
             message=request.message,
             user_data=user_context,
             conversation_history=history,
@@ -120,18 +64,7 @@ async def aromi_coach_chat(
     except Exception as e:
         aromi_response = _fallback_aromi_response(request.message, user_context)
 
-    timestamp = datetime.now().isoformat()
-
-    # Save to session
-    messages = list(history)
-    messages.append({"role": "user", "content": request.message, "timestamp": timestamp})
-    messages.append({"role": "aromi", "content": aromi_response, "timestamp": timestamp})
-    if len(messages) > 30:
-        messages = messages[-30:]
-
-    session.messages = messages
-    session.updated_at = datetime.now()
-    db.commit()
+    timestamp = await _save_exchange(db, session, request.message, aromi_response)
 
     return {
         "response": aromi_response,
@@ -142,6 +75,52 @@ async def aromi_coach_chat(
     }
 
 
+@router.post("/aromi-chat/stream")
+async def stream_aromi_coach_chat(
+    request: ArogyaCoachMessage,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream the AROMI reply as Server-Sent Events"""
+    session = await _get_or_create_session(db, current_user, request.session_id)
+    session_id = session.id
+    history = session.messages or []
+    user_context = await _build_user_context(db, current_user, request.user_status)
+
+    async def event_stream():
+        yield sse_event("start", {"session_id": session_id, "user_status": request.user_status})
+        chunks = []
+        try:
+            async for token in ai_agent.stream_chat_with_aromi(
+                message=request.message,
+                user_data=user_context,
+                conversation_history=history,
+                user_status=request.user_status,
+            ):
+                chunks.append(token)
+                yield sse_event("token", {"token": token})
+        except Exception as e:
+            print(f"AROMI stream error: {e}")
+        if not chunks:
+            fallback = _fallback_aromi_response(request.message, user_context)
+            chunks.append(fallback)
+            yield sse_event("token", {"token": fallback})
+
+        # The request-scoped session may already be closed once streaming
+        # starts, so the finished reply is persisted through a fresh one.
+        async with AsyncSessionLocal() as stream_db:
+            stream_session = await stream_db.scalar(select(ChatSession).filter(ChatSession.id == session_id))
+            timestamp = await _save_exchange(stream_db, stream_session, request.message, "".join(chunks))
+        yield sse_event("done", {
+            "session_id": session_id,
+            "timestamp": timestamp,
+            "user_status": request.user_status,
+            "plan_adjusted": False,
+        })
+
+    return sse_response(event_stream())
+
+
 @router.post("/adjust-plan")
 async def adjust_plan_dynamically(
     request: DynamicPlanAdjustmentRequest,
@@ -149,7 +128,7 @@ async def adjust_plan_dynamically(
 ):
     """Dynamically adjust workout/nutrition plan based on user situation"""
     try:
-        adjustment = ai_agent.adjust_plan_dynamically(
+        adjustment = await ai_agent.adjust_plan_dynamically_async(
             reason=request.reason,
             duration_days=request.duration_days,
             current_plan=request.current_plan,
@@ -167,18 +146,17 @@ async def adjust_plan_dynamically(
 @router.get("/session")
 async def get_aromi_session(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get or create the active AROMI session"""
-    session = (
-        db.query(ChatSession)
+    session = await db.scalar(
+        select(ChatSession)
         .filter(
             ChatSession.user_id == current_user.id,
             ChatSession.session_type == "aromi",
             ChatSession.is_active == True,
         )
         .order_by(ChatSession.created_at.desc())
-        .first()
     )
 
     if not session:
@@ -189,8 +167,8 @@ async def get_aromi_session(
             is_active=True,
         )
         db.add(session)
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        await db.refresh(session)
 
     first_name = current_user.full_name.split()[0] if current_user.full_name else "Friend"
     greeting = (
@@ -211,31 +189,111 @@ async def get_aromi_session(
 @router.delete("/session/clear")
 async def clear_aromi_session(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Clear AROMI chat history"""
-    session = (
-        db.query(ChatSession)
+    session = await db.scalar(
+        select(ChatSession)
         .filter(
             ChatSession.user_id == current_user.id,
             ChatSession.session_type == "aromi",
             ChatSession.is_active == True,
         )
-        .first()
     )
     if session:
         session.messages = []
-        db.commit()
+        await db.commit()
     return {"success": True, "message": "AROMI session cleared"}
 
 
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+async def _get_or_create_session(db: AsyncSession, user: User, session_id: Optional[int]) -> ChatSession:
+    session = None
+    if session_id:
+        session = await db.scalar(
+            select(ChatSession)
+            .filter(
+                ChatSession.id == session_id,
+                ChatSession.user_id == user.id,
+                ChatSession.session_type == "aromi",
+            )
+        )
+
+    if not session:
+        session = ChatSession(
+            user_id=user.id,
+            session_type="aromi",
+            messages=[],
+            is_active=True,
+        )
+        db.add(session)
+        await db.commit()
+        await db.refresh(session)
+    return session
+
+
+async def _build_user_context(db: AsyncSession, user: User, user_status: Optional[str]) -> dict:
+    # Fetch active plans for context
+    active_workout = await db.scalar(
+        select(WorkoutPlan)
+        .filter(WorkoutPlan.user_id == user.id, WorkoutPlan.is_active == True)
+    )
+    active_nutrition = await db.scalar(
+        select(NutritionPlan)
+        .filter(NutritionPlan.user_id == user.id, NutritionPlan.is_active == True)
+    )
+
+    user_context = {
+        "name": user.full_name,
+        "age": user.age,
+        "gender": user.gender,
+        "height": user.height,
+        "weight": user.weight,
+        "fitness_level": user.fitness_level,
+        "fitness_goal": user.fitness_goal.value if user.fitness_goal else "maintenance",
+        "diet_preference": user.diet_preference.value if user.diet_preference else "vegetarian",
+        "total_workouts": user.total_workouts,
+        "streak_points": user.streak_points,
+        "user_status": user_status,
+        "has_workout_plan": active_workout is not None,
+        "has_nutrition_plan": active_nutrition is not None,
+    }
+
+    if active_workout:
+        user_context["workout_plan_name"] = active_workout.plan_name
+        user_context["workout_goal"] = active_workout.fitness_goal
+
+    if active_nutrition:
+        user_context["nutrition_target_calories"] = active_nutrition.target_calories
+        user_context["nutrition_diet_type"] = active_nutrition.diet_type
+
+    return user_context
+
+
+async def _save_exchange(db: AsyncSession, session: ChatSession, message: str, aromi_response: str) -> str:
+    timestamp = datetime.now().isoformat()
+
+    # Save to session
+    messages = list(session.messages or [])
+    messages.append({"role": "user", "content": message, "timestamp": timestamp})
+    messages.append({"role": "aromi", "content": aromi_response, "timestamp": timestamp})
+    if len(messages) > 30:
+        messages = messages[-30:]
+
+    session.messages = messages
+    session.updated_at = datetime.now()
+    await db.commit()
+    return timestamp
+
+
 # ─── Fallbacks ────────────────────────────────────────────────────────────────
 
 def _fallback_aromi_response(message: str, user_data: dict) -> str:
-    msg = message.lower()
+    intent = intent_classifier.top_intent(message, ("snack", "travel", "fatigue", "motivation"))
     name = (user_data.get("name") or "Friend").split()[0]
 
-    if any(w in msg for w in ["snack", "snacks"]):
+    if intent == "snack":
         return (
             f"🍎 Hey there, {name}! 😊 I've got some delicious and healthy snack ideas for you:\n\n"
             "• Roasted Makhana (150 cal)\n"
@@ -244,7 +302,7 @@ def _fallback_aromi_response(message: str, user_data: dict) -> str:
             "• Fresh Fruit Salad (100 cal)\n\n"
             "These align perfectly with your Indian nutrition plan! 🌿"
         )
-    if any(w in msg for w in ["travel", "trip", "traveling"]):
+    if intent == "travel":
         return (
             f"✈️ Don't worry about your fitness while traveling, {name}! I'll adjust your plan:\n\n"
             "• Replace gym workouts with hotel room exercises\n"
@@ -253,14 +311,14 @@ def _fallback_aromi_response(message: str, user_data: dict) -> str:
             "• Stay hydrated - drink 3L water daily\n"
             "• Look for local healthy food options 🍱"
         )
-    if any(w in msg for w in ["tired", "rest", "exhausted", "fatigue"]):
+    if intent == "fatigue":
         return (
             f"😴 Listen to your body, {name}! Rest is crucial for fitness gains. "
             "Take today easy - a light walk or stretching is perfect. "
             "Your muscles need recovery time to grow stronger. "
             "Tomorrow you'll be recharged! 💪"
         )
-    if any(w in msg for w in ["motivat", "inspire", "encouragement"]):
+    if intent == "motivation":
         return (
             f"🔥 You've got this, {name}! Every workout brings you closer to your goals. "
             f"You've completed {user_data.get('total_workouts', 0)} workouts already - "
@@ -4,12 +4,13 @@ Authentication Router - Login, Registration, Google OAuth
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User, FitnessGoal, WorkoutPreference, DietPreference
 from app.utils.auth import verify_password, get_password_hash, create_access_token, get_current_active_user
 from app.utils.config import settings
@@ -70,12 +71,12 @@ class UserResponse(BaseModel):
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).filter(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -99,8 +100,8 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         diet_preference=user_data.diet_preference,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Generate token
     access_token = create_access_token(data={"sub": new_user.username})
@@ -132,16 +133,16 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login with username/email and password"""
     # Find user by username or email
     user = None
     if user_data.username:
-        user = db.query(User).filter(
+        user = await db.scalar(select(User).filter(
             (User.username == user_data.username) | (User.email == user_data.username)
-        ).first()
+        ))
     elif user_data.email:
-        user = db.query(User).filter(User.email == user_data.email).first()
+        user = await db.scalar(select(User).filter(User.email == user_data.email))
 
     if not user or not verify_password(user_data.password, user.hashed_password):
         raise HTTPException(
@@ -182,11 +183,11 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/login/form")
-async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """OAuth2 compatible login for Swagger UI"""
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).filter(
         (User.username == form_data.username) | (User.email == form_data.username)
-    ).first()
+    ))
 
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -248,7 +249,7 @@ async def google_oauth_init():
 
 
 @router.get("/google/callback")
-async def google_oauth_callback(code: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+async def google_oauth_callback(code: str, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_active_user)):
     """Handle Google OAuth callback"""
     import json
     from google_auth_oauthlib.flow import Flow
@@ -278,6 +279,6 @@ async def google_oauth_callback(code: str, db: Session = Depends(get_db), curren
 
     current_user.google_calendar_token = json.dumps(token_data)
     current_user.google_calendar_connected = True
-    db.commit()
+    await db.commit()
 
     return {"message": "Google Calendar connected successfully"}
\ No newline at end of file
@@ -4,19 +4,18 @@ Sync workout and nutrition plans to Google Calendar
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta, date
 import json
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
-from app.models.workout import WorkoutPlan, Exercise
-from app.models.nutrition import NutritionPlan, Meal
 from app.utils.auth import get_current_active_user
 from app.utils.config import settings
 from app.services.calendar_service import calendar_service
+from app.services.plan_queries import active_plan, by_day
 
 router = APIRouter()
 
@@ -61,14 +60,14 @@ async def get_google_auth_url(
 async def connect_google_calendar(
     data: CalendarConnectRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Exchange OAuth code for tokens and save to user"""
     try:
         token_data = calendar_service.exchange_code_for_token(data.code)
         current_user.google_calendar_token = json.dumps(token_data)
         current_user.google_calendar_connected = True
-        db.commit()
+        await db.commit()
         return {"success": True, "message": "Google Calendar connected successfully!"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to connect Google Calendar: {str(e)}")
@@ -88,12 +87,12 @@ async def get_calendar_status(
 @router.delete("/disconnect")
 async def disconnect_google_calendar(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Disconnect Google Calendar"""
     current_user.google_calendar_token = None
     current_user.google_calendar_connected = False
-    db.commit()
+    await db.commit()
     return {"success": True, "message": "Google Calendar disconnected"}
 
 
@@ -103,7 +102,7 @@ async def disconnect_google_calendar(
 async def sync_plans_to_calendar(
     request: CalendarSyncRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Sync active workout and nutrition plans to Google Calendar"""
     if not current_user.google_calendar_connected:
@@ -131,16 +130,9 @@ async def sync_plans_to_calendar(
 
     # Sync workout plan
     if request.sync_workouts:
-        workout_plan = (
-            db.query(WorkoutPlan)
-            .filter(WorkoutPlan.user_id == current_user.id, WorkoutPlan.is_active == True)
-            .first()
-        )
+        workout_plan = await active_plan(db, "workout", current_user.id)
         if workout_plan:
-            exercises = db.query(Exercise).filter(Exercise.workout_plan_id == workout_plan.id).all()
-            days_map: dict = {}
-            for ex in exercises:
-                days_map.setdefault(ex.day_of_week, []).append(ex)
+            days_map = by_day(workout_plan.exercises)
 
             DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
             today_idx = start.weekday()
@@ -176,13 +168,9 @@ async def sync_plans_to_calendar(
 
     # Sync nutrition plan
     if request.sync_meals:
-        nutrition_plan = (
-            db.query(NutritionPlan)
-            .filter(NutritionPlan.user_id == current_user.id, NutritionPlan.is_active == True)
-            .first()
-        )
+        nutrition_plan = await active_plan(db, "nutrition", current_user.id)
         if nutrition_plan:
-            meals = db.query(Meal).filter(Meal.nutrition_plan_id == nutrition_plan.id).all()
+            meals = nutrition_plan.meals
             meal_times = {"Breakfast": "07:00", "Lunch": "12:30", "Dinner": "19:30", "Snack": "16:00"}
             DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
             today_idx = start.weekday()
@@ -234,7 +222,7 @@ async def sync_plans_to_calendar(
 @router.post("/sync-workout")
 async def sync_workout_only(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Sync only the active workout plan"""
     return await sync_plans_to_calendar(
@@ -247,7 +235,7 @@ async def sync_workout_only(
 @router.post("/sync-meals")
 async def sync_meals_only(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Sync only the active nutrition plan"""
     return await sync_plans_to_calendar(
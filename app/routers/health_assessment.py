@@ -4,16 +4,20 @@ Handles health assessment submission and AI analysis generation
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.health import HealthAssessment
 from app.utils.auth import get_current_active_user
 from app.services.ai_agent import ai_agent
+from app.services.plan_inputs import workout_user_data, nutrition_user_data
+from app.services.plan_speculation import plan_speculator
+from app.utils.config import settings
 
 router = APIRouter()
 
@@ -88,7 +92,7 @@ def assessment_to_dict(a: HealthAssessment) -> dict:
 async def submit_assessment(
     data: AssessmentSubmit,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Submit health assessment and trigger AI plan generation"""
 
@@ -110,7 +114,7 @@ async def submit_assessment(
     if data.fitness_level:
         current_user.fitness_level = data.fitness_level
 
-    db.commit()
+    await db.commit()
 
     # Create assessment record
     assessment = HealthAssessment(
@@ -134,8 +138,8 @@ async def submit_assessment(
         sync_to_calendar=data.sync_to_calendar,
     )
     db.add(assessment)
-    db.commit()
-    db.refresh(assessment)
+    await db.commit()
+    await db.refresh(assessment)
 
     # Generate AI analysis
     user_data = {
@@ -157,11 +161,25 @@ async def submit_assessment(
         "diet_preference": data.diet_preference,
     }
 
+    # Start both plans now with exactly the inputs /generate will build,
+    # so they are ready (or well under way) when the user asks for them
+    if settings.PLAN_SPECULATION_ENABLED:
+        plan_speculator.speculate(
+            current_user.id, "workout",
+            workout_user_data(current_user, assessment),
+            ai_agent.generate_workout_plan_async,
+        )
+        plan_speculator.speculate(
+            current_user.id, "nutrition",
+            nutrition_user_data(current_user, assessment),
+            ai_agent.generate_nutrition_plan_async,
+        )
+
     try:
-        ai_analysis = ai_agent.analyze_health_assessment(user_data)
+        ai_analysis = await ai_agent.analyze_health_assessment_async(user_data)
         assessment.ai_analysis = ai_analysis
-        db.commit()
-        db.refresh(assessment)
+        await db.commit()
+        await db.refresh(assessment)
     except Exception as e:
         print(f"AI analysis error: {e}")
 
@@ -171,6 +189,7 @@ async def submit_assessment(
         "assessment": assessment_to_dict(assessment),
         "bmi": bmi,
         "bmi_category": _bmi_category(bmi),
+        "plans_preparing": settings.PLAN_SPECULATION_ENABLED,
     }
 
 
@@ -196,7 +215,7 @@ async def analyze_health(
     }
 
     try:
-        analysis = ai_agent.analyze_health_assessment(user_data)
+        analysis = await ai_agent.analyze_health_assessment_async(user_data)
         return {"success": True, "analysis": analysis}
     except Exception as e:
         return {
@@ -219,29 +238,29 @@ async def analyze_health(
 @router.get("/history")
 async def get_assessment_history(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all health assessments for current user"""
     assessments = (
-        db.query(HealthAssessment)
-        .filter(HealthAssessment.user_id == current_user.id)
-        .order_by(HealthAssessment.created_at.desc())
-        .all()
-    )
+        await db.scalars(
+            select(HealthAssessment)
+            .filter(HealthAssessment.user_id == current_user.id)
+            .order_by(HealthAssessment.created_at.desc())
+        )
+    ).all()
     return {"assessments": [assessment_to_dict(a) for a in assessments]}
 
 
 @router.get("/latest")
 async def get_latest_assessment(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get the most recent health assessment"""
-    assessment = (
-        db.query(HealthAssessment)
+    assessment = await db.scalar(
+        select(HealthAssessment)
         .filter(HealthAssessment.user_id == current_user.id)
         .order_by(HealthAssessment.created_at.desc())
-        .first()
     )
     if not assessment:
         raise HTTPException(status_code=404, detail="No health assessment found")
@@ -0,0 +1,66 @@
+"""
+Generation Jobs Router
+Status polling and completion push for background plan generation
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, AsyncSessionLocal
+from app.models.user import User
+from app.models.job import JobStatus
+from app.utils.auth import get_current_active_user
+from app.utils.config import settings
+from app.utils.sse import sse_event, sse_response
+from app.services.job_queue import plan_job_queue, job_to_dict
+
+router = APIRouter()
+
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Poll the status of a plan generation job"""
+    job = await db.run_sync(plan_job_queue.get_job, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job": job_to_dict(job)}
+
+
+@router.get("/{job_id}/events")
+async def subscribe_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Server-Sent Events stream that fires once the job has finished"""
+    job = await db.run_sync(plan_job_queue.get_job, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    user_id = current_user.id
+    initial = job_to_dict(job)
+    already_finished = job.status in FINISHED
+
+    async def event_stream():
+        yield sse_event("status", initial)
+        if already_finished:
+            yield sse_event("done", initial)
+            return
+        waited = 0.0
+        interval = settings.PLAN_JOB_HEARTBEAT_SECONDS
+        while waited < settings.PLAN_JOB_SUBSCRIBE_TIMEOUT_SECONDS:
+            if await plan_job_queue.wait_for(job_id, timeout=interval):
+                break
+            waited += interval
+            yield ": keep-alive\n\n"
+        async with AsyncSessionLocal() as stream_db:
+            final = await stream_db.run_sync(plan_job_queue.get_job, job_id, user_id)
+            payload = job_to_dict(final) if final else initial
+        yield sse_event("done" if payload["status"] in [s.value for s in FINISHED] else "timeout", payload)
+
+    return sse_response(event_stream())
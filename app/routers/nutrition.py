@@ -2,22 +2,28 @@
 Nutrition Router - Generate meal plans, track meals, grocery list
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.nutrition import NutritionPlan, Meal
 from app.utils.auth import get_current_active_user
 from app.services.ai_agent import ai_agent
+from app.services.job_queue import plan_job_queue, job_to_dict
+from app.services.plan_engine import DAYS_ORDER, parse_days
+from app.services.plan_persistence import save_nutrition_plan, replace_nutrition_days
+from app.services.plan_queries import active_plan, by_day
+from app.services.plan_inputs import nutrition_user_data
+from app.services.plan_speculation import plan_speculator, latest_assessment
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter()
 
-DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
 
 class GenerateNutritionRequest(BaseModel):
     diet_preference: Optional[str] = None
@@ -30,6 +36,12 @@ class GenerateNutritionRequest(BaseModel):
     height: Optional[float] = None
 
 
+class RegenerateDaysRequest(BaseModel):
+    days: List[str]
+    reason: Optional[str] = None
+    allergies: Optional[str] = None
+
+
 class MealCompleteRequest(BaseModel):
     actual_calories: Optional[int] = None
     notes: Optional[str] = None
@@ -77,97 +89,103 @@ def plan_to_dict(plan: NutritionPlan) -> dict:
 async def generate_nutrition_plan(
     request: GenerateNutritionRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI-powered personalized 7-day Indian cuisine nutrition plan"""
-    user_data = {
-        "age": request.age or current_user.age or 25,
-        "gender": request.gender or current_user.gender or "Male",
-        "weight": request.weight or current_user.weight or 70,
-        "height": request.height or current_user.height or 170,
-        "fitness_goal": request.fitness_goal or (current_user.fitness_goal.value if current_user.fitness_goal else "general_fitness"),
-        "diet_preference": request.diet_preference or (current_user.diet_preference.value if current_user.diet_preference else "vegetarian"),
-        "allergies": request.allergies or "None",
-        "target_calories": request.target_calories,
-    }
-
-    # Deactivate existing plans
-    db.query(NutritionPlan).filter(
-        NutritionPlan.user_id == current_user.id,
-        NutritionPlan.is_active == True
-    ).update({"is_active": False})
-    db.commit()
-
-    # Generate AI plan
-    plan_data = await ai_agent.generate_nutrition_plan(user_data)
-
-    # Calculate calorie target
-    target_calories = user_data.get("target_calories") or plan_data.get("daily_calories", 2000)
-
-    new_plan = NutritionPlan(
-        user_id=current_user.id,
-        title="AI Indian Nutrition Plan",
-        description=f"Personalized {user_data['diet_preference']} meal plan for {user_data['fitness_goal'].replace('_', ' ')}",
-        target_calories=target_calories,
-        target_protein=plan_data.get("macros", {}).get("protein_g", 120),
-        target_carbs=plan_data.get("macros", {}).get("carbs_g", 250),
-        target_fat=plan_data.get("macros", {}).get("fat_g", 65),
-        diet_preference=user_data["diet_preference"],
-        plan_data=plan_data,
-        is_active=True,
+    user_data = nutrition_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
     )
-    db.add(new_plan)
-    db.commit()
-    db.refresh(new_plan)
-
-    # Parse meals from plan_data
-    weekly_meals = plan_data.get("weekly_meals", {})
-    meal_type_times = {
-        "Breakfast": "7:00 AM",
-        "Lunch": "12:30 PM",
-        "Dinner": "7:30 PM",
-        "Snack": "",
-        "Snack 1": "",
-        "Snack 2": "",
-    }
 
-    for day in DAYS_ORDER:
-        day_meals = weekly_meals.get(day, [])
-        for meal_data in day_meals:
-            meal_type = meal_data.get("meal_type", "Meal")
-            meal = Meal(
-                nutrition_plan_id=new_plan.id,
-                day_of_week=day,
-                meal_type=meal_type,
-                name=meal_data.get("name", "Meal"),
-                description=meal_data.get("description", ""),
-                calories=meal_data.get("calories", 0),
-                protein_g=meal_data.get("protein_g", 0),
-                carbs_g=meal_data.get("carbs_g", 0),
-                fat_g=meal_data.get("fat_g", 0),
-                fiber_g=meal_data.get("fiber_g", 0),
-                ingredients=meal_data.get("ingredients", []),
-                recipe_steps=meal_data.get("recipe_steps", []),
-                prep_time_minutes=meal_data.get("prep_time_minutes", 15),
-                meal_time=meal_type_times.get(meal_type, ""),
-            )
-            db.add(meal)
-
-    db.commit()
-    db.refresh(new_plan)
+    # Use the plan speculatively generated at assessment time if the inputs still match
+    plan_data = await plan_speculator.claim(current_user.id, "nutrition", user_data)
+    if plan_data is None:
+        plan_data = await ai_agent.generate_nutrition_plan_async(user_data)
+
+    new_plan = await db.run_sync(save_nutrition_plan, current_user.id, user_data, plan_data)
     return {"message": "Nutrition plan generated successfully", "plan": plan_to_dict(new_plan)}
 
 
+@router.post("/generate/stream")
+async def stream_nutrition_plan(
+    request: GenerateNutritionRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream the nutrition plan day by day as Server-Sent Events, then save it"""
+    user_data = nutrition_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
+    )
+    user_id = current_user.id
+
+    async def event_stream():
+        yield sse_event("start", {"plan_type": "nutrition"})
+        plan_data = None
+        staged = await plan_speculator.claim(user_id, "nutrition", user_data)
+        async for event in ai_agent.stream_plan_async("nutrition", user_data, staged):
+            if event["type"] == "day":
+                yield sse_event("day", {"day": event["day"], "data": event["data"]})
+            else:
+                plan_data = event["plan"]
+
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                new_plan = await stream_db.run_sync(save_nutrition_plan, user_id, user_data, plan_data)
+                yield sse_event("done", {"plan": plan_to_dict(new_plan)})
+            except Exception as e:
+                print(f"Nutrition plan stream save error: {e}")
+                yield sse_event("error", {"detail": "Failed to save nutrition plan"})
+
+    return sse_response(event_stream())
+
+
+@router.post("/generate/background", status_code=status.HTTP_202_ACCEPTED)
+async def generate_nutrition_plan_background(
+    request: GenerateNutritionRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue nutrition plan generation and return a job id immediately"""
+    user_data = nutrition_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
+    )
+    job = await db.run_sync(plan_job_queue.enqueue, current_user.id, "nutrition", user_data)
+    return {"message": "Nutrition plan generation queued", "job": job_to_dict(job)}
+
+
+@router.post("/current/regenerate-days")
+async def regenerate_nutrition_days(
+    request: RegenerateDaysRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Regenerate selected days of the active meal plan, leaving the rest of the week untouched"""
+    try:
+        days = parse_days(request.days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    plan = await active_plan(db, "nutrition", current_user.id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="No active nutrition plan. Please generate one.")
+
+    user_data = nutrition_user_data(
+        current_user,
+        await db.run_sync(latest_assessment, current_user.id),
+        diet_preference=plan.diet_preference,
+        allergies=request.allergies,
+        target_calories=plan.target_calories,
+    )
+    new_days = await ai_agent.regenerate_days_async("nutrition", user_data, plan.plan_data or {}, days, request.reason)
+    plan = await db.run_sync(replace_nutrition_days, plan, new_days)
+    return {"message": f"Regenerated {', '.join(days)}", "regenerated_days": days, "plan": plan_to_dict(plan)}
+
+
 @router.get("/current")
 async def get_current_plan(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get active nutrition plan"""
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.user_id == current_user.id,
-        NutritionPlan.is_active == True
-    ).first()
+    plan = await active_plan(db, "nutrition", current_user.id)
 
     if not plan:
         return {"plan": None, "message": "No active nutrition plan. Please generate one."}
@@ -178,22 +196,16 @@ async def get_current_plan(
 @router.get("/today")
 async def get_todays_meals(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get today's meal plan"""
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.user_id == current_user.id,
-        NutritionPlan.is_active == True
-    ).first()
+    today_name = datetime.now().strftime("%A")
+    plan = await active_plan(db, "nutrition", current_user.id, days=[today_name])
 
     if not plan:
         return {"meals": [], "message": "No active nutrition plan"}
 
-    today_name = datetime.now().strftime("%A")
-    meals = db.query(Meal).filter(
-        Meal.nutrition_plan_id == plan.id,
-        Meal.day_of_week == today_name
-    ).all()
+    meals = plan.meals
 
     total_calories = sum(m.calories or 0 for m in meals)
     completed_calories = sum(m.calories or 0 for m in meals if m.is_completed)
@@ -213,24 +225,19 @@ async def get_todays_meals(
 @router.get("/week")
 async def get_weekly_meals(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get weekly meal plan overview"""
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.user_id == current_user.id,
-        NutritionPlan.is_active == True
-    ).first()
+    plan = await active_plan(db, "nutrition", current_user.id)
 
     if not plan:
         return {"week": [], "message": "No active nutrition plan"}
 
     today_name = datetime.now().strftime("%A")
+    meals_by_day = by_day(plan.meals)
     week = []
     for day in DAYS_ORDER:
-        meals = db.query(Meal).filter(
-            Meal.nutrition_plan_id == plan.id,
-            Meal.day_of_week == day
-        ).all()
+        meals = meals_by_day.get(day, [])
         week.append({
             "day": day,
             "is_today": day == today_name,
@@ -246,13 +253,13 @@ async def complete_meal(
     meal_id: int,
     data: MealCompleteRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a meal as completed"""
-    meal = db.query(Meal).join(NutritionPlan).filter(
+    meal = await db.scalar(select(Meal).join(NutritionPlan).filter(
         Meal.id == meal_id,
         NutritionPlan.user_id == current_user.id
-    ).first()
+    ))
 
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
@@ -274,7 +281,7 @@ async def complete_meal(
         )
         db.add(record)
 
-    db.commit()
+    await db.commit()
     return {
         "message": f"Meal {'completed' if meal.is_completed else 'unchecked'}",
         "meal": meal_to_dict(meal)
@@ -284,22 +291,17 @@ async def complete_meal(
 @router.get("/grocery-list")
 async def get_grocery_list(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get aggregated weekly grocery list"""
-    plan = db.query(NutritionPlan).filter(
-        NutritionPlan.user_id == current_user.id,
-        NutritionPlan.is_active == True
-    ).first()
+    plan = await active_plan(db, "nutrition", current_user.id)
 
     if not plan:
         return {"items": [], "message": "No active nutrition plan"}
 
     # Aggregate ingredients from all meals
     ingredient_count: dict = {}
-    meals = db.query(Meal).filter(Meal.nutrition_plan_id == plan.id).all()
-
-    for meal in meals:
+    for meal in plan.meals:
         ingredients = meal.ingredients or []
         for ingredient in ingredients:
             name = ingredient if isinstance(ingredient, str) else ingredient.get("name", "")
@@ -3,13 +3,13 @@ Progress Tracking Router - Log, retrieve analytics, achievements
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.health import ProgressRecord
 from app.utils.auth import get_current_active_user
@@ -71,7 +71,7 @@ def record_to_dict(r: ProgressRecord) -> dict:
 async def log_workout(
     data: LogWorkoutRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log a workout session"""
     record = ProgressRecord(
@@ -87,7 +87,7 @@ async def log_workout(
     db.add(record)
     current_user.total_workouts += 1
     current_user.streak_points += 10
-    db.commit()
+    await db.commit()
     return {"message": "Workout logged successfully", "record": record_to_dict(record)}
 
 
@@ -95,7 +95,7 @@ async def log_workout(
 async def log_body_metrics(
     data: LogBodyMetricsRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log body metrics"""
     bmi = None
@@ -117,7 +117,7 @@ async def log_body_metrics(
         notes=data.notes,
     )
     db.add(record)
-    db.commit()
+    await db.commit()
     return {"message": "Body metrics logged", "record": record_to_dict(record), "bmi": bmi}
 
 
@@ -125,7 +125,7 @@ async def log_body_metrics(
 async def log_nutrition(
     data: LogNutritionRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Log nutrition data"""
     record = ProgressRecord(
@@ -138,7 +138,7 @@ async def log_nutrition(
         fat_g=data.fat_g,
     )
     db.add(record)
-    db.commit()
+    await db.commit()
     return {"message": "Nutrition logged", "record": record_to_dict(record)}
 
 
@@ -146,17 +146,17 @@ async def log_nutrition(
 async def get_progress_overview(
     period: str = "month",
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get progress overview with analytics"""
     days_map = {"week": 7, "month": 30, "3months": 90, "year": 365}
     days = days_map.get(period, 30)
     since = datetime.now() - timedelta(days=days)
 
-    records = db.query(ProgressRecord).filter(
+    records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.created_at >= since
-    ).all()
+    ))).all()
 
     workout_records = [r for r in records if r.record_type == "workout"]
     body_records = [r for r in records if r.record_type == "body_metrics"]
@@ -218,18 +218,18 @@ def _calculate_streak(records: list) -> int:
 async def get_workout_analytics(
     period: str = "month",
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed workout analytics"""
     days_map = {"week": 7, "month": 30, "3months": 90, "year": 365}
     days = days_map.get(period, 30)
     since = datetime.now() - timedelta(days=days)
 
-    records = db.query(ProgressRecord).filter(
+    records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.record_type == "workout",
         ProgressRecord.created_at >= since
-    ).order_by(ProgressRecord.created_at).all()
+    ).order_by(ProgressRecord.created_at))).all()
 
     chart_data = []
     for r in records:
@@ -251,13 +251,13 @@ async def get_workout_analytics(
 @router.get("/body-metrics")
 async def get_body_metrics(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get body metrics history"""
-    records = db.query(ProgressRecord).filter(
+    records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.record_type == "body_metrics"
-    ).order_by(ProgressRecord.created_at).all()
+    ).order_by(ProgressRecord.created_at))).all()
 
     chart_data = [
         {
@@ -275,12 +275,12 @@ async def get_body_metrics(
 @router.get("/achievements")
 async def get_achievements(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user achievements"""
-    records = db.query(ProgressRecord).filter(
+    records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id
-    ).all()
+    ))).all()
 
     workout_records = [r for r in records if r.record_type == "workout"]
     total_calories = sum(r.calories_burned or 0 for r in workout_records)
@@ -3,14 +3,15 @@ Users Router - Profile management, update, photo upload
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 import os
 import shutil
 import uuid
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User, FitnessGoal, WorkoutPreference, DietPreference
 from app.utils.auth import get_current_active_user
 
@@ -80,12 +81,12 @@ async def get_profile(current_user: User = Depends(get_current_active_user)):
 async def update_profile(
     update_data: UserUpdateRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user profile"""
     # Check email uniqueness if changing
     if update_data.email and update_data.email != current_user.email:
-        existing = db.query(User).filter(User.email == update_data.email).first()
+        existing = await db.scalar(select(User).filter(User.email == update_data.email))
         if existing:
             raise HTTPException(status_code=400, detail="Email already in use")
 
@@ -93,8 +94,8 @@ async def update_profile(
     for field, value in update_fields.items():
         setattr(current_user, field, value)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     return {"message": "Profile updated successfully", "user": user_to_dict(current_user)}
 
 
@@ -102,7 +103,7 @@ async def update_profile(
 async def upload_profile_photo(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload profile photo"""
     # Validate file type
@@ -121,7 +122,7 @@ async def upload_profile_photo(
     # Update user
     photo_url = f"/static/profile_photos/{file_name}"
     current_user.profile_photo_url = photo_url
-    db.commit()
+    await db.commit()
 
     return {"message": "Profile photo uploaded successfully", "photo_url": photo_url}
 
@@ -129,25 +130,25 @@ async def upload_profile_photo(
 @router.get("/stats")
 async def get_user_stats(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user statistics and charity impact"""
     from app.models.health import ProgressRecord
 
     # Total calories burned
-    records = db.query(ProgressRecord).filter(
+    records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.record_type == "workout"
-    ).all()
+    ))).all()
 
     total_calories = sum(r.calories_burned or 0 for r in records)
     total_workout_minutes = sum(r.workout_duration_minutes or 0 for r in records)
 
     # Meal records
-    meal_records = db.query(ProgressRecord).filter(
+    meal_records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.record_type == "nutrition"
-    ).all()
+    ))).all()
     total_meals = sum(r.meals_tracked or 0 for r in meal_records)
 
     # Charity calculation: ₹5 per workout, ₹1 per 10 calories, ₹2 per meal
@@ -186,9 +187,9 @@ async def get_user_stats(
 @router.delete("/account")
 async def delete_account(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Soft delete user account"""
     current_user.is_active = False
-    db.commit()
+    await db.commit()
     return {"message": "Account deactivated successfully"}
\ No newline at end of file
@@ -3,21 +3,28 @@ Workouts Router - Generate, retrieve, complete workout plans
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.user import User
 from app.models.workout import WorkoutPlan, Exercise, WorkoutStatus
 from app.utils.auth import get_current_active_user
 from app.services.ai_agent import ai_agent
+from app.services.job_queue import plan_job_queue, job_to_dict
+from app.services.plan_engine import DAYS_ORDER, parse_days
+from app.services.plan_persistence import save_workout_plan, replace_workout_days
+from app.services.plan_queries import active_plan, plan_history, by_day
+from app.services.plan_inputs import workout_user_data
+from app.services.plan_speculation import plan_speculator, latest_assessment
+from app.services.plan_schema import normalize_day
+from app.utils.sse import sse_event, sse_response
 
 router = APIRouter()
 
-DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
 
 class GenerateWorkoutRequest(BaseModel):
     fitness_goal: Optional[str] = None
@@ -29,8 +36,15 @@ class GenerateWorkoutRequest(BaseModel):
     weight: Optional[float] = None
     medical_history: Optional[str] = None
     injuries: Optional[str] = None
-    available_minutes: Optional[int] = 45
-    workout_time: Optional[str] = "Morning"
+    available_minutes: Optional[int] = None
+    workout_time: Optional[str] = None
+
+
+class RegenerateDaysRequest(BaseModel):
+    days: List[str]
+    reason: Optional[str] = None
+    workout_preference: Optional[str] = None
+    available_minutes: Optional[int] = None
 
 
 class CompleteExerciseRequest(BaseModel):
@@ -79,88 +93,104 @@ def plan_to_dict(plan: WorkoutPlan) -> dict:
 async def generate_workout_plan(
     request: GenerateWorkoutRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI-powered personalized 7-day workout plan"""
-    user_data = {
-        "age": request.age or current_user.age or 25,
-        "gender": request.gender or current_user.gender or "Male",
-        "height": request.height or current_user.height or 170,
-        "weight": request.weight or current_user.weight or 70,
-        "fitness_level": request.fitness_level or current_user.fitness_level or "beginner",
-        "fitness_goal": request.fitness_goal or (current_user.fitness_goal.value if current_user.fitness_goal else "general_fitness"),
-        "workout_preference": request.workout_preference or (current_user.workout_preference.value if current_user.workout_preference else "home"),
-        "medical_history": request.medical_history or "None",
-        "injuries": request.injuries or "None",
-        "available_minutes": request.available_minutes or 45,
-        "workout_time": request.workout_time or "Morning",
-    }
+    user_data = workout_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
+    )
+
+    # Use the plan speculatively generated at assessment time if the inputs still match
+    plan_data = await plan_speculator.claim(current_user.id, "workout", user_data)
+    if plan_data is None:
+        plan_data = await ai_agent.generate_workout_plan_async(user_data)
 
-    # Deactivate existing plans
-    db.query(WorkoutPlan).filter(
-        WorkoutPlan.user_id == current_user.id,
-        WorkoutPlan.is_active == True
-    ).update({"is_active": False})
-    db.commit()
+    new_plan = await db.run_sync(save_workout_plan, current_user.id, user_data, plan_data)
+    return {"message": "Workout plan generated successfully", "plan": plan_to_dict(new_plan)}
 
-    # Generate AI plan
-    plan_data = await ai_agent.generate_workout_plan(user_data)
 
-    # Create plan in DB
-    new_plan = WorkoutPlan(
-        user_id=current_user.id,
-        title=f"AI Workout Plan - Week {1}",
-        description=f"Personalized {user_data['fitness_goal'].replace('_', ' ').title()} plan",
-        fitness_goal=user_data["fitness_goal"],
-        fitness_level=user_data["fitness_level"],
-        workout_preference=user_data["workout_preference"],
-        plan_data=plan_data,
-        is_active=True,
+@router.post("/generate/stream")
+async def stream_workout_plan(
+    request: GenerateWorkoutRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream the workout plan day by day as Server-Sent Events, then save it"""
+    user_data = workout_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
     )
-    db.add(new_plan)
-    db.commit()
-    db.refresh(new_plan)
+    user_id = current_user.id
+
+    async def event_stream():
+        yield sse_event("start", {"plan_type": "workout"})
+        plan_data = None
+        staged = await plan_speculator.claim(user_id, "workout", user_data)
+        async for event in ai_agent.stream_plan_async("workout", user_data, staged):
+            if event["type"] == "day":
+                yield sse_event("day", {"day": event["day"], "data": event["data"]})
+            else:
+                plan_data = event["plan"]
+
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                new_plan = await stream_db.run_sync(save_workout_plan, user_id, user_data, plan_data)
+                yield sse_event("done", {"plan": plan_to_dict(new_plan)})
+            except Exception as e:
+                print(f"Workout plan stream save error: {e}")
+                yield sse_event("error", {"detail": "Failed to save workout plan"})
+
+    return sse_response(event_stream())
+
+
+@router.post("/generate/background", status_code=status.HTTP_202_ACCEPTED)
+async def generate_workout_plan_background(
+    request: GenerateWorkoutRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue workout plan generation and return a job id immediately"""
+    user_data = workout_user_data(
+        current_user, await db.run_sync(latest_assessment, current_user.id), **request.model_dump()
+    )
+    job = await db.run_sync(plan_job_queue.enqueue, current_user.id, "workout", user_data)
+    return {"message": "Workout plan generation queued", "job": job_to_dict(job)}
 
-    # Parse exercises from plan_data and save them
-    weekly_schedule = plan_data.get("weekly_schedule", {})
-    for day in DAYS_ORDER:
-        day_data = weekly_schedule.get(day, {})
-        if day_data.get("is_rest_day"):
-            continue
-        exercises_list = day_data.get("exercises", [])
-        for ex_data in exercises_list:
-            exercise = Exercise(
-                workout_plan_id=new_plan.id,
-                day_of_week=day,
-                name=ex_data.get("name", "Exercise"),
-                description=ex_data.get("description", ""),
-                sets=ex_data.get("sets", 3),
-                reps=str(ex_data.get("reps", "12")),
-                rest_seconds=ex_data.get("rest_seconds", 60),
-                duration_minutes=ex_data.get("duration_minutes"),
-                calories_burned=ex_data.get("calories_burned"),
-                difficulty=ex_data.get("difficulty", user_data["fitness_level"]),
-                youtube_url=ex_data.get("youtube_url"),
-                muscle_groups=ex_data.get("muscle_groups", []),
-                equipment=ex_data.get("equipment", []),
-            )
-            db.add(exercise)
-
-    db.commit()
-    db.refresh(new_plan)
-    return {"message": "Workout plan generated successfully", "plan": plan_to_dict(new_plan)}
+
+@router.post("/current/regenerate-days")
+async def regenerate_workout_days(
+    request: RegenerateDaysRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Regenerate selected days of the active plan, leaving the rest of the week untouched"""
+    try:
+        days = parse_days(request.days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    plan = await active_plan(db, "workout", current_user.id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="No active workout plan. Please generate one.")
+
+    user_data = workout_user_data(
+        current_user,
+        await db.run_sync(latest_assessment, current_user.id),
+        fitness_goal=plan.fitness_goal,
+        fitness_level=plan.fitness_level,
+        workout_preference=request.workout_preference or plan.workout_preference,
+        available_minutes=request.available_minutes,
+    )
+    new_days = await ai_agent.regenerate_days_async("workout", user_data, plan.plan_data or {}, days, request.reason)
+    plan = await db.run_sync(replace_workout_days, plan, user_data, new_days)
+    return {"message": f"Regenerated {', '.join(days)}", "regenerated_days": days, "plan": plan_to_dict(plan)}
 
 
 @router.get("/current")
 async def get_current_plan(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's active workout plan"""
-    plan = db.query(WorkoutPlan).filter(
-        WorkoutPlan.user_id == current_user.id,
-        WorkoutPlan.is_active == True
-    ).first()
+    plan = await active_plan(db, "workout", current_user.id)
 
     if not plan:
         return {"plan": None, "message": "No active workout plan. Please generate one."}
@@ -171,35 +201,29 @@ async def get_current_plan(
 @router.get("/today")
 async def get_todays_workout(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get today's workout exercises"""
-    plan = db.query(WorkoutPlan).filter(
-        WorkoutPlan.user_id == current_user.id,
-        WorkoutPlan.is_active == True
-    ).first()
+    today_name = datetime.now().strftime("%A")  # e.g. "Thursday"
+    plan = await active_plan(db, "workout", current_user.id, days=[today_name])
 
     if not plan:
         return {"today": None, "exercises": [], "message": "No active plan. Please complete health assessment."}
 
-    today_name = datetime.now().strftime("%A")  # e.g. "Thursday"
-
-    exercises = db.query(Exercise).filter(
-        Exercise.workout_plan_id == plan.id,
-        Exercise.day_of_week == today_name
-    ).all()
+    exercises = plan.exercises
 
     plan_data = plan.plan_data or {}
-    today_data = plan_data.get("weekly_schedule", {}).get(today_name, {})
+    # Plans stored before the canonical schema may still use the old key names
+    today_data = normalize_day("workout", (plan_data.get("weekly_schedule") or {}).get(today_name) or {})
 
     return {
         "day": today_name,
-        "focus": today_data.get("focus", "Workout"),
-        "duration_minutes": today_data.get("duration_minutes", 45),
-        "is_rest_day": today_data.get("is_rest_day", False),
-        "warmup": today_data.get("warm_up", "5-minute jogging in place or jumping jacks"),
-        "cooldown": today_data.get("cool_down", "5-minute stretching"),
-        "recommended_time": today_data.get("recommended_time", "6:00 AM - 7:00 AM"),
+        "focus": today_data["focus"],
+        "duration_minutes": today_data["duration_minutes"],
+        "is_rest_day": today_data["is_rest"],
+        "warmup": (today_data["warmup"] or {}).get("description") or "5-minute jogging in place or jumping jacks",
+        "cooldown": (today_data["cooldown"] or {}).get("description") or "5-minute stretching",
+        "recommended_time": today_data["time_slot"] or "6:00 AM - 7:00 AM",
         "exercises": [exercise_to_dict(e) for e in exercises],
     }
 
@@ -207,39 +231,34 @@ async def get_todays_workout(
 @router.get("/week")
 async def get_weekly_plan(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get weekly workout overview"""
-    plan = db.query(WorkoutPlan).filter(
-        WorkoutPlan.user_id == current_user.id,
-        WorkoutPlan.is_active == True
-    ).first()
+    plan = await active_plan(db, "workout", current_user.id)
 
     if not plan:
         return {"week": [], "message": "No active plan found"}
 
     today_name = datetime.now().strftime("%A")
     plan_data = plan.plan_data or {}
-    weekly = plan_data.get("weekly_schedule", {})
+    weekly = plan_data.get("weekly_schedule") or {}
+    exercises_by_day = by_day(plan.exercises)
 
     week_summary = []
     for day in DAYS_ORDER:
-        day_data = weekly.get(day, {})
-        exercises = db.query(Exercise).filter(
-            Exercise.workout_plan_id == plan.id,
-            Exercise.day_of_week == day
-        ).all()
+        day_data = normalize_day("workout", weekly[day]) if weekly.get(day) else None
+        exercises = exercises_by_day.get(day, [])
 
         completed = sum(1 for e in exercises if e.status == WorkoutStatus.COMPLETED)
         week_summary.append({
             "day": day,
             "is_today": day == today_name,
-            "focus": day_data.get("focus", "Rest Day" if day_data.get("is_rest_day") else "Workout"),
-            "duration_minutes": day_data.get("duration_minutes", 0),
+            "focus": day_data["focus"] if day_data else "Workout",
+            "duration_minutes": day_data["duration_minutes"] if day_data else 0,
             "exercise_count": len(exercises),
             "completed_count": completed,
-            "is_rest_day": day_data.get("is_rest_day", False),
-            "recommended_time": day_data.get("recommended_time", ""),
+            "is_rest_day": day_data["is_rest"] if day_data else False,
+            "recommended_time": day_data["time_slot"] if day_data else "",
         })
 
     return {"week": week_summary, "plan_title": plan.title}
@@ -250,13 +269,13 @@ async def complete_exercise(
     exercise_id: int,
     data: CompleteExerciseRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark an exercise as completed"""
-    exercise = db.query(Exercise).join(WorkoutPlan).filter(
+    exercise = await db.scalar(select(Exercise).join(WorkoutPlan).filter(
         Exercise.id == exercise_id,
         WorkoutPlan.user_id == current_user.id
-    ).first()
+    ))
 
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
@@ -282,27 +301,25 @@ async def complete_exercise(
 
     # Update user total workouts (count distinct days completed)
     today = datetime.now().date()
-    today_records = db.query(ProgressRecord).filter(
+    today_records = (await db.scalars(select(ProgressRecord).filter(
         ProgressRecord.user_id == current_user.id,
         ProgressRecord.record_type == "workout",
-    ).all()
+    ))).all()
     unique_days = {r.created_at.date() for r in today_records if r.created_at}
     current_user.total_workouts = len(unique_days)
     current_user.streak_points = current_user.streak_points + 10
 
-    db.commit()
+    await db.commit()
     return {"message": "Exercise completed!", "exercise": exercise_to_dict(exercise)}
 
 
 @router.get("/history")
 async def get_workout_history(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all workout plans history"""
-    plans = db.query(WorkoutPlan).filter(
-        WorkoutPlan.user_id == current_user.id
-    ).order_by(WorkoutPlan.created_at.desc()).limit(10).all()
+    plans = await plan_history(db, "workout", current_user.id)
 
     return {"plans": [plan_to_dict(p) for p in plans]}
 
@@ -6,24 +6,68 @@ Orchestrates all AI-powered features:
 - Motivational coaching
 - Dynamic plan modifications
 - Progress analysis
+
+Every public method has an ``*_async`` twin that runs on a shared, keep-alive
+``httpx.AsyncClient`` pool so route handlers never block the event loop.
 """
 
 import asyncio
 import json
 import re
-from typing import Dict, List, Optional, Any
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import httpx
+from pydantic import ValidationError
 
 from app.utils.config import settings
+from app.services.plan_cache import plan_cache
+from app.services import plan_engine
+from app.services.plan_variants import plan_variants
+from app.services.single_flight import SingleFlight, fingerprint
+from app.services.json_stream import StreamingJSONParser
+from app.services.llm_scheduler import llm_scheduler, Priority, AdmissionRejected
+from app.services.intent_classifier import intent_classifier, LLM_ONLY_INTENTS
+from app.services.faq_index import faq_index
+from app.services.semantic_cache import semantic_cache
+from app.services.llm_metrics import instrumented, note_source, note_llm_request, note_json, note_cache
+from app.services.llm_recorder import LLMRecorder, RecordingTransport, SyncRecordingTransport, REPLAY
+from app.services import prompt_templates as prompts
+from app.services.plan_schema import normalize_plan, normalize_day, normalize_days
 
 try:
-    from groq import Groq
+    from groq import Groq, AsyncGroq
     groq_available = True
 except ImportError:
     groq_available = False
 
 
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Key under which each plan kind keeps its per-day objects
+PLAN_DAY_CONTAINERS = {"workout": "weekly_schedule", "nutrition": "weekly_meals"}
+
+# Canned replies keyed by intent (see intent_classifier)
+COACH_FALLBACK_REPLIES = {
+    "travel": "🌍 No worries about travel! Try hotel room exercises: push-ups, squats, lunges, and planks. Stay hydrated and walk whenever possible! 💪",
+    "nutrition": "🥗 For optimal nutrition, aim for protein with every meal, include whole grains, and stay hydrated with 2.5-3L water daily. Focus on traditional Indian foods - they're nutritionally excellent!",
+    "morning_routine": "🌅 Perfect morning routine: Wake up, drink 500ml water, 5-minute stretch, 30-min workout, healthy breakfast. Consistency is your superpower! ✨",
+    "muscle_gain": "💪 For muscle gain: Caloric surplus of 300-500 cal/day, high protein (1.6-2.2g/kg bodyweight), progressive overload training, and 7-9 hours of sleep! Recovery is where the magic happens!",
+    "greeting": "👋 Hi there! I'm your AI fitness coach. Ask me about workouts, nutrition or staying motivated! 💪",
+    "thanks": "😊 You're welcome! Keep up the great work - I'm here whenever you need me! 💪",
+}
+DEFAULT_COACH_FALLBACK = "🎯 Great question! Stay consistent with your training and nutrition. Progress, not perfection! Every workout brings you closer to your goals. Keep going! 💪✨"
+
+AROMI_FALLBACK_REPLIES = {
+    "snack": "🍎 Hey there, friend! 😊 Here are some healthy snack ideas:\n\n• Roasted Makhana (150 cal)\n• Cucumber & Tomato Salad (50 cal)\n• Roasted Chana (120 cal)\n• Fresh Fruit Salad (100 cal)\n\nThese align with your Indian nutrition plan! 🌿",
+    "travel": "✈️ Don't worry about fitness while traveling!\n\n• Replace gym with hotel room exercises\n• Walking tours count as cardio!\n• Bodyweight squats, push-ups & planks anywhere\n• Stay hydrated - 3L water daily\n• Look for local healthy food options 🍱",
+    "fatigue": "😴 Listen to your body! Rest is crucial for fitness gains. Take today easy - light walk or stretching is perfect. Your muscles grow stronger during recovery! Tomorrow you'll be recharged! 💪",
+    "greeting": "🌟 Namaste! I'm AROMI, your wellness companion. How are you feeling today? 😊",
+    "thanks": "😊 Anytime, friend! I'm always here for your wellness journey! 🌿",
+}
+DEFAULT_AROMI_FALLBACK = "💪 I'm here to support your wellness journey! Stay consistent and you'll see amazing results! 🌟"
+
+
 class ArogyaMitraAgent:
     """
     ArogyaMitra AI Agent - Your Personal Fitness Companion
@@ -31,112 +75,269 @@ class ArogyaMitraAgent:
 
     def __init__(self):
         self.groq_client = None
+        self.async_groq_client = None
+        self.async_http_client = None
+        self.recorder = None
+        # Identical prompts in flight at the same time share one Groq call
+        self.single_flight = SingleFlight()
         self.initialize_ai_clients()
 
     def initialize_ai_clients(self):
         """Initialize AI service clients"""
         try:
-            if settings.GROQ_API_KEY and groq_available:
-                self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
-                print("✅ Groq AI client initialized")
+            if settings.LLM_RECORD_MODE:
+                self.recorder = LLMRecorder(
+                    settings.LLM_RECORD_MODE, settings.LLM_RECORDINGS_PATH, settings.LLM_REPLAY_REALTIME
+                )
+            # Replay needs no real key: every response comes from the recordings file
+            api_key = settings.GROQ_API_KEY or ("replay" if settings.LLM_RECORD_MODE == REPLAY else "")
+            if api_key and groq_available:
+                base_url = settings.GROQ_BASE_URL or None
+                self.groq_client = Groq(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=httpx.Client(transport=SyncRecordingTransport(self.recorder)) if self.recorder else None,
+                )
+                # One pooled client shared by every async request; keep-alive
+                # connections avoid a TLS handshake per completion.
+                limits = httpx.Limits(
+                    max_connections=settings.GROQ_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY_SECONDS,
+                )
+                self.async_http_client = httpx.AsyncClient(
+                    limits=limits,
+                    timeout=httpx.Timeout(settings.GROQ_TIMEOUT_SECONDS, connect=settings.GROQ_CONNECT_TIMEOUT_SECONDS),
+                    transport=(
+                        RecordingTransport(self.recorder, httpx.AsyncHTTPTransport(limits=limits))
+                        if self.recorder else None
+                    ),
+                )
+                self.async_groq_client = AsyncGroq(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=self.async_http_client,
+                    max_retries=settings.GROQ_MAX_RETRIES,
+                )
+                print(f"✅ Groq AI client initialized{f' ({base_url})' if base_url else ''}")
+                if self.recorder:
+                    print(f"🎞️  LLM {settings.LLM_RECORD_MODE} mode: {settings.LLM_RECORDINGS_PATH}")
             else:
                 print("⚠️  No Groq API key found - using fallback responses")
         except Exception as e:
             print(f"⚠️  Groq AI initialization failed: {e}")
 
-    def _call_groq(self, prompt: str, system_prompt: str = None, max_tokens: int = 2000) -> str:
-        """Call Groq LLaMA-3.3-70B model"""
-        if not self.groq_client:
-            return None
+    async def aclose(self):
+        """Release pooled connections held by the async client"""
+        if self.async_http_client is not None:
+            await self.async_http_client.aclose()
+
+    # ─── Low-level calls ──────────────────────────────────────────────────────
 
+    @staticmethod
+    def _build_messages(prompt: str, system_prompt: str = None) -> List[dict]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
 
+    @staticmethod
+    def _extract_json_checked(result: Optional[str]) -> Tuple[Optional[dict], bool]:
+        """(object, repaired): the first JSON object in a model response, and
+        whether truncation had to be repaired to get it"""
+        if not result:
+            return None, False
+        try:
+            json_match = re.search(r'\{.*\}', result, re.DOTALL)
+            if json_match:
+                parsed = json.loads(json_match.group())
+                note_json("ok")
+                return parsed, False
+        except json.JSONDecodeError:
+            pass
+        parser = StreamingJSONParser()
+        parser.feed(result)
+        parsed = parser.finish()
+        note_json("failed" if not parsed else "repaired" if parser.repaired else "ok")
+        return parsed, bool(parsed) and parser.repaired
+
+    @classmethod
+    def _extract_json(cls, result: Optional[str]) -> Optional[dict]:
+        """Pull the first JSON object out of a model response, repairing truncation"""
+        return cls._extract_json_checked(result)[0]
+
+    def _chat_completion(self, messages: List[dict], temperature: float = 0.7, max_tokens: int = 2000) -> Optional[str]:
+        if not self.groq_client:
+            return None
+        started = time.monotonic()
         try:
             response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+                model=GROQ_MODEL,
                 messages=messages,
-                temperature=0.7,
+                temperature=temperature,
                 max_tokens=max_tokens,
             )
+            self._note_usage(response, time.monotonic() - started)
             return response.choices[0].message.content
         except Exception as e:
             print(f"Groq API error: {e}")
+            note_llm_request(time.monotonic() - started, error=True)
             return None
 
-    def generate_workout_plan(self, user_data: dict) -> dict:
-        """Generate a personalized 7-day workout plan using Groq AI"""
-        system_prompt = """You are ArogyaMitra's expert fitness coach. Generate detailed, safe, 
-        personalized workout plans. Always respond with valid JSON only. 
-        Structure workouts with warm-up, main exercises, cool-down."""
-
-        prompt = f"""Generate a complete 7-day workout plan for this user:
-        - Age: {user_data.get('age', 25)}
-        - Gender: {user_data.get('gender', 'Male')}
-        - Height: {user_data.get('height', 170)} cm
-        - Weight: {user_data.get('weight', 70)} kg
-        - Fitness Level: {user_data.get('fitness_level', 'beginner')}
-        - Goal: {user_data.get('fitness_goal', 'general_fitness')}
-        - Workout Location: {user_data.get('workout_place', 'home')}
-        - Available Time: {user_data.get('available_minutes', 30)} minutes/day
-        - Preferred Time: {user_data.get('workout_time', 'morning')}
-        - Medical History: {user_data.get('medical_history', 'None')}
-        - Injuries: {user_data.get('injuries', 'None')}
-        - Health Conditions: {user_data.get('health_conditions', 'None')}
-
-        Return ONLY valid JSON with this structure:
-        {{
-            "plan_title": "...",
-            "plan_description": "...",
-            "weekly_schedule": {{
-                "Monday": {{
-                    "focus": "...",
-                    "duration_minutes": 45,
-                    "time_slot": "6:00 AM - 7:00 AM",
-                    "is_rest": false,
-                    "warmup": {{"description": "...", "duration_minutes": 5}},
-                    "exercises": [
-                        {{
-                            "name": "...",
-                            "sets": 3,
-                            "reps": "12-15",
-                            "rest_seconds": 60,
-                            "description": "...",
-                            "muscle_groups": ["chest"],
-                            "youtube_search": "..."
-                        }}
-                    ],
-                    "cooldown": {{"description": "...", "duration_minutes": 5}}
-                }},
-                "Tuesday": {{}},
-                "Wednesday": {{}},
-                "Thursday": {{}},
-                "Friday": {{}},
-                "Saturday": {{}},
-                "Sunday": {{}}
-            }}
-        }}"""
-
-        result = self._call_groq(prompt, system_prompt, max_tokens=3000)
-        if result:
-            try:
-                # Extract JSON from response
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
+    @staticmethod
+    def _note_usage(response, seconds: float, queue_wait: float = 0.0):
+        usage = getattr(response, "usage", None)
+        note_llm_request(
+            seconds,
+            queue_wait=queue_wait,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
 
-        # Fallback workout plan
-        return self._get_fallback_workout_plan(user_data)
+    @staticmethod
+    def _estimate_tokens(messages: List[dict], max_tokens: int) -> int:
+        """Prompt (~4 chars/token) plus the completion budget, charged to the TPM bucket"""
+        return sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
 
-    def generate_nutrition_plan(self, user_data: dict) -> dict:
-        """Generate a personalized 7-day Indian nutrition plan"""
-        system_prompt = """You are ArogyaMitra's expert nutritionist specializing in Indian cuisine. 
-        Generate balanced, culturally appropriate meal plans. Always respond with valid JSON only."""
+    async def _chat_completion_async(
+        self,
+        messages: List[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Optional[str]:
+        if not self.async_groq_client:
+            return None
+        key = fingerprint(GROQ_MODEL, messages, temperature, max_tokens)
+        return await self.single_flight.do(
+            key, lambda: self._execute_completion_async(messages, temperature, max_tokens, timeout, priority)
+        )
+
+    async def _execute_completion_async(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        timeout: Optional[float],
+        priority: Priority,
+    ) -> Optional[str]:
+        timeout = timeout or settings.GROQ_TIMEOUT_SECONDS
+        started = time.monotonic()
+        try:
+            async with llm_scheduler.admit(priority, self._estimate_tokens(messages, max_tokens)) as ticket:
+                call_timeout = ticket.timeout(timeout)
+                response = await asyncio.wait_for(
+                    self.async_groq_client.chat.completions.create(
+                        model=GROQ_MODEL,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        timeout=call_timeout,
+                    ),
+                    timeout=call_timeout,
+                )
+            self._note_usage(response, time.monotonic() - ticket.started, ticket.queue_wait)
+            return response.choices[0].message.content
+        except AdmissionRejected as e:
+            print(f"Groq call not admitted: {e.reason}")
+        except asyncio.TimeoutError:
+            print(f"Groq API timeout after {timeout}s")
+        except Exception as e:
+            print(f"Groq API error: {e}")
+        note_llm_request(time.monotonic() - started, error=True)
+        return None
+
+    async def _stream_completion_async(
+        self,
+        messages: List[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        outcome: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """Yield completion tokens as Groq produces them; yields nothing on failure.
+        outcome["complete"] is set once the stream has finished without error."""
+        if not self.async_groq_client:
+            return
+        started = time.monotonic()
+        streamed_chars = 0
+        try:
+            async with llm_scheduler.admit(priority, self._estimate_tokens(messages, max_tokens)) as ticket:
+                stream = await self.async_groq_client.chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=ticket.timeout(timeout or settings.GROQ_TIMEOUT_SECONDS),
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        ticket.mark_first_token()
+                        streamed_chars += len(token)
+                        yield token
+            # Streams carry no usage block, so tokens are estimated at ~4 chars each
+            note_llm_request(
+                time.monotonic() - ticket.started,
+                queue_wait=ticket.queue_wait,
+                prompt_tokens=self._estimate_tokens(messages, 0),
+                completion_tokens=streamed_chars // 4,
+            )
+            if outcome is not None:
+                outcome["complete"] = True
+            return
+        except AdmissionRejected as e:
+            print(f"Groq stream not admitted: {e.reason}")
+        except Exception as e:
+            print(f"Groq stream error: {e}")
+        note_llm_request(time.monotonic() - started, error=True)
+
+    def _call_groq(self, prompt: str, system_prompt: str = None, max_tokens: int = 2000) -> str:
+        """Call Groq LLaMA-3.3-70B model"""
+        return self._chat_completion(self._build_messages(prompt, system_prompt), max_tokens=max_tokens)
+
+    async def _call_groq_async(
+        self,
+        prompt: str,
+        system_prompt: str = None,
+        max_tokens: int = 2000,
+        timeout: Optional[float] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Optional[str]:
+        """Call Groq LLaMA-3.3-70B model without blocking the event loop"""
+        return await self._chat_completion_async(
+            self._build_messages(prompt, system_prompt), max_tokens=max_tokens, timeout=timeout, priority=priority
+        )
 
+    # ─── Prompt builders ──────────────────────────────────────────────────────
+    # Static instructions and schemas live in the compiled templates'
+    # system prefix; these only gather the per-user fields
+
+    @staticmethod
+    def _workout_fields(user_data: dict) -> dict:
+        return {
+            "age": user_data.get('age', 25),
+            "gender": user_data.get('gender', 'Male'),
+            "height": user_data.get('height', 170),
+            "weight": user_data.get('weight', 70),
+            "fitness_level": user_data.get('fitness_level', 'beginner'),
+            "fitness_goal": user_data.get('fitness_goal', 'general_fitness'),
+            "workout_place": user_data.get('workout_place') or user_data.get('workout_preference', 'home'),
+            "available_minutes": user_data.get('available_minutes', 30),
+            "workout_time": user_data.get('workout_time', 'morning'),
+            "medical_history": user_data.get('medical_history', 'None'),
+            "injuries": user_data.get('injuries', 'None'),
+            "health_conditions": user_data.get('health_conditions', 'None'),
+        }
+
+    @staticmethod
+    def _nutrition_fields(user_data: dict) -> dict:
         bmi = None
         if user_data.get('height') and user_data.get('weight'):
             h = user_data['height'] / 100
@@ -148,469 +349,686 @@ class ArogyaMitraAgent:
         elif user_data.get('fitness_goal') == 'muscle_gain':
             calorie_target = 2200
 
-        prompt = f"""Generate a 7-day traditional Indian nutrition plan:
-        - Age: {user_data.get('age', 25)}, Gender: {user_data.get('gender', 'Male')}
-        - Weight: {user_data.get('weight', 70)} kg, BMI: {bmi}
-        - Goal: {user_data.get('fitness_goal', 'maintenance')}
-        - Diet Type: {user_data.get('diet_preference', 'vegetarian')}
-        - Target Calories: {calorie_target}
-        - Allergies: {user_data.get('allergies', 'None')}
-
-        Return ONLY valid JSON with this structure:
-        {{
-            "plan_title": "...",
-            "total_calories": {calorie_target},
-            "weekly_meals": {{
-                "Monday": {{
-                    "breakfast": {{"name": "Dosa with Sambar", "calories": 350, "protein_g": 12, "carbs_g": 55, "fat_g": 8, "ingredients": ["Dosa", "Sambar"], "meal_time": "7:00 AM"}},
-                    "lunch": {{"name": "...", "calories": 450, "protein_g": 20, "carbs_g": 65, "fat_g": 12, "ingredients": [], "meal_time": "12:30 PM"}},
-                    "dinner": {{"name": "...", "calories": 400, "protein_g": 18, "carbs_g": 50, "fat_g": 10, "ingredients": [], "meal_time": "7:30 PM"}},
-                    "snacks": [{{"name": "...", "calories": 100, "meal_time": ""}}]
-                }}
-            }},
-            "grocery_list": [{{"item": "Brown Rice", "quantity": "500g", "weekly_count": 2}}],
-            "nutritional_tips": ["..."]
-        }}"""
-
-        result = self._call_groq(prompt, system_prompt, max_tokens=3000)
-        if result:
-            try:
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
+        return {
+            "age": user_data.get('age', 25),
+            "gender": user_data.get('gender', 'Male'),
+            "weight": user_data.get('weight', 70),
+            "bmi": bmi,
+            "fitness_goal": user_data.get('fitness_goal', 'maintenance'),
+            "diet_preference": user_data.get('diet_preference', 'vegetarian'),
+            "calorie_target": calorie_target,
+            "allergies": user_data.get('allergies', 'None'),
+        }
+
+    def _workout_plan_prompt(self, user_data: dict) -> tuple:
+        return prompts.WORKOUT_PLAN.render(**self._workout_fields(user_data))
+
+    def _nutrition_plan_prompt(self, user_data: dict) -> tuple:
+        return prompts.NUTRITION_PLAN.render(**self._nutrition_fields(user_data))
+
+    def _health_assessment_prompt(self, user_data: dict) -> tuple:
+        return prompts.HEALTH_ASSESSMENT.render(profile=json.dumps(user_data, default=str))
+
+    def _coach_messages(
+        self, message: str, user_data: dict, conversation_history: List[dict] = None, summary: str = None
+    ) -> List[dict]:
+        system_prompt, profile = prompts.COACH.render(
+            full_name=user_data.get('full_name', 'User'),
+            age=user_data.get('age', 'Unknown'),
+            gender=user_data.get('gender', 'Unknown'),
+            fitness_level=user_data.get('fitness_level', 'beginner'),
+            fitness_goal=user_data.get('fitness_goal', 'general fitness'),
+            total_workouts=user_data.get('total_workouts', 0),
+        )
+
+        messages = [{"role": "system", "content": system_prompt}, {"role": "system", "content": profile}]
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+
+        # Recent turns, already sized to the history token budget by chat_memory;
+        # anything older is in the summary
+        for msg in conversation_history or []:
+            messages.append({"role": msg["role"], "content": msg["content"]})
+
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _aromi_messages(self, message: str, user_data: dict) -> List[dict]:
+        system_prompt, profile = prompts.AROMI.render(
+            full_name=user_data.get('full_name', 'Friend'),
+            fitness_goal=user_data.get('fitness_goal', 'General Fitness'),
+            fitness_level=user_data.get('fitness_level', 'Beginner'),
+        )
+
+        user_context = f"User message: {message}"
+        if "travel" in message.lower():
+            user_context += "\n[Context: User is traveling - suggest travel-friendly exercises]"
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": profile},
+            {"role": "user", "content": user_context},
+        ]
+
+    def _adjust_plan_prompt(self, reason: str, duration_days: int, current_plan: dict) -> tuple:
+        return prompts.ADJUST_PLAN.render(
+            reason=reason,
+            duration_days=duration_days,
+            plan_summary=json.dumps(current_plan, indent=2)[:500],
+        )
+
+    def _day_plan_prompt(self, kind: str, user_data: dict, days: List[str], current_plan: dict, reason: str = None) -> tuple:
+        """Prompt for a few days only; the rest of the week is summarised for balance"""
+        container = PLAN_DAY_CONTAINERS[kind]
+        other_days = {
+            day: data for day, data in (current_plan.get(container) or {}).items()
+            if day not in days and isinstance(data, dict)
+        }
+        shared = {
+            "days": ", ".join(days),
+            "reason": reason or 'User asked for a fresh take on these days',
+        }
+        if kind == "workout":
+            week = ", ".join(f"{day}: {data.get('focus', 'Rest')}" for day, data in other_days.items())
+            return prompts.WORKOUT_DAYS.render(**self._workout_fields(user_data), **shared, week=week or 'None')
+        week = ", ".join(
+            f"{day}: {(data.get('lunch') or {}).get('name') or data.get('theme', '...')}"
+            for day, data in other_days.items()
+        )
+        fields = {
+            **self._nutrition_fields(user_data),
+            "calorie_target": current_plan.get('total_calories') or user_data.get('target_calories') or 1800,
+        }
+        return prompts.NUTRITION_DAYS.render(**fields, **shared, week=week or 'None')
+
+    def _outline_prompt(self, kind: str, user_data: dict) -> tuple:
+        """Short week-at-a-glance prompt; each day's details are generated separately"""
+        if kind == "workout":
+            return prompts.WORKOUT_OUTLINE.render(**self._workout_fields(user_data))
+        return prompts.NUTRITION_OUTLINE.render(**self._nutrition_fields(user_data))
+
+    def _progress_prompt(self, user_data: dict, progress_data: dict) -> tuple:
+        return prompts.PROGRESS.render(
+            full_name=user_data.get('full_name'),
+            fitness_goal=user_data.get('fitness_goal'),
+            progress=json.dumps(progress_data, indent=2, default=str)[:500],
+        )
+
+    # ─── Local routing ────────────────────────────────────────────────────────
+
+    def _local_reply(self, kind: str, message: str, user_data: dict, in_conversation: bool = False) -> Optional[str]:
+        """Answer without an LLM call when possible: canned replies for greetings
+        and thanks, a personalised FAQ answer for confident matches, then an
+        earlier answer to a rephrased question from a similar profile. Messages
+        inside an ongoing conversation never take the semantic cache: the
+        answer depends on that conversation, not just on the message"""
+        if settings.INTENT_LOCAL_ROUTING and intent_classifier.route(message) == "local":
+            note_source("local")
+            return self._canned_reply(kind, message)
+        if self._needs_llm(message):
+            return None
+        if settings.FAQ_LOCAL_ANSWERS:
+            answer = faq_index.answer(message, user_data or {}, settings.FAQ_MIN_CONFIDENCE)
+            note_cache("faq", answer is not None)
+            if answer:
+                note_source("local")
+                return answer
+        if settings.SEMANTIC_CACHE_ENABLED and not in_conversation:
+            cached = semantic_cache.get(kind, message, user_data or {})
+            note_cache("semantic_cache", cached is not None)
+            return cached
+        return None
+
+    def _remember_reply(
+        self, kind: str, message: str, user_data: dict, response: Optional[str], in_conversation: bool = False
+    ):
+        """Keep an LLM answer for the semantic cache, unless it was shaped by the
+        user's own conversation (history or summary) and so is not for anyone else"""
+        if response and settings.SEMANTIC_CACHE_ENABLED and not in_conversation and not self._needs_llm(message):
+            semantic_cache.set(kind, message, user_data or {}, response)
+
+    @staticmethod
+    def _needs_llm(message: str) -> bool:
+        """Medical questions are always answered fresh, never from local data"""
+        return not LLM_ONLY_INTENTS.isdisjoint(intent_classifier.classify(message).scores)
+
+    # ─── Local plan engine ────────────────────────────────────────────────────
+
+    def _get_local_plan(self, kind: str, user_data: dict) -> Optional[dict]:
+        """Serve common profiles from the rule-based engine without calling Groq"""
+        if not settings.PLAN_ENGINE_PRIMARY or not plan_engine.is_common_profile(user_data):
+            return None
+        note_source("local")
+        return plan_variants.get(kind, user_data)
+
+    # ─── Plan cache ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _get_cached_plan(kind: str, user_data: dict) -> Optional[dict]:
+        if not settings.PLAN_CACHE_ENABLED:
+            return None
+        cached = plan_cache.get(kind, user_data)
+        note_cache("plan_cache", cached is not None)
+        return cached
+
+    @staticmethod
+    async def _get_cached_plan_async(kind: str, user_data: dict) -> Optional[dict]:
+        if not settings.PLAN_CACHE_ENABLED:
+            return None
+        cached = await plan_cache.get_async(kind, user_data)
+        note_cache("plan_cache", cached is not None)
+        return cached
+
+    @staticmethod
+    def _cache_plan(kind: str, user_data: dict, plan: dict):
+        # Only model output is cached; fallbacks are cheap and should be
+        # replaced by a real plan as soon as Groq is reachable again.
+        if settings.PLAN_CACHE_ENABLED:
+            plan_cache.set(kind, user_data, plan)
+
+    @staticmethod
+    async def _cache_plan_async(kind: str, user_data: dict, plan: dict):
+        if settings.PLAN_CACHE_ENABLED:
+            await plan_cache.set_async(kind, user_data, plan)
 
+    # ─── Partial plans ────────────────────────────────────────────────────────
+
+    def _complete_plan(self, kind: str, plan: dict, user_data: dict) -> tuple:
+        """Normalise a model plan to the canonical schema and fill days missing from
+        a truncated one; returns (plan, was_complete)"""
+        container = PLAN_DAY_CONTAINERS[kind]
+        try:
+            plan = normalize_plan(kind, plan)
+        except ValidationError as e:
+            print(f"⚠️  {kind} plan did not fit the schema, using the fallback plan: {e.error_count()} errors")
+            return self._fallback_plan(kind, user_data), False
+        days = plan[container]
+        missing = [day for day in plan_engine.DAYS_ORDER if not days.get(day)]
+        if not missing:
+            return plan, True
+        fallback = self._fallback_plan(kind, user_data)
+        note_source("partial")
+        days = {day: days.get(day) or fallback[container][day] for day in plan_engine.DAYS_ORDER}
+        return {**plan, container: days, "filled_days": missing}, False
+
+    def _fallback_plan(self, kind: str, user_data: dict) -> dict:
+        if kind == "workout":
+            return self._get_fallback_workout_plan(user_data)
         return self._get_fallback_nutrition_plan(user_data)
 
-    def analyze_health_assessment(self, user_data: dict) -> dict:
-        """Analyze health assessment data and provide insights"""
-        system_prompt = "You are an expert health analyst. Provide insights based on user data."
-        prompt = f"Analyze this health profile: {json.dumps(user_data)}. Return JSON with summary, risk_factors, and recommendations."
-        
-        result = self._call_groq(prompt, system_prompt)
-        if result:
-            try:
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
-        
+    def _parse_plan(self, kind: str, result: Optional[str], user_data: dict) -> tuple:
+        """(plan, cacheable) from a model reply; plan is None when nothing parsed.
+        Repaired (truncated) replies are served but never cached, like streamed ones"""
+        plan, repaired = self._extract_json_checked(result)
+        if not plan:
+            return None, False
+        plan, complete = self._complete_plan(kind, plan, user_data)
+        return plan, complete and not repaired
+
+    def _plan_from_result(self, kind: str, result: Optional[str], user_data: dict) -> Optional[dict]:
+        plan, cacheable = self._parse_plan(kind, result, user_data)
+        if cacheable:
+            self._cache_plan(kind, user_data, plan)
+        return plan
+
+    async def _plan_from_result_async(self, kind: str, result: Optional[str], user_data: dict) -> Optional[dict]:
+        plan, cacheable = self._parse_plan(kind, result, user_data)
+        if cacheable:
+            await self._cache_plan_async(kind, user_data, plan)
+        return plan
+
+    @staticmethod
+    def _default_health_analysis() -> dict:
+        note_source("fallback")
         return {
             "summary": "Profile analyzed. Ready for fitness plan.",
             "risk_factors": [],
             "recommendations": ["Stay consistent", "Eat healthy"]
         }
 
-    def chat_with_coach(self, message: str, user_data: dict, conversation_history: List[dict] = None) -> str:
-        """AI Coach chat - personalized fitness guidance"""
-        system_prompt = f"""You are ArogyaMitra's AI Fitness Coach. You are warm, motivating, and knowledgeable.
-
-        User Profile:
-        - Name: {user_data.get('full_name', 'User')}
-        - Age: {user_data.get('age', 'Unknown')}, Gender: {user_data.get('gender', 'Unknown')}
-        - Fitness Level: {user_data.get('fitness_level', 'beginner')}
-        - Goal: {user_data.get('fitness_goal', 'general fitness')}
-        - Total Workouts: {user_data.get('total_workouts', 0)}
+    @staticmethod
+    def _default_progress_analysis() -> dict:
+        note_source("fallback")
+        return {
+            "insights": ["Keep tracking your workouts consistently"],
+            "achievements": [],
+            "recommendations": ["Complete your daily workout for best results"],
+            "motivational_message": "Every step counts! Keep going! 💪"
+        }
 
-        Provide personalized fitness advice. Be encouraging, use emojis sparingly. Keep responses concise."""
+    @staticmethod
+    def _unchanged_plan(reason: str, current_plan: dict) -> dict:
+        note_source("fallback")
+        return {"message": f"Plan adjusted for {reason}", "adjusted_plan": current_plan}
 
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+    # ─── Synchronous API ──────────────────────────────────────────────────────
 
-        # Add conversation history
-        if conversation_history:
-            for msg in conversation_history[-10:]:  # Last 10 messages
-                messages.append({"role": msg["role"], "content": msg["content"]})
+    @instrumented("generate_workout_plan")
+    def generate_workout_plan(self, user_data: dict) -> dict:
+        """Generate a personalized 7-day workout plan using Groq AI"""
+        local = self._get_local_plan("workout", user_data)
+        if local:
+            return local
+        cached = self._get_cached_plan("workout", user_data)
+        if cached:
+            return cached
+        system_prompt, prompt = self._workout_plan_prompt(user_data)
+        plan = self._plan_from_result("workout", self._call_groq(prompt, system_prompt, max_tokens=3000), user_data)
+        return plan or self._get_fallback_workout_plan(user_data)
 
-        messages.append({"role": "user", "content": message})
+    @instrumented("generate_nutrition_plan")
+    def generate_nutrition_plan(self, user_data: dict) -> dict:
+        """Generate a personalized 7-day Indian nutrition plan"""
+        local = self._get_local_plan("nutrition", user_data)
+        if local:
+            return local
+        cached = self._get_cached_plan("nutrition", user_data)
+        if cached:
+            return cached
+        system_prompt, prompt = self._nutrition_plan_prompt(user_data)
+        plan = self._plan_from_result("nutrition", self._call_groq(prompt, system_prompt, max_tokens=3000), user_data)
+        return plan or self._get_fallback_nutrition_plan(user_data)
 
-        if self.groq_client:
-            try:
-                response = self.groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=messages,
-                    temperature=0.8,
-                    max_tokens=800,
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                print(f"Groq chat error: {e}")
+    @instrumented("analyze_health_assessment")
+    def analyze_health_assessment(self, user_data: dict) -> dict:
+        """Analyze health assessment data and provide insights"""
+        system_prompt, prompt = self._health_assessment_prompt(user_data)
+        analysis = self._extract_json(self._call_groq(prompt, system_prompt))
+        return analysis or self._default_health_analysis()
 
-        return self._get_fallback_coach_response(message)
+    @instrumented("chat_with_coach")
+    def chat_with_coach(
+        self, message: str, user_data: dict, conversation_history: List[dict] = None, summary: str = None
+    ) -> str:
+        """AI Coach chat - personalized fitness guidance"""
+        local = self._local_reply("coach", message, user_data, bool(conversation_history or summary))
+        if local:
+            return local
+        messages = self._coach_messages(message, user_data, conversation_history, summary)
+        response = self._chat_completion(messages, temperature=0.8, max_tokens=800)
+        self._remember_reply("coach", message, user_data, response, bool(conversation_history or summary))
+        return response or self._get_fallback_coach_response(message)
 
     # Alias for router compatibility
     coach_chat = chat_with_coach
 
-    def chat_with_aromi(self, message: str, user_data: dict, workout_plan: dict = None, nutrition_plan: dict = None) -> str:
+    @instrumented("chat_with_aromi")
+    def chat_with_aromi(
+        self,
+        message: str,
+        user_data: dict,
+        workout_plan: dict = None,
+        nutrition_plan: dict = None,
+        conversation_history: List[dict] = None,
+        user_status: str = None,
+    ) -> str:
         """AROMI AI Coach - adaptive real-time wellness companion"""
-        system_prompt = f"""You are AROMI, ArogyaMitra's personal health companion. You are friendly, warm and adaptive.
-        
-        🙏 Namaste! You speak naturally and use Indian cultural references when appropriate.
-        
-        User: {user_data.get('full_name', 'Friend')}
-        Fitness Goal: {user_data.get('fitness_goal', 'General Fitness')}
-        Fitness Level: {user_data.get('fitness_level', 'Beginner')}
-        
-        You can access their workout and nutrition plans and adapt advice dynamically.
-        If user mentions traveling, adjust workout suggestions to travel-friendly exercises.
-        If user mentions injuries/tiredness, suggest rest and recovery.
-        Be concise, warm, and motivating. Use emojis appropriately."""
-
-        user_context = f"User message: {message}"
-        if "travel" in message.lower():
-            user_context += "\n[Context: User is traveling - suggest travel-friendly exercises]"
-
-        if self.groq_client:
-            try:
-                response = self.groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_context}
-                    ],
-                    temperature=0.8,
-                    max_tokens=600,
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                print(f"AROMI chat error: {e}")
-
-        return self._get_fallback_aromi_response(message)
+        local = self._local_reply("aromi", message, user_data, bool(conversation_history))
+        if local:
+            return local
+        messages = self._aromi_messages(message, user_data)
+        response = self._chat_completion(messages, temperature=0.8, max_tokens=600)
+        self._remember_reply("aromi", message, user_data, response, bool(conversation_history))
+        return response or self._get_fallback_aromi_response(message)
 
     # Alias for router compatibility
     aromi_chat = chat_with_aromi
 
+    @instrumented("adjust_plan_dynamically")
     def adjust_plan_dynamically(self, reason: str, duration_days: int, current_plan: dict, user_data: dict) -> dict:
         """Dynamically adjust workout plan based on life changes"""
-        system_prompt = """You are ArogyaMitra's adaptive fitness AI. Modify workout plans dynamically based on user circumstances."""
-
-        prompt = f"""The user needs their plan adjusted:
-        Reason: {reason}
-        Duration: {duration_days} days
-        Current Plan Summary: {json.dumps(current_plan, indent=2)[:500]}
-        
-        Create an adjusted plan that accommodates their situation.
-        Return JSON with adjusted_plan and recommendations."""
-
-        result = self._call_groq(prompt, system_prompt)
-        if result:
-            try:
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
-
-        return {"message": f"Plan adjusted for {reason}", "adjusted_plan": current_plan}
+        system_prompt, prompt = self._adjust_plan_prompt(reason, duration_days, current_plan)
+        adjusted = self._extract_json(self._call_groq(prompt, system_prompt))
+        return adjusted or self._unchanged_plan(reason, current_plan)
 
+    @instrumented("analyze_progress")
     def analyze_progress(self, user_data: dict, progress_data: dict) -> dict:
         """Analyze user progress and provide insights"""
-        prompt = f"""Analyze this fitness progress and provide insights:
-        User: {user_data.get('full_name')}, Goal: {user_data.get('fitness_goal')}
-        Progress Data: {json.dumps(progress_data, indent=2)[:500]}
-        
-        Return JSON with: insights, achievements, recommendations, motivational_message"""
-
-        result = self._call_groq(prompt)
-        if result:
-            try:
-                json_match = re.search(r'\{.*\}', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
+        system_prompt, prompt = self._progress_prompt(user_data, progress_data)
+        analysis = self._extract_json(self._call_groq(prompt, system_prompt))
+        return analysis or self._default_progress_analysis()
 
-        return {
-            "insights": ["Keep tracking your workouts consistently"],
-            "achievements": [],
-            "recommendations": ["Complete your daily workout for best results"],
-            "motivational_message": "Every step counts! Keep going! 💪"
+    # ─── Async API ────────────────────────────────────────────────────────────
+
+    @instrumented("generate_workout_plan")
+    async def generate_workout_plan_async(self, user_data: dict) -> dict:
+        """Async variant of generate_workout_plan"""
+        local = self._get_local_plan("workout", user_data)
+        if local:
+            return local
+        cached = await self._get_cached_plan_async("workout", user_data)
+        if cached:
+            return cached
+        if settings.PLAN_FANOUT_ENABLED:
+            plan = await self._generate_plan_fanout_async("workout", user_data)
+            return plan or self._get_fallback_workout_plan(user_data)
+        system_prompt, prompt = self._workout_plan_prompt(user_data)
+        result = await self._call_groq_async(
+            prompt, system_prompt, max_tokens=3000, timeout=settings.GROQ_PLAN_TIMEOUT_SECONDS, priority=Priority.BULK
+        )
+        plan = await self._plan_from_result_async("workout", result, user_data)
+        return plan or self._get_fallback_workout_plan(user_data)
+
+    @instrumented("generate_nutrition_plan")
+    async def generate_nutrition_plan_async(self, user_data: dict) -> dict:
+        """Async variant of generate_nutrition_plan"""
+        local = self._get_local_plan("nutrition", user_data)
+        if local:
+            return local
+        cached = await self._get_cached_plan_async("nutrition", user_data)
+        if cached:
+            return cached
+        if settings.PLAN_FANOUT_ENABLED:
+            plan = await self._generate_plan_fanout_async("nutrition", user_data)
+            return plan or self._get_fallback_nutrition_plan(user_data)
+        system_prompt, prompt = self._nutrition_plan_prompt(user_data)
+        result = await self._call_groq_async(
+            prompt, system_prompt, max_tokens=3000, timeout=settings.GROQ_PLAN_TIMEOUT_SECONDS, priority=Priority.BULK
+        )
+        plan = await self._plan_from_result_async("nutrition", result, user_data)
+        return plan or self._get_fallback_nutrition_plan(user_data)
+
+    @instrumented("analyze_health_assessment")
+    async def analyze_health_assessment_async(self, user_data: dict) -> dict:
+        """Async variant of analyze_health_assessment"""
+        system_prompt, prompt = self._health_assessment_prompt(user_data)
+        result = await self._call_groq_async(prompt, system_prompt)
+        return self._extract_json(result) or self._default_health_analysis()
+
+    @instrumented("chat_with_coach")
+    async def chat_with_coach_async(
+        self, message: str, user_data: dict, conversation_history: List[dict] = None, summary: str = None
+    ) -> str:
+        """Async variant of chat_with_coach"""
+        local = self._local_reply("coach", message, user_data, bool(conversation_history or summary))
+        if local:
+            return local
+        messages = self._coach_messages(message, user_data, conversation_history, summary)
+        response = await self._chat_completion_async(
+            messages, temperature=0.8, max_tokens=800, timeout=settings.GROQ_CHAT_TIMEOUT_SECONDS
+        )
+        self._remember_reply("coach", message, user_data, response, bool(conversation_history or summary))
+        return response or self._get_fallback_coach_response(message)
+
+    coach_chat_async = chat_with_coach_async
+
+    @instrumented("chat_with_aromi")
+    async def chat_with_aromi_async(
+        self,
+        message: str,
+        user_data: dict,
+        workout_plan: dict = None,
+        nutrition_plan: dict = None,
+        conversation_history: List[dict] = None,
+        user_status: str = None,
+    ) -> str:
+        """Async variant of chat_with_aromi"""
+        local = self._local_reply("aromi", message, user_data, bool(conversation_history))
+        if local:
+            return local
+        messages = self._aromi_messages(message, user_data)
+        response = await self._chat_completion_async(
+            messages, temperature=0.8, max_tokens=600, timeout=settings.GROQ_CHAT_TIMEOUT_SECONDS
+        )
+        self._remember_reply("aromi", message, user_data, response, bool(conversation_history))
+        return response or self._get_fallback_aromi_response(message)
+
+    aromi_chat_async = chat_with_aromi_async
+
+    @instrumented("stream_chat_with_coach")
+    async def stream_chat_with_coach(
+        self, message: str, user_data: dict, conversation_history: List[dict] = None, summary: str = None
+    ) -> AsyncIterator[str]:
+        """Stream the AI Coach reply token by token"""
+        local = self._local_reply("coach", message, user_data, bool(conversation_history or summary))
+        if local:
+            yield local
+            return
+        messages = self._coach_messages(message, user_data, conversation_history, summary)
+        tokens, outcome = [], {}
+        async for token in self._stream_completion_async(
+            messages, temperature=0.8, max_tokens=800, timeout=settings.GROQ_CHAT_TIMEOUT_SECONDS, outcome=outcome
+        ):
+            tokens.append(token)
+            yield token
+        if outcome.get("complete"):
+            self._remember_reply("coach", message, user_data, "".join(tokens), bool(conversation_history or summary))
+        if not tokens:
+            yield self._get_fallback_coach_response(message)
+
+    @instrumented("stream_chat_with_aromi")
+    async def stream_chat_with_aromi(
+        self,
+        message: str,
+        user_data: dict,
+        conversation_history: List[dict] = None,
+        user_status: str = None,
+    ) -> AsyncIterator[str]:
+        """Stream the AROMI reply token by token"""
+        local = self._local_reply("aromi", message, user_data, bool(conversation_history))
+        if local:
+            yield local
+            return
+        messages = self._aromi_messages(message, user_data)
+        tokens, outcome = [], {}
+        async for token in self._stream_completion_async(
+            messages, temperature=0.8, max_tokens=600, timeout=settings.GROQ_CHAT_TIMEOUT_SECONDS, outcome=outcome
+        ):
+            tokens.append(token)
+            yield token
+        if outcome.get("complete"):
+            self._remember_reply("aromi", message, user_data, "".join(tokens), bool(conversation_history))
+        if not tokens:
+            yield self._get_fallback_aromi_response(message)
+
+    @instrumented("stream_plan")
+    async def stream_plan_async(self, kind: str, user_data: dict, ready_plan: Optional[dict] = None) -> AsyncIterator[dict]:
+        """Generate a workout or nutrition plan, yielding each day as soon as it is parsed
+
+        Yields {"type": "day", "day": ..., "data": ...} events followed by one
+        {"type": "plan", "plan": ...} event carrying the complete plan. A
+        ready_plan (e.g. a claimed speculative plan) is streamed out as is.
+        """
+        container = PLAN_DAY_CONTAINERS[kind]
+        plan = (
+            ready_plan
+            or self._get_local_plan(kind, user_data)
+            or await self._get_cached_plan_async(kind, user_data)
+        )
+        emitted = set()
+        if not plan:
+            system_prompt, prompt = (
+                self._workout_plan_prompt(user_data) if kind == "workout" else self._nutrition_plan_prompt(user_data)
+            )
+            parser = StreamingJSONParser()
+            received = False
+            async for token in self._stream_completion_async(
+                self._build_messages(prompt, system_prompt),
+                max_tokens=3000,
+                timeout=settings.GROQ_PLAN_TIMEOUT_SECONDS,
+                priority=Priority.BULK,
+            ):
+                received = True
+                for day, data in parser.feed(token):
+                    try:
+                        data = normalize_day(kind, data)
+                    except ValidationError:
+                        continue  # sent with the completed (or fallback) plan instead
+                    emitted.add(day)
+                    yield {"type": "day", "day": day, "data": data}
+            plan = parser.finish()
+            if received:
+                note_json("failed" if not plan else "repaired" if parser.repaired else "ok")
+            if plan:
+                plan, complete = self._complete_plan(kind, plan, user_data)
+                if complete and not parser.repaired:
+                    await self._cache_plan_async(kind, user_data, plan)
+            else:
+                plan = self._fallback_plan(kind, user_data)
+
+        days = plan.get(container)
+        if isinstance(days, dict):
+            for day, data in days.items():
+                if day not in emitted:
+                    yield {"type": "day", "day": day, "data": data}
+        yield {"type": "plan", "plan": plan}
+
+    @instrumented("summarize_conversation")
+    async def summarize_conversation_async(self, previous_summary: str, messages: List[dict], max_tokens: int = 300) -> str:
+        """Fold older chat turns into a running summary"""
+        transcript = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+        system_prompt, prompt = prompts.SUMMARY.render(
+            previous_summary=previous_summary or "(none)", transcript=transcript, max_words=max_tokens // 2
+        )
+        result = await self._call_groq_async(prompt, system_prompt, max_tokens=max_tokens, priority=Priority.BULK)
+        return (result or "").strip() or self._extractive_summary(previous_summary, messages, max_tokens)
+
+    @staticmethod
+    def _extractive_summary(previous_summary: str, messages: List[dict], max_tokens: int) -> str:
+        """Local summary used when Groq is unavailable: keep what the user asked"""
+        note_source("fallback")
+        points = [previous_summary] if previous_summary else []
+        for msg in messages:
+            if msg.get("role") == "user" and msg.get("content"):
+                first_sentence = re.split(r"(?<=[.!?])\s", msg["content"].strip(), maxsplit=1)[0]
+                points.append(f"User asked: {first_sentence[:160]}")
+        summary = " | ".join(points)
+        max_chars = max_tokens * 4
+        return summary if len(summary) <= max_chars else "…" + summary[-max_chars:]
+
+    @instrumented("regenerate_days")
+    async def regenerate_days_async(
+        self, kind: str, user_data: dict, current_plan: dict, days: List[str], reason: str = None
+    ) -> Dict[str, dict]:
+        """Rebuild just the given days of a plan; returns {day: day_data}"""
+        container = PLAN_DAY_CONTAINERS[kind]
+        local = None if reason else self._get_local_plan(kind, user_data)
+        generated = {}
+        if local is None:
+            generated = await self._generate_days_async(kind, user_data, current_plan or {}, days, reason)
+        missing = [day for day in days if not isinstance(generated.get(day), dict)]
+        if missing:
+            engine_days = (local or self._fallback_plan(kind, user_data))[container]
+            generated.update({day: engine_days[day] for day in missing})
+        return {day: generated[day] for day in days}
+
+    async def _generate_days_async(
+        self,
+        kind: str,
+        user_data: dict,
+        current_plan: dict,
+        days: List[str],
+        reason: str = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict[str, dict]:
+        """Model output for the given days only; days it failed to produce are absent"""
+        system_prompt, prompt = self._day_plan_prompt(kind, user_data, days, current_plan, reason)
+        result = await self._call_groq_async(
+            prompt,
+            system_prompt,
+            # Roughly a seventh of the full-week budget per day
+            max_tokens=min(3000, 200 + 450 * len(days)),
+            timeout=settings.GROQ_PLAN_TIMEOUT_SECONDS,
+            priority=priority,
+        )
+        try:
+            generated = normalize_days(kind, (self._extract_json(result) or {}).get(PLAN_DAY_CONTAINERS[kind]) or {})
+        except ValidationError as e:
+            print(f"⚠️  Generated {kind} days did not fit the schema: {e.error_count()} errors")
+            return {}
+        return {day: generated[day] for day in days if day in generated}
+
+    async def _generate_plan_fanout_async(self, kind: str, user_data: dict) -> Optional[dict]:
+        """Outline the week in one short call, then write every day in parallel
+
+        Wall time is roughly outline + one day instead of one long sequential
+        completion. Returns None when even the outline could not be produced.
+        """
+        container = PLAN_DAY_CONTAINERS[kind]
+        system_prompt, prompt = self._outline_prompt(kind, user_data)
+        outline = self._extract_json(await self._call_groq_async(
+            prompt, system_prompt, max_tokens=500, timeout=settings.GROQ_PLAN_TIMEOUT_SECONDS, priority=Priority.BULK
+        ))
+        if not outline or not isinstance(outline.get("days"), dict):
+            return None
+        outline_days = {
+            day: outline["days"][day] for day in plan_engine.DAYS_ORDER if isinstance(outline["days"].get(day), dict)
         }
+        skeleton = {**outline, container: outline_days}
+        skeleton.pop("days")
+
+        semaphore = asyncio.Semaphore(settings.PLAN_FANOUT_CONCURRENCY)
+
+        async def write_day(day: str) -> Dict[str, dict]:
+            planned = outline_days.get(day, {})
+            if kind == "workout" and planned.get("is_rest"):
+                return {day: {"focus": planned.get("focus") or "Rest Day", "is_rest": True,
+                              "duration_minutes": 0, "exercises": []}}
+            label = planned.get("focus") or planned.get("theme") or "a balanced day"
+            try:
+                async with semaphore:
+                    return await self._generate_days_async(
+                        kind, user_data, skeleton, [day], f"Follow the weekly outline: {day} is {label}", Priority.BULK
+                    )
+            except Exception as e:
+                # One failed day must not sink the week; _complete_plan fills it in
+                print(f"⚠️  Fan-out {kind} day {day} failed: {e}")
+                return {}
+
+        days: Dict[str, dict] = {}
+        for generated in await asyncio.gather(*(write_day(day) for day in plan_engine.DAYS_ORDER)):
+            days.update(generated)
+        plan, complete = self._complete_plan(kind, {**skeleton, container: days}, user_data)
+        if complete:
+            await self._cache_plan_async(kind, user_data, plan)
+        return plan
+
+    @instrumented("adjust_plan_dynamically")
+    async def adjust_plan_dynamically_async(
+        self, reason: str, duration_days: int, current_plan: dict, user_data: dict
+    ) -> dict:
+        """Async variant of adjust_plan_dynamically"""
+        system_prompt, prompt = self._adjust_plan_prompt(reason, duration_days, current_plan)
+        adjusted = self._extract_json(await self._call_groq_async(prompt, system_prompt))
+        return adjusted or self._unchanged_plan(reason, current_plan)
+
+    @instrumented("analyze_progress")
+    async def analyze_progress_async(self, user_data: dict, progress_data: dict) -> dict:
+        """Async variant of analyze_progress"""
+        system_prompt, prompt = self._progress_prompt(user_data, progress_data)
+        result = await self._call_groq_async(prompt, system_prompt)
+        return self._extract_json(result) or self._default_progress_analysis()
+
+    # ─── Fallbacks ────────────────────────────────────────────────────────────
 
     def _get_fallback_workout_plan(self, user_data: dict) -> dict:
         """Fallback workout plan when AI is unavailable"""
-        return {
-            "plan_title": "Personalized Fitness Plan",
-            "plan_description": "AI-generated plan tailored to your goals",
-            "weekly_schedule": {
-                "Monday": {
-                    "focus": "Full Body Strength",
-                    "duration_minutes": 45,
-                    "time_slot": "6:00 AM - 7:00 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "5-minute jogging in place or jumping jacks", "duration_minutes": 5},
-                    "exercises": [
-                        {"name": "Diamond Push-ups", "sets": 3, "reps": "12-15", "rest_seconds": 60,
-                         "description": "Start in plank position, form diamond with hands, lower chest to ground",
-                         "muscle_groups": ["chest", "triceps"], "youtube_search": "diamond push ups tutorial"},
-                        {"name": "Bodyweight Squats", "sets": 3, "reps": "15-20", "rest_seconds": 60,
-                         "description": "Stand feet shoulder-width, squat until thighs parallel to floor",
-                         "muscle_groups": ["quads", "glutes"], "youtube_search": "bodyweight squat form"},
-                        {"name": "Plank Hold", "sets": 3, "reps": "30-60 seconds", "rest_seconds": 60,
-                         "description": "Hold plank position with straight body alignment",
-                         "muscle_groups": ["core"], "youtube_search": "plank exercise tutorial"},
-                    ],
-                    "cooldown": {"description": "5 minutes gentle stretching", "duration_minutes": 5}
-                },
-                "Tuesday": {
-                    "focus": "Cardio & Core",
-                    "duration_minutes": 30,
-                    "time_slot": "6:30 AM - 7:00 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "3-minute light jog", "duration_minutes": 3},
-                    "exercises": [
-                        {"name": "Mountain Climbers", "sets": 3, "reps": "30-60 seconds", "rest_seconds": 60,
-                         "description": "Plank position, alternate driving knees toward chest rapidly",
-                         "muscle_groups": ["core", "cardio"], "youtube_search": "mountain climbers exercise"},
-                        {"name": "Jumping Jacks", "sets": 3, "reps": "30-60 seconds", "rest_seconds": 60,
-                         "description": "Jump feet apart while raising arms overhead",
-                         "muscle_groups": ["full_body", "cardio"], "youtube_search": "jumping jacks form"},
-                        {"name": "Bicycle Crunches", "sets": 3, "reps": "15 each side", "rest_seconds": 60,
-                         "description": "Lie on back, alternate elbow to opposite knee",
-                         "muscle_groups": ["core", "obliques"], "youtube_search": "bicycle crunches tutorial"},
-                    ],
-                    "cooldown": {"description": "Stretching and deep breathing", "duration_minutes": 5}
-                },
-                "Wednesday": {
-                    "focus": "Rest Day",
-                    "duration_minutes": 0,
-                    "time_slot": "",
-                    "is_rest": True,
-                    "warmup": None,
-                    "exercises": [],
-                    "cooldown": None
-                },
-                "Thursday": {
-                    "focus": "Upper Body and Cardio",
-                    "duration_minutes": 45,
-                    "time_slot": "6:00 AM - 7:00 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "5-minute jogging in place", "duration_minutes": 5},
-                    "exercises": [
-                        {"name": "Diamond Push-ups", "sets": 3, "reps": "12-15", "rest_seconds": 60,
-                         "description": "Upper chest and tricep focused push-up variation",
-                         "muscle_groups": ["chest", "triceps"], "youtube_search": "diamond push ups 101"},
-                        {"name": "Mountain Climbers", "sets": 3, "reps": "30-60 seconds", "rest_seconds": 60,
-                         "description": "Dynamic core and cardio exercise",
-                         "muscle_groups": ["core", "cardio"], "youtube_search": "mountain climbers"},
-                        {"name": "Jumping Jacks", "sets": 3, "reps": "30-60 seconds", "rest_seconds": 60,
-                         "description": "Full body cardio warm-up exercise",
-                         "muscle_groups": ["full_body"], "youtube_search": "jumping jacks"},
-                    ],
-                    "cooldown": {"description": "Cool-down stretches", "duration_minutes": 5}
-                },
-                "Friday": {
-                    "focus": "Lower Body and Core",
-                    "duration_minutes": 45,
-                    "time_slot": "6:30 AM - 8:00 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "5 minutes dynamic stretching", "duration_minutes": 5},
-                    "exercises": [
-                        {"name": "Lunges", "sets": 3, "reps": "12 each leg", "rest_seconds": 60,
-                         "description": "Step forward, lower knee toward floor, return to standing",
-                         "muscle_groups": ["quads", "glutes", "hamstrings"], "youtube_search": "lunges exercise form"},
-                        {"name": "Glute Bridges", "sets": 3, "reps": "15-20", "rest_seconds": 60,
-                         "description": "Lie on back, lift hips toward ceiling, squeeze glutes",
-                         "muscle_groups": ["glutes", "hamstrings"], "youtube_search": "glute bridge exercise"},
-                        {"name": "Russian Twists", "sets": 3, "reps": "15 each side", "rest_seconds": 60,
-                         "description": "Seated, lean back slightly, rotate torso side to side",
-                         "muscle_groups": ["core", "obliques"], "youtube_search": "russian twist exercise"},
-                    ],
-                    "cooldown": {"description": "Leg stretches and cool-down", "duration_minutes": 5}
-                },
-                "Saturday": {
-                    "focus": "Back and Biceps",
-                    "duration_minutes": 45,
-                    "time_slot": "6:30 AM - 7:45 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "5 minutes arm circles and shoulder warm-up", "duration_minutes": 5},
-                    "exercises": [
-                        {"name": "Superman Hold", "sets": 3, "reps": "10-12", "rest_seconds": 60,
-                         "description": "Lie face down, lift arms and legs simultaneously",
-                         "muscle_groups": ["back", "glutes"], "youtube_search": "superman exercise back"},
-                        {"name": "Reverse Snow Angels", "sets": 3, "reps": "12-15", "rest_seconds": 60,
-                         "description": "Face down, move arms in arc like snow angel",
-                         "muscle_groups": ["upper_back", "shoulders"], "youtube_search": "reverse snow angels"},
-                        {"name": "Bodyweight Row (using table)", "sets": 3, "reps": "10-12", "rest_seconds": 60,
-                         "description": "Lie under table, grip edge, pull chest up to table",
-                         "muscle_groups": ["back", "biceps"], "youtube_search": "bodyweight row home"},
-                        {"name": "Plank to Downward Dog", "sets": 3, "reps": "10", "rest_seconds": 60,
-                         "description": "Alternate between plank and downward dog position",
-                         "muscle_groups": ["core", "shoulders", "back"], "youtube_search": "plank downward dog"},
-                    ],
-                    "cooldown": {"description": "Back and shoulder stretches", "duration_minutes": 5}
-                },
-                "Sunday": {
-                    "focus": "Cardio Day",
-                    "duration_minutes": 40,
-                    "time_slot": "7:00 AM - 7:40 AM",
-                    "is_rest": False,
-                    "warmup": {"description": "3-minute light walk", "duration_minutes": 3},
-                    "exercises": [
-                        {"name": "Brisk Walking/Jogging", "sets": 1, "reps": "20 minutes", "rest_seconds": 0,
-                         "description": "Maintain moderate pace, keep heart rate elevated",
-                         "muscle_groups": ["cardio", "full_body"], "youtube_search": "brisk walking benefits"},
-                        {"name": "High Knees", "sets": 3, "reps": "30 seconds", "rest_seconds": 30,
-                         "description": "March in place lifting knees to hip height",
-                         "muscle_groups": ["cardio", "core"], "youtube_search": "high knees exercise"},
-                        {"name": "Burpees", "sets": 3, "reps": "8-10", "rest_seconds": 60,
-                         "description": "Full body explosive movement: squat, plank, push-up, jump",
-                         "muscle_groups": ["full_body", "cardio"], "youtube_search": "burpee exercise tutorial"},
-                    ],
-                    "cooldown": {"description": "Full body stretch cool-down", "duration_minutes": 5}
-                }
-            }
-        }
+        note_source("fallback")
+        return plan_variants.get("workout", user_data)
 
     def _get_fallback_nutrition_plan(self, user_data: dict) -> dict:
         """Fallback nutrition plan when AI is unavailable"""
-        return {
-            "plan_title": "🇮🇳 Indian Nutrition Plan",
-            "total_calories": 1800,
-            "weekly_meals": {
-                "Monday": {
-                    "breakfast": {"name": "Dosa with Sambar and Coconut Chutney", "calories": 350,
-                                  "protein_g": 12, "carbs_g": 55, "fat_g": 8, "meal_time": "7:00 AM",
-                                  "ingredients": ["Dosa", "Sambar", "Coconut", "Chana", "Cumin", "Coriander"]},
-                    "lunch": {"name": "Whole Wheat Roti with Paneer and Mixed Vegetables", "calories": 450,
-                              "protein_g": 20, "carbs_g": 65, "fat_g": 12, "meal_time": "12:30 PM",
-                              "ingredients": ["Whole Wheat Roti", "Paneer", "Onions", "Tomatoes", "Cumin", "Coriander"]},
-                    "dinner": {"name": "Grilled Fish with Quinoa and Steamed Vegetables", "calories": 400,
-                               "protein_g": 35, "carbs_g": 40, "fat_g": 10, "meal_time": "7:30 PM",
-                               "ingredients": ["Fish", "Quinoa", "Broccoli", "Carrots", "Cumin", "Cardamom"]},
-                    "snacks": [
-                        {"name": "Cucumber and Tomato Salad", "calories": 50, "meal_time": ""},
-                        {"name": "Roasted Makhana", "calories": 150, "meal_time": ""}
-                    ]
-                },
-                "Tuesday": {
-                    "breakfast": {"name": "Idli with Sambar and Coconut Chutney", "calories": 300,
-                                  "protein_g": 10, "carbs_g": 50, "fat_g": 5, "meal_time": "7:00 AM",
-                                  "ingredients": ["Idli", "Sambar", "Coconut Chutney"]},
-                    "lunch": {"name": "Whole Wheat Roti with Rajma and Mixed Vegetables", "calories": 450,
-                              "protein_g": 22, "carbs_g": 60, "fat_g": 10, "meal_time": "12:30 PM",
-                              "ingredients": ["Whole Wheat Roti", "Rajma", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Fish with Brown Rice and Steamed Vegetables", "calories": 400,
-                               "protein_g": 35, "carbs_g": 45, "fat_g": 8, "meal_time": "7:30 PM",
-                               "ingredients": ["Fish", "Brown Rice", "Broccoli", "Carrots"]},
-                    "snacks": [{"name": "Roasted Chana", "calories": 120, "meal_time": ""}]
-                },
-                "Wednesday": {
-                    "breakfast": {"name": "Upma with Vegetables and Coconut", "calories": 300,
-                                  "protein_g": 8, "carbs_g": 50, "fat_g": 8, "meal_time": "7:00 AM",
-                                  "ingredients": ["Semolina", "Vegetables", "Mustard Seeds", "Coconut"]},
-                    "lunch": {"name": "Brown Rice with Chole and Mixed Vegetables", "calories": 500,
-                              "protein_g": 20, "carbs_g": 75, "fat_g": 10, "meal_time": "12:30 PM",
-                              "ingredients": ["Brown Rice", "Chole", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Chicken with Roasted Vegetables and Brown Rice", "calories": 400,
-                               "protein_g": 38, "carbs_g": 40, "fat_g": 8, "meal_time": "7:30 PM",
-                               "ingredients": ["Chicken", "Brown Rice", "Bell Peppers", "Zucchini"]},
-                    "snacks": [
-                        {"name": "Fresh Fruit Juice", "calories": 100, "meal_time": ""},
-                        {"name": "Roasted Moong Dal", "calories": 120, "meal_time": ""}
-                    ]
-                },
-                "Thursday": {
-                    "breakfast": {"name": "Dosa with Sambar and Coconut Chutney", "calories": 350,
-                                  "protein_g": 12, "carbs_g": 55, "fat_g": 8, "meal_time": "7:00 AM",
-                                  "ingredients": ["Dosa", "Sambar", "Coconut", "Chana", "Cumin", "Coriander"]},
-                    "lunch": {"name": "Whole Wheat Roti with Paneer and Mixed Vegetables", "calories": 450,
-                              "protein_g": 20, "carbs_g": 65, "fat_g": 12, "meal_time": "12:30 PM",
-                              "ingredients": ["Whole Wheat Roti", "Paneer", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Fish with Quinoa and Steamed Vegetables", "calories": 400,
-                               "protein_g": 35, "carbs_g": 40, "fat_g": 10, "meal_time": "7:30 PM",
-                               "ingredients": ["Fish", "Quinoa", "Broccoli", "Carrots"]},
-                    "snacks": [
-                        {"name": "Cucumber and Tomato Salad", "calories": 50, "meal_time": ""},
-                        {"name": "Roasted Makhana", "calories": 150, "meal_time": ""}
-                    ]
-                },
-                "Friday": {
-                    "breakfast": {"name": "Oatmeal with Banana and Honey", "calories": 300,
-                                  "protein_g": 8, "carbs_g": 55, "fat_g": 5, "meal_time": "7:00 AM",
-                                  "ingredients": ["Oats", "Banana", "Honey", "Milk"]},
-                    "lunch": {"name": "Brown Rice with Rajma and Mixed Vegetables", "calories": 500,
-                              "protein_g": 22, "carbs_g": 75, "fat_g": 10, "meal_time": "12:30 PM",
-                              "ingredients": ["Brown Rice", "Rajma", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Chicken with Brown Rice and Steamed Vegetables", "calories": 400,
-                               "protein_g": 38, "carbs_g": 40, "fat_g": 8, "meal_time": "7:30 PM",
-                               "ingredients": ["Chicken", "Brown Rice", "Broccoli", "Carrots"]},
-                    "snacks": [
-                        {"name": "Fresh Fruit Salad", "calories": 100, "meal_time": ""},
-                        {"name": "Roasted Chana", "calories": 120, "meal_time": ""}
-                    ]
-                },
-                "Saturday": {
-                    "breakfast": {"name": "Idli with Sambar and Coconut Chutney", "calories": 300,
-                                  "protein_g": 10, "carbs_g": 50, "fat_g": 5, "meal_time": "7:00 AM",
-                                  "ingredients": ["Idli", "Sambar", "Coconut Chutney"]},
-                    "lunch": {"name": "Whole Wheat Roti with Chole and Mixed Vegetables", "calories": 450,
-                              "protein_g": 20, "carbs_g": 65, "fat_g": 10, "meal_time": "12:30 PM",
-                              "ingredients": ["Whole Wheat Roti", "Chole", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Fish with Quinoa and Steamed Vegetables", "calories": 400,
-                               "protein_g": 35, "carbs_g": 40, "fat_g": 10, "meal_time": "7:30 PM",
-                               "ingredients": ["Fish", "Quinoa", "Broccoli", "Carrots"]},
-                    "snacks": [
-                        {"name": "Cucumber and Tomato Salad", "calories": 50, "meal_time": ""},
-                        {"name": "Roasted Moong Dal", "calories": 120, "meal_time": ""}
-                    ]
-                },
-                "Sunday": {
-                    "breakfast": {"name": "Upma with Vegetables and Coconut", "calories": 300,
-                                  "protein_g": 8, "carbs_g": 50, "fat_g": 8, "meal_time": "7:00 AM",
-                                  "ingredients": ["Semolina", "Vegetables", "Coconut"]},
-                    "lunch": {"name": "Brown Rice with Paneer and Mixed Vegetables", "calories": 500,
-                              "protein_g": 22, "carbs_g": 70, "fat_g": 12, "meal_time": "12:30 PM",
-                              "ingredients": ["Brown Rice", "Paneer", "Onions", "Tomatoes"]},
-                    "dinner": {"name": "Grilled Chicken with Brown Rice and Steamed Vegetables", "calories": 400,
-                               "protein_g": 38, "carbs_g": 40, "fat_g": 8, "meal_time": "7:30 PM",
-                               "ingredients": ["Chicken", "Brown Rice", "Broccoli", "Carrots"]},
-                    "snacks": [
-                        {"name": "Fresh Fruit Juice", "calories": 100, "meal_time": ""},
-                        {"name": "Roasted Makhana", "calories": 150, "meal_time": ""}
-                    ]
-                }
-            },
-            "grocery_list": [
-                {"item": "Cumin", "quantity": "50g", "weekly_count": 20},
-                {"item": "Coriander", "quantity": "50g", "weekly_count": 12},
-                {"item": "Brown Rice", "quantity": "2kg", "weekly_count": 8},
-                {"item": "Onions", "quantity": "500g", "weekly_count": 7},
-                {"item": "Tomatoes", "quantity": "500g", "weekly_count": 7},
-                {"item": "Broccoli", "quantity": "300g", "weekly_count": 7},
-                {"item": "Carrots", "quantity": "500g", "weekly_count": 4},
-                {"item": "Paneer", "quantity": "200g", "weekly_count": 3},
-                {"item": "Fish", "quantity": "500g", "weekly_count": 3},
-                {"item": "Quinoa", "quantity": "300g", "weekly_count": 3},
-            ]
-        }
+        note_source("fallback")
+        return plan_variants.get("nutrition", user_data)
+
+    @staticmethod
+    def _canned_reply(kind: str, message: str) -> str:
+        """Intent-matched canned reply; callers record the source themselves"""
+        if kind == "aromi":
+            replies, default = AROMI_FALLBACK_REPLIES, DEFAULT_AROMI_FALLBACK
+        else:
+            replies, default = COACH_FALLBACK_REPLIES, DEFAULT_COACH_FALLBACK
+        return replies.get(intent_classifier.top_intent(message, replies), default)
 
     def _get_fallback_coach_response(self, message: str) -> str:
         """Fallback coach response"""
-        msg = message.lower()
-        if "travel" in msg:
-            return "🌍 No worries about travel! Try hotel room exercises: push-ups, squats, lunges, and planks. Stay hydrated and walk whenever possible! 💪"
-        elif "calor" in msg or "nutri" in msg or "eat" in msg:
-            return "🥗 For optimal nutrition, aim for protein with every meal, include whole grains, and stay hydrated with 2.5-3L water daily. Focus on traditional Indian foods - they're nutritionally excellent!"
-        elif "morning" in msg or "routine" in msg:
-            return "🌅 Perfect morning routine: Wake up, drink 500ml water, 5-minute stretch, 30-min workout, healthy breakfast. Consistency is your superpower! ✨"
-        elif "muscle" in msg or "gain" in msg:
-            return "💪 For muscle gain: Caloric surplus of 300-500 cal/day, high protein (1.6-2.2g/kg bodyweight), progressive overload training, and 7-9 hours of sleep! Recovery is where the magic happens!"
-        return "🎯 Great question! Stay consistent with your training and nutrition. Progress, not perfection! Every workout brings you closer to your goals. Keep going! 💪✨"
+        note_source("fallback")
+        return self._canned_reply("coach", message)
 
     def _get_fallback_aromi_response(self, message: str) -> str:
         """Fallback AROMI response"""
-        msg = message.lower()
-        if "snack" in msg:
-            return "🍎 Hey there, friend! 😊 Here are some healthy snack ideas:\n\n• Roasted Makhana (150 cal)\n• Cucumber & Tomato Salad (50 cal)\n• Roasted Chana (120 cal)\n• Fresh Fruit Salad (100 cal)\n\nThese align with your Indian nutrition plan! 🌿"
-        if "travel" in msg:
-            return "✈️ Don't worry about fitness while traveling!\n\n• Replace gym with hotel room exercises\n• Walking tours count as cardio!\n• Bodyweight squats, push-ups & planks anywhere\n• Stay hydrated - 3L water daily\n• Look for local healthy food options 🍱"
-        if "tired" in msg or "rest" in msg:
-            return "😴 Listen to your body! Rest is crucial for fitness gains. Take today easy - light walk or stretching is perfect. Your muscles grow stronger during recovery! Tomorrow you'll be recharged! 💪"
-        return "💪 I'm here to support your wellness journey! Stay consistent and you'll see amazing results! 🌟"
+        note_source("fallback")
+        return self._canned_reply("aromi", message)
 
 
 # Global AI Agent instance
@@ -0,0 +1,202 @@
+"""
+Chat Memory - rolling conversation summarisation for coach chat
+
+Keeps every prompt within a fixed token budget:
+- the newest turns that fit CHAT_HISTORY_TOKEN_BUDGET are sent verbatim
+- everything older is folded into a stored running summary (chat_summaries)
+The summary is refreshed incrementally in a background task after each reply,
+so the request path only reads it. Stored history is trimmed to the newest
+CHAT_STORED_MESSAGES, but a message is only dropped once it is in the summary. Refreshes for one session never overlap:
+a refresh requested while one is running is folded into a second pass.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.models.health import ChatSession, ChatSummary
+from app.services.ai_agent import ai_agent
+from app.utils.config import settings
+from app.utils.deadline import deadline_scope
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate (~4 characters per token for LLaMA-style tokenizers)"""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def messages_tokens(messages: List[dict]) -> int:
+    return sum(estimate_tokens(m.get("content")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def _group_turns(messages: List[dict]) -> List[List[dict]]:
+    """A user message and its reply share a timestamp; keep them together"""
+    turns: List[List[dict]] = []
+    for msg in messages:
+        if turns and msg.get("timestamp") and turns[-1][-1].get("timestamp") == msg.get("timestamp"):
+            turns[-1].append(msg)
+        else:
+            turns.append([msg])
+    return turns
+
+
+@dataclass
+class MemoryContext:
+    summary: str = ""
+    recent: List[dict] = field(default_factory=list)
+    pending: List[dict] = field(default_factory=list)
+    summarized_until: Optional[str] = None
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    def token_report(self) -> dict:
+        return {
+            "tokens_before_compaction": self.tokens_before,
+            "tokens_after_compaction": self.tokens_after,
+            "recent_messages": len(self.recent),
+            "has_summary": bool(self.summary),
+            "pending_messages": len(self.pending),
+        }
+
+
+class ConversationMemory:
+    def __init__(self, history_budget: int, summary_budget: int, stored_messages: int):
+        self.history_budget = history_budget
+        self.summary_budget = summary_budget
+        self.stored_messages = stored_messages
+        self.stats = {
+            "contexts_built": 0,
+            "tokens_before_total": 0,
+            "tokens_after_total": 0,
+            "summaries_refreshed": 0,
+            "refreshes_coalesced": 0,
+        }
+        # session_id -> another pass was requested while this one runs
+        self._refreshing: Dict[int, bool] = {}
+
+    def split(self, history: List[dict], summary_row: Optional[ChatSummary]) -> MemoryContext:
+        summarized_until = summary_row.summarized_until if summary_row else None
+        summary = (summary_row.summary or "") if summary_row else ""
+        unsummarized = [
+            m for m in history
+            if not summarized_until or (m.get("timestamp") or "") > summarized_until
+        ]
+
+        recent: List[dict] = []
+        used = 0
+        turns = _group_turns(unsummarized)
+        cut = len(turns)
+        for index in range(len(turns) - 1, -1, -1):
+            cost = messages_tokens(turns[index])
+            if recent and used + cost > self.history_budget:
+                break
+            recent = turns[index] + recent
+            used += cost
+            cut = index
+        pending = [m for turn in turns[:cut] for m in turn]
+
+        return MemoryContext(
+            summary=summary,
+            recent=recent,
+            pending=pending,
+            summarized_until=summarized_until,
+            tokens_before=messages_tokens(history),
+            tokens_after=estimate_tokens(summary) + used,
+        )
+
+    def trim(self, messages: List[dict], summarized_until: Optional[str]) -> List[dict]:
+        """Drop the oldest messages beyond stored_messages, but only ones already summarised"""
+        drop = 0
+        while (
+            len(messages) - drop > self.stored_messages
+            and summarized_until
+            and (messages[drop].get("timestamp") or "") <= summarized_until
+        ):
+            drop += 1
+        return messages[drop:]
+
+    def build_context(self, db: Session, session: ChatSession) -> MemoryContext:
+        """Bounded context for the next prompt: running summary + recent turns"""
+        summary_row = db.query(ChatSummary).filter(ChatSummary.session_id == session.id).first()
+        context = self.split(session.messages or [], summary_row)
+        self.stats["contexts_built"] += 1
+        self.stats["tokens_before_total"] += context.tokens_before
+        self.stats["tokens_after_total"] += context.tokens_after
+        return context
+
+    async def refresh_summary(self, session_id: int):
+        """Fold turns that fell out of the recent window into the running summary"""
+        if session_id in self._refreshing:
+            self._refreshing[session_id] = True
+            self.stats["refreshes_coalesced"] += 1
+            return
+        self._refreshing[session_id] = False
+        try:
+            while True:
+                try:
+                    await self._refresh(session_id)
+                except IntegrityError:
+                    # Another worker created the summary row first; fold into it on the next pass
+                    self._refreshing[session_id] = True
+                except Exception as e:
+                    print(f"Chat summary refresh error: {e}")
+                if not self._refreshing[session_id]:
+                    break
+                self._refreshing[session_id] = False
+        finally:
+            del self._refreshing[session_id]
+
+    async def _refresh(self, session_id: int):
+        async with AsyncSessionLocal() as db:
+            session = await db.scalar(select(ChatSession).filter(ChatSession.id == session_id))
+            if not session:
+                return
+            summary_row = await db.scalar(select(ChatSummary).filter(ChatSummary.session_id == session_id))
+            context = self.split(session.messages or [], summary_row)
+        if not context.pending:
+            return
+
+        # Runs after the response was sent, so the request deadline no longer applies
+        with deadline_scope(None):
+            new_summary = await ai_agent.summarize_conversation_async(
+                context.summary, context.pending, max_tokens=self.summary_budget
+            )
+
+        async with AsyncSessionLocal() as db:
+            summary_row = await db.scalar(select(ChatSummary).filter(ChatSummary.session_id == session_id))
+            if summary_row is None:
+                summary_row = ChatSummary(session_id=session_id, summary="", summarized_messages=0)
+                db.add(summary_row)
+            summary_row.summary = new_summary
+            summary_row.summarized_until = max(m.get("timestamp") or "" for m in context.pending)
+            summary_row.summarized_messages = (summary_row.summarized_messages or 0) + len(context.pending)
+            summary_row.tokens_before = messages_tokens(session.messages or [])
+            summary_row.tokens_after = estimate_tokens(new_summary) + messages_tokens(context.recent)
+            summary_row.updated_at = datetime.utcnow()
+            await db.commit()
+        self.stats["summaries_refreshed"] += 1
+
+    def get_stats(self) -> dict:
+        built = self.stats["contexts_built"]
+        return {
+            **self.stats,
+            "avg_tokens_before": round(self.stats["tokens_before_total"] / built, 1) if built else 0,
+            "avg_tokens_after": round(self.stats["tokens_after_total"] / built, 1) if built else 0,
+        }
+
+
+# Global conversation memory instance
+chat_memory = ConversationMemory(
+    history_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+    summary_budget=settings.CHAT_SUMMARY_TOKEN_BUDGET,
+    stored_messages=settings.CHAT_STORED_MESSAGES,
+)
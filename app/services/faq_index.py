@@ -0,0 +1,195 @@
+"""
+FAQ Index - BM25 retrieval over a curated local answer corpus
+
+- app/data/faq.json holds question paraphrases and answer templates
+- At startup every paraphrase becomes a document in an inverted index stored
+  as flat arrays (CSR layout: per-term offsets into doc-id / term-frequency arrays)
+- Candidates are ranked with BM25; confidence is the share of the query's IDF
+  weight that the best paraphrase covers, so off-topic words lower it
+- Answers are personalised from the chat user_context ({name}, {weight}, ...)
+"""
+
+import json
+import math
+import re
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FAQ_PATH = Path(__file__).resolve().parent.parent / "data" / "faq.json"
+
+STOPWORDS = frozenset(
+    "a an and are am as at be but by can could do does for from get how i i'm if in is it its "
+    "me my of on or should so some than that the their them then there this to up was what "
+    "when which will with would you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and a light plural/-ing stem"""
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 5 and token.endswith("ing"):
+            token = token[:-3]
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class _SafeDict(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def personalise(template: str, user_context: dict) -> str:
+    weight = user_context.get("weight") or 70
+    return template.format_map(_SafeDict(
+        name=(user_context.get("name") or "Friend").split()[0],
+        weight=round(weight),
+        protein_low=round(weight * 1.6),
+        protein_high=round(weight * 2.2),
+        water_litres=round(weight * 0.035, 1),
+        diet=str(user_context.get("diet_preference") or "vegetarian").replace("_", " "),
+        goal=str(user_context.get("fitness_goal") or "fitness").replace("_", " "),
+        total_workouts=user_context.get("total_workouts") or 0,
+    ))
+
+
+@dataclass
+class FAQMatch:
+    faq_id: str
+    answer: str
+    score: float
+    confidence: float
+
+
+class FAQIndex:
+    def __init__(self, entries: List[dict], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.entries = entries
+        self.stats = {"lookups": 0, "hits": 0, "lookup_seconds_total": 0.0}
+        self._build(entries)
+
+    def _build(self, entries: List[dict]):
+        docs: List[Counter] = []
+        doc_entry = array("i")
+        for entry_index, entry in enumerate(entries):
+            for question in entry["questions"]:
+                docs.append(Counter(tokenize(question)))
+                doc_entry.append(entry_index)
+
+        vocabulary: Dict[str, int] = {}
+        postings: List[List[tuple]] = []
+        for doc_id, counts in enumerate(docs):
+            for term, tf in counts.items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc_id, tf))
+
+        n_docs = len(docs)
+        self.vocabulary = vocabulary
+        self.doc_entry = doc_entry
+        self.doc_len = array("f", (sum(c.values()) for c in docs))
+        self.avg_doc_len = (sum(self.doc_len) / n_docs) if n_docs else 0.0
+        self.offsets = array("i", [0])
+        self.post_docs = array("i")
+        self.post_tfs = array("f")
+        self.idf = array("f")
+        for plist in postings:
+            for doc_id, tf in plist:
+                self.post_docs.append(doc_id)
+                self.post_tfs.append(tf)
+            self.offsets.append(len(self.post_docs))
+            df = len(plist)
+            self.idf.append(math.log(1 + (n_docs - df + 0.5) / (df + 0.5)))
+        # Words the corpus has never seen count as fully informative
+        self.max_idf = math.log(1 + (n_docs + 0.5) / 0.5) if n_docs else 0.0
+
+    def search(self, message: str) -> Optional[FAQMatch]:
+        terms = tokenize(message)
+        if not terms:
+            return None
+        scores: Dict[int, float] = {}
+        query_weight = 0.0
+        for term in set(terms):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                query_weight += self.max_idf
+                continue
+            idf = self.idf[term_id]
+            query_weight += idf
+            for pos in range(self.offsets[term_id], self.offsets[term_id + 1]):
+                doc_id = self.post_docs[pos]
+                tf = self.post_tfs[pos]
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / self.avg_doc_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        if not scores:
+            return None
+
+        best_doc = max(scores, key=scores.get)
+        covered = sum(
+            self.idf[self.vocabulary[t]] for t in set(terms)
+            if t in self.vocabulary and self._doc_has(best_doc, self.vocabulary[t])
+        )
+        entry = self.entries[self.doc_entry[best_doc]]
+        return FAQMatch(
+            faq_id=entry["id"],
+            answer=entry["answer"],
+            score=scores[best_doc],
+            confidence=covered / query_weight if query_weight else 0.0,
+        )
+
+    def _doc_has(self, doc_id: int, term_id: int) -> bool:
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return any(self.post_docs[pos] == doc_id for pos in range(start, end))
+
+    def answer(self, message: str, user_context: dict, min_confidence: float) -> Optional[str]:
+        """Personalised local answer, or None when no FAQ is a confident match"""
+        started = time.perf_counter()
+        match = self.search(message)
+        hit = match is not None and match.confidence >= min_confidence
+        self.stats["lookups"] += 1
+        self.stats["hits"] += int(hit)
+        self.stats["lookup_seconds_total"] += time.perf_counter() - started
+        return personalise(match.answer, user_context or {}) if hit else None
+
+    def get_stats(self, llm_latency_seconds: Optional[float] = None) -> dict:
+        lookups, hits = self.stats["lookups"], self.stats["hits"]
+        avg_lookup = self.stats["lookup_seconds_total"] / lookups if lookups else 0.0
+        return {
+            "entries": len(self.entries),
+            "documents": len(self.doc_entry),
+            "terms": len(self.vocabulary),
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "avg_lookup_ms": round(avg_lookup * 1000, 3),
+            "avg_llm_latency_seconds": round(llm_latency_seconds, 3) if llm_latency_seconds else None,
+            "estimated_seconds_saved": (
+                round(hits * (llm_latency_seconds - avg_lookup), 1) if llm_latency_seconds else None
+            ),
+        }
+
+
+def load_faq_index(path: Path = FAQ_PATH) -> FAQIndex:
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  FAQ corpus unavailable: {e}")
+        entries = []
+    return FAQIndex(entries)
+
+
+# Global FAQ index, built once at startup
+faq_index = load_faq_index()
@@ -0,0 +1,168 @@
+"""
+Intent Classifier - one compiled keyword automaton for every canned reply
+
+- Keyword and phrase dictionaries are compiled once into an Aho-Corasick
+  automaton, so matching is a single pass over the message whatever the
+  vocabulary size
+- "stem*" matches any word starting with stem; other entries match whole
+  words or phrases only
+- Each intent has a weight, multiplied by the word count of the matched
+  phrase; the best-scoring intent among those a responder can answer wins
+- route() decides whether a message can be answered locally or needs the LLM
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# intent -> (weight, keywords). Weights also settle ties between intents,
+# e.g. "healthy snack to eat" is a snack question before a nutrition one.
+INTENTS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "medical": (3.0, (
+        "pain", "injury", "injured", "doctor", "diabet*", "blood pressure", "hypertension",
+        "pregnan*", "asthma", "surgery", "medication*", "medicine*", "chest pain", "dizzy",
+    )),
+    "snack": (1.3, ("snack*", "munch*", "hungry between")),
+    "travel": (1.2, ("travel*", "trip*", "hotel*", "vacation*", "holiday*", "flight*", "business trip")),
+    "fatigue": (1.1, ("tired", "rest", "rest day", "exhausted", "fatigue*", "sore", "sleepy", "burnt out")),
+    "nutrition": (1.0, ("calor*", "nutri*", "eat*", "diet*", "food*", "protein*", "meal*")),
+    "motivation": (1.0, ("motivat*", "inspire*", "encouragement", "lazy", "give up", "giving up")),
+    "morning_routine": (0.9, ("morning", "routine*", "wake", "wake up", "waking")),
+    "muscle_gain": (0.9, ("muscle*", "gain*", "bulk*", "mass")),
+    "greeting": (0.5, ("hi", "hello", "hey", "namaste", "good morning", "good evening")),
+    "thanks": (0.5, ("thanks", "thank you", "thx", "ty")),
+}
+
+# Intents whose canned reply is a complete answer for a short message
+LOCAL_INTENTS = frozenset({"greeting", "thanks"})
+# Never answer these locally, however confident the match
+LLM_ONLY_INTENTS = frozenset({"medical"})
+LOCAL_MAX_WORDS = 8
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: all patterns are found in one left-to-right pass"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, pattern_index) for every occurrence"""
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern_index in self._out[node]:
+                yield index - len(self.patterns[pattern_index]) + 1, index + 1, pattern_index
+
+
+@dataclass
+class IntentResult:
+    intent: Optional[str]
+    score: float = 0.0
+    scores: Dict[str, float] = field(default_factory=dict)
+    matches: List[str] = field(default_factory=list)
+
+
+class IntentClassifier:
+    def __init__(self, intents: Dict[str, Tuple[float, Tuple[str, ...]]]):
+        self.intents = intents
+        self._order = {intent: index for index, intent in enumerate(intents)}
+        # pattern text -> [(intent, is_prefix)]; one pattern may serve several intents
+        self._entries: Dict[str, List[Tuple[str, bool]]] = {}
+        for intent, (_, keywords) in intents.items():
+            for keyword in keywords:
+                is_prefix = keyword.endswith("*")
+                text = keyword.rstrip("*").lower()
+                self._entries.setdefault(text, []).append((intent, is_prefix))
+        self._automaton = AhoCorasick(self._entries)
+        self.stats = {"classified": 0, "routed_local": 0, "routed_llm": 0}
+
+    def classify(self, message: str, allowed: Optional[Iterable[str]] = None) -> IntentResult:
+        """Best intent for the message, optionally restricted to the intents a responder handles"""
+        text = (message or "").lower()
+        allowed = set(allowed) if allowed is not None else None
+        scores: Dict[str, float] = {}
+        matches: List[str] = []
+        for start, end, pattern_index in self._automaton.iter_matches(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue  # must start a word
+            whole_word = end == len(text) or not _is_word_char(text[end])
+            pattern = self._automaton.patterns[pattern_index]
+            for intent, is_prefix in self._entries[pattern]:
+                if not is_prefix and not whole_word:
+                    continue
+                if allowed is not None and intent not in allowed:
+                    continue
+                # Phrases are more specific than the single words inside them
+                weight = self.intents[intent][0] * (pattern.count(" ") + 1)
+                scores[intent] = scores.get(intent, 0.0) + weight
+                matches.append(pattern)
+        self.stats["classified"] += 1
+        if not scores:
+            return IntentResult(intent=None, matches=matches)
+        best = max(scores, key=lambda i: (scores[i], self.intents[i][0], -self._order[i]))
+        return IntentResult(intent=best, score=scores[best], scores=scores, matches=matches)
+
+    def top_intent(self, message: str, allowed: Optional[Iterable[str]] = None) -> Optional[str]:
+        return self.classify(message, allowed).intent
+
+    def route(self, message: str) -> str:
+        """"local" when a canned reply fully answers the message, otherwise "llm" """
+        result = self.classify(message)
+        local = (
+            result.intent in LOCAL_INTENTS
+            and not LLM_ONLY_INTENTS.intersection(result.scores)
+            and len((message or "").split()) <= LOCAL_MAX_WORDS
+        )
+        self.stats["routed_local" if local else "routed_llm"] += 1
+        return "local" if local else "llm"
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "intents": len(self.intents),
+            "patterns": len(self._automaton.patterns),
+        }
+
+
+# Global classifier instance
+intent_classifier = IntentClassifier(INTENTS)
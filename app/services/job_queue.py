@@ -0,0 +1,243 @@
+"""
+Plan Job Queue - background workout/nutrition plan generation
+
+/generate/background endpoints enqueue a GenerationJob row and return at once.
+A bounded pool of asyncio workers runs the LLM call (or claims the plan
+speculated at assessment time) and persists the plan; database work is
+pushed to threads so the event loop stays free. A failed job is retried
+after an exponential backoff. Jobs live in the generation_jobs table, so
+anything queued or running when the process stops is picked up again on
+the next start.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.job import GenerationJob, JobStatus
+from app.services.ai_agent import ai_agent
+from app.services.plan_persistence import save_workout_plan, save_nutrition_plan
+from app.services.plan_speculation import plan_speculator
+from app.utils.config import settings
+
+JOB_HANDLERS = {
+    "workout": (ai_agent.generate_workout_plan_async, save_workout_plan),
+    "nutrition": (ai_agent.generate_nutrition_plan_async, save_nutrition_plan),
+}
+
+
+def job_to_dict(job: GenerationJob) -> dict:
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status.value if job.status else None,
+        "result_plan_id": job.result_plan_id,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class PlanJobQueue:
+    def __init__(self, workers: int, max_attempts: int, retry_backoff_seconds: float):
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._retries: Dict[str, asyncio.TimerHandle] = {}
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────────
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self._recover_pending):
+            self._queue.put_nowait(job_id)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        print(f"✅ Plan job queue started with {self.worker_count} workers")
+
+    async def stop(self):
+        # Jobs waiting out a backoff stay QUEUED and are recovered on the next start
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _recover_pending(self) -> list:
+        """Re-queue jobs interrupted by a restart"""
+        db = SessionLocal()
+        try:
+            jobs = (
+                db.query(GenerationJob)
+                .filter(GenerationJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+                .order_by(GenerationJob.created_at)
+                .all()
+            )
+            for job in jobs:
+                job.status = JobStatus.QUEUED
+            db.commit()
+            return [job.id for job in jobs]
+        finally:
+            db.close()
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def enqueue(self, db: Session, user_id: int, job_type: str, user_data: dict) -> GenerationJob:
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = GenerationJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            job_type=job_type,
+            status=JobStatus.QUEUED,
+            payload=user_data,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        if self._queue is not None:
+            self._queue.put_nowait(job.id)
+        return job
+
+    def get_job(self, db: Session, job_id: str, user_id: int) -> Optional[GenerationJob]:
+        return (
+            db.query(GenerationJob)
+            .filter(GenerationJob.id == job_id, GenerationJob.user_id == user_id)
+            .first()
+        )
+
+    async def wait_for(self, job_id: str, timeout: float) -> bool:
+        """Block until the job finishes in this process; False on timeout"""
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                # A set event is dropped by _run's timer; an unset one only existed for waiters
+                if not event.is_set() and self._done_events.get(job_id) is event:
+                    del self._done_events[job_id]
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "retries_pending": len(self._retries),
+        }
+
+    # ─── Workers ──────────────────────────────────────────────────────────────
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"Plan job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        claimed = await asyncio.to_thread(self._claim, job_id)
+        if claimed is None:
+            return
+        job_type, user_id, user_data = claimed
+        generate, persist = JOB_HANDLERS[job_type]
+        try:
+            # A plan speculatively generated at assessment time for these inputs is used as is
+            plan_data = await plan_speculator.claim(user_id, job_type, user_data)
+            if plan_data is None:
+                plan_data = await generate(user_data)
+            plan_id = await asyncio.to_thread(self._persist, persist, user_id, user_data, plan_data)
+            await asyncio.to_thread(self._finish, job_id, JobStatus.COMPLETED, plan_id, None)
+        except Exception as e:
+            print(f"Plan job {job_id} failed: {e}")
+            delay = await asyncio.to_thread(self._fail, job_id, str(e))
+            if delay is not None:
+                self._retries[job_id] = asyncio.get_running_loop().call_later(delay, self._retry, job_id)
+                return
+        self._done_events.setdefault(job_id, asyncio.Event()).set()
+        # Drop the event once waiters have been released
+        asyncio.get_running_loop().call_later(60, self._done_events.pop, job_id, None)
+
+    def _retry(self, job_id: str):
+        self._retries.pop(job_id, None)
+        self._queue.put_nowait(job_id)
+
+    def _claim(self, job_id: str) -> Optional[tuple]:
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            if not job or job.status != JobStatus.QUEUED:
+                return None
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            job.attempts = (job.attempts or 0) + 1
+            db.commit()
+            return job.job_type, job.user_id, dict(job.payload or {})
+        finally:
+            db.close()
+
+    def _persist(self, persist, user_id: int, user_data: dict, plan_data: dict) -> int:
+        db = SessionLocal()
+        try:
+            return persist(db, user_id, user_data, plan_data).id
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, status: JobStatus, plan_id: Optional[int], error: Optional[str]):
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            if job:
+                job.status = status
+                job.result_plan_id = plan_id
+                job.error = error
+                job.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            db.close()
+
+    def _fail(self, job_id: str, error: str) -> Optional[float]:
+        """Record a failure; returns the delay before the retry, or None when the job is done for"""
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            if not job:
+                return None
+            job.error = error
+            attempts = job.attempts or 0
+            if attempts < self.max_attempts:
+                job.status = JobStatus.QUEUED
+                db.commit()
+                return self.retry_backoff_seconds * 2 ** (attempts - 1)
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return None
+        finally:
+            db.close()
+
+
+# Global job queue instance
+plan_job_queue = PlanJobQueue(
+    workers=settings.PLAN_JOB_WORKERS,
+    max_attempts=settings.PLAN_JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.PLAN_JOB_RETRY_BACKOFF_SECONDS,
+)
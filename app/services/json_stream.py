@@ -0,0 +1,218 @@
+"""
+Streaming JSON - incremental, tolerant parsing of LLM plan output
+
+- StreamingJSONParser consumes completion tokens as they arrive and hands back
+  every day of weekly_schedule / weekly_meals the moment its object closes
+- Leading prose, markdown fences and anything after the root object are ignored
+- Trailing commas are dropped on the fly
+- finish() repairs truncated output by cutting back to the last complete value
+  and closing the brackets that are still open
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+PLAN_CONTAINERS = ("weekly_schedule", "weekly_meals")
+
+
+class _Frame:
+    __slots__ = ("kind", "name", "start", "key", "expect_key", "index")
+
+    def __init__(self, kind: str, name, start: int):
+        self.kind = kind          # "{" or "["
+        self.name = name          # key (or list index) of this container in its parent
+        self.start = start        # offset of the opening bracket in the output buffer
+        self.key = None           # last key read inside an object
+        self.expect_key = kind == "{"
+        self.index = 0            # next element index inside an array
+
+
+class StreamingJSONParser:
+    """Character-level JSON scanner that can be fed a token stream"""
+
+    def __init__(self, containers: Tuple[str, ...] = PLAN_CONTAINERS):
+        self.containers = containers
+        self.repaired = False
+        self.days: Dict[str, dict] = {}
+        self._out: List[str] = []
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._in_scalar = False
+        # Output length and open brackets at the last point where the text
+        # so far is a valid prefix that can be closed off
+        self._safe_len = 0
+        self._safe_closers = ""
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def feed(self, chunk: str) -> List[Tuple[str, dict]]:
+        """Consume a chunk; returns (day, data) for every day object completed in it"""
+        completed = []
+        for ch in chunk:
+            if self._done:
+                break
+            item = self._consume(ch)
+            if item is not None:
+                completed.append(item)
+        return completed
+
+    def finish(self) -> Optional[dict]:
+        """Parse everything fed so far, repairing truncated output if needed"""
+        if not self._started:
+            return None
+        text = "".join(self._out)
+        if self._done:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                pass
+        if self._in_scalar:
+            self._mark_safe_before_separator()
+        self.repaired = True
+        repaired = text[:self._safe_len] + self._safe_closers
+        try:
+            result = json.loads(repaired)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(result, dict):
+            return None
+        # A day cut off mid-way is dropped rather than half-kept
+        for container in self.containers:
+            if container in result:
+                result[container] = dict(self.days)
+        return result
+
+    # ─── Scanner ──────────────────────────────────────────────────────────────
+
+    def _consume(self, ch: str):
+        if not self._started:
+            if ch != "{":
+                return None
+            self._started = True
+
+        out = self._out
+        if self._in_string:
+            out.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                self._close_string()
+            return None
+
+        if self._in_scalar and (ch in ",}]" or ch.isspace()):
+            self._in_scalar = False
+            self._mark_safe()
+
+        if ch == '"':
+            self._in_string = True
+            self._string_start = len(out)
+            out.append(ch)
+        elif ch in "{[":
+            name = self._child_name()
+            out.append(ch)
+            self._stack.append(_Frame(ch, name, len(out) - 1))
+            self._mark_safe()
+        elif ch in "}]":
+            return self._close_container(ch)
+        elif ch == ",":
+            out.append(ch)
+            if self._stack:
+                top = self._stack[-1]
+                if top.kind == "{":
+                    top.expect_key = True
+                else:
+                    top.index += 1
+        elif ch == ":":
+            out.append(ch)
+        elif ch.isspace():
+            out.append(ch)
+        else:
+            self._in_scalar = True
+            out.append(ch)
+        return None
+
+    def _child_name(self):
+        if not self._stack:
+            return None
+        top = self._stack[-1]
+        return top.key if top.kind == "{" else top.index
+
+    def _close_string(self):
+        top = self._stack[-1] if self._stack else None
+        if top is not None and top.kind == "{" and top.expect_key:
+            try:
+                top.key = json.loads("".join(self._out[self._string_start:]))
+            except json.JSONDecodeError:
+                top.key = None
+            top.expect_key = False
+        else:
+            self._mark_safe()
+
+    def _close_container(self, ch: str):
+        out = self._out
+        # Tolerate a trailing comma before the closing bracket
+        self._strip_trailing_space()
+        if out and out[-1] == ",":
+            out.pop()
+        out.append(ch)
+        if not self._stack:
+            return None
+        frame = self._stack.pop()
+        self._mark_safe()
+        if not self._stack:
+            self._done = True
+            return None
+        return self._completed_day(frame)
+
+    def _completed_day(self, frame: _Frame):
+        """A day is any object directly inside one of the plan containers"""
+        if frame.kind != "{" or len(self._stack) != 2:
+            return None
+        container = self._stack[1]
+        if container.name not in self.containers:
+            return None
+        try:
+            data = json.loads("".join(self._out[frame.start:]))
+        except json.JSONDecodeError:
+            return None
+        day = frame.name if container.kind == "{" else data.get("day", frame.name)
+        self.days[str(day)] = data
+        return str(day), data
+
+    def _strip_trailing_space(self):
+        out = self._out
+        trailing = []
+        while out and out[-1].isspace():
+            trailing.append(out.pop())
+        if out and out[-1] != ",":
+            out.extend(reversed(trailing))
+
+    def _mark_safe(self):
+        self._safe_len = len(self._out)
+        self._safe_closers = "".join("}" if f.kind == "{" else "]" for f in reversed(self._stack))
+
+    def _mark_safe_before_separator(self):
+        """A scalar that was cut off is only kept if it already parses"""
+        text = "".join(self._out)
+        start = max(text.rfind(c) for c in ",:[") + 1
+        try:
+            json.loads(text[start:].strip())
+        except json.JSONDecodeError:
+            return
+        self._mark_safe()
+
+
+def parse_json_tolerant(text: Optional[str]) -> Optional[dict]:
+    """Parse the first JSON object in a model response, repairing truncation"""
+    if not text:
+        return None
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    return parser.finish()
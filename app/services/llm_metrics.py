@@ -0,0 +1,324 @@
+"""
+LLM Metrics - per-call instrumentation of the AI agent
+
+- @instrumented wraps each public agent method (sync, async and streaming) and
+  opens a CallRecord in a context variable
+- The layers below add to the open record: provider calls with queue wait
+  and token usage, JSON parse outcome, cache lookups, and where the answer
+  came from (llm, cache, local or fallback; the last one noted wins)
+- Records are folded into per-method counters and HDR-style log-linear
+  latency histograms, exported as JSON or in Prometheus text format
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# ─── Histogram ────────────────────────────────────────────────────────────────
+
+SUB_BUCKET_BITS = 6  # 64 linear sub-buckets per power of two: <~3% relative error
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_VALUE_US = 1 << 36  # ~19 hours
+
+# Bucket bounds (seconds) exported to Prometheus; percentiles use full resolution
+PROMETHEUS_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _bucket_index(value: int) -> int:
+    if value < 2 * SUB_BUCKET_HALF:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    """Largest value that lands in the bucket"""
+    if index < 2 * SUB_BUCKET_HALF:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    return ((index - (shift << (SUB_BUCKET_BITS - 1))) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram over microseconds with bounded relative error"""
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (_bucket_index(MAX_VALUE_US) + 1)
+        self.total = 0
+        self.sum_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        value = min(max(int(seconds * 1_000_000), 0), MAX_VALUE_US)
+        self.counts[_bucket_index(value)] += 1
+        self.total += 1
+        self.sum_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def percentile(self, quantile: float) -> float:
+        if not self.total:
+            return 0.0
+        rank = max(1, int(quantile * self.total + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(_bucket_upper(index) / 1_000_000, self.max_seconds)
+        return self.max_seconds
+
+    def cumulative(self, bounds=PROMETHEUS_BOUNDS) -> List[Tuple[float, int]]:
+        """(le, count) pairs; a bucket counts toward the first bound its upper edge fits"""
+        result, seen, index = [], 0, 0
+        for bound in bounds:
+            limit = int(bound * 1_000_000)
+            while index < len(self.counts) and _bucket_upper(index) <= limit:
+                seen += self.counts[index]
+                index += 1
+            result.append((bound, seen))
+        return result
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "mean": round(self.sum_seconds / self.total, 4) if self.total else 0.0,
+            "max": round(self.max_seconds, 4),
+            **{f"p{int(q * 100)}": round(self.percentile(q), 4) for q in QUANTILES},
+        }
+
+
+# ─── Per-call records ─────────────────────────────────────────────────────────
+
+@dataclass
+class CallRecord:
+    method: str
+    started: float = field(default_factory=time.monotonic)
+    source: Optional[str] = None
+    llm_requests: int = 0
+    llm_errors: int = 0
+    llm_seconds: float = 0.0
+    queue_wait: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    json_results: List[str] = field(default_factory=list)
+    cache_lookups: List[Tuple[str, bool]] = field(default_factory=list)
+
+
+_current_call: ContextVar[Optional[CallRecord]] = ContextVar("llm_current_call", default=None)
+
+
+def note_source(source: str):
+    """Where the answer came from: llm, cache, local, partial or fallback"""
+    record = _current_call.get()
+    if record is not None:
+        record.source = source
+
+
+def note_llm_request(seconds: float, queue_wait: float = 0.0, prompt_tokens: int = 0,
+                     completion_tokens: int = 0, error: bool = False):
+    record = _current_call.get()
+    if record is None:
+        return
+    record.llm_requests += 1
+    record.llm_errors += int(error)
+    record.llm_seconds += seconds
+    record.queue_wait += queue_wait
+    record.prompt_tokens += prompt_tokens
+    record.completion_tokens += completion_tokens
+    if not error:
+        record.source = "llm"
+
+
+def note_json(result: str):
+    """ok, repaired or failed"""
+    record = _current_call.get()
+    if record is not None:
+        record.json_results.append(result)
+
+
+def note_cache(cache: str, hit: bool):
+    record = _current_call.get()
+    if record is not None:
+        record.cache_lookups.append((cache, hit))
+        if hit:
+            record.source = "cache"
+
+
+@dataclass
+class MethodStats:
+    calls: int = 0
+    sources: Dict[str, int] = field(default_factory=dict)
+    llm_requests: int = 0
+    llm_errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    json_results: Dict[str, int] = field(default_factory=dict)
+    cache_lookups: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    wall_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    llm_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queue_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class LLMMetrics:
+    def __init__(self):
+        self._methods: Dict[str, MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord, wall_seconds: float):
+        source = call.source or "none"
+        with self._lock:
+            stats = self._methods.setdefault(call.method, MethodStats())
+            stats.calls += 1
+            stats.sources[source] = stats.sources.get(source, 0) + 1
+            stats.wall_time.record(wall_seconds)
+            stats.llm_requests += call.llm_requests
+            stats.llm_errors += call.llm_errors
+            stats.prompt_tokens += call.prompt_tokens
+            stats.completion_tokens += call.completion_tokens
+            if call.llm_requests:
+                stats.llm_time.record(call.llm_seconds)
+                stats.queue_wait.record(call.queue_wait)
+            for result in call.json_results:
+                stats.json_results[result] = stats.json_results.get(result, 0) + 1
+            for cache, hit in call.cache_lookups:
+                key = (cache, "hit" if hit else "miss")
+                stats.cache_lookups[key] = stats.cache_lookups.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                method: {
+                    "calls": s.calls,
+                    "sources": dict(s.sources),
+                    "fallback_rate": round(s.sources.get("fallback", 0) / s.calls, 4) if s.calls else 0.0,
+                    "llm_requests": s.llm_requests,
+                    "llm_errors": s.llm_errors,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                    "json": dict(s.json_results),
+                    "cache": {f"{cache}_{result}": n for (cache, result), n in s.cache_lookups.items()},
+                    "wall_time_seconds": s.wall_time.summary(),
+                    "llm_time_seconds": s.llm_time.summary(),
+                    "queue_wait_seconds": s.queue_wait.summary(),
+                }
+                for method, s in sorted(self._methods.items())
+            }
+
+    # ─── Prometheus ───────────────────────────────────────────────────────────
+
+    def prometheus(self, prefix: str = "arogyamitra") -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def sample(name: str, labels: dict, value):
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+        def histogram(name: str, help_text: str, attr: str):
+            family(name, "histogram", help_text)
+            for method, s in methods:
+                hist: LatencyHistogram = getattr(s, attr)
+                for bound, count in hist.cumulative():
+                    sample(f"{name}_bucket", {"method": method, "le": bound}, count)
+                sample(f"{name}_bucket", {"method": method, "le": "+Inf"}, hist.total)
+                sample(f"{name}_sum", {"method": method}, round(hist.sum_seconds, 6))
+                sample(f"{name}_count", {"method": method}, hist.total)
+
+        with self._lock:
+            methods = sorted(self._methods.items())
+
+            family("agent_calls_total", "counter", "Agent method calls by answer source")
+            for method, s in methods:
+                for source, n in sorted(s.sources.items()):
+                    sample("agent_calls_total", {"method": method, "source": source}, n)
+
+            histogram("agent_call_duration_seconds", "Wall time of agent method calls", "wall_time")
+            family("agent_call_duration_quantile_seconds", "gauge", "High-resolution wall time percentiles")
+            for method, s in methods:
+                for q in QUANTILES:
+                    sample("agent_call_duration_quantile_seconds", {"method": method, "quantile": q},
+                           round(s.wall_time.percentile(q), 6))
+            histogram("llm_request_duration_seconds", "Time spent in provider calls per agent call", "llm_time")
+            histogram("llm_queue_wait_seconds", "Time spent waiting for LLM admission per agent call", "queue_wait")
+
+            family("llm_requests_total", "counter", "Provider requests made")
+            for method, s in methods:
+                sample("llm_requests_total", {"method": method}, s.llm_requests)
+            family("llm_request_errors_total", "counter", "Provider requests that failed or were rejected")
+            for method, s in methods:
+                sample("llm_request_errors_total", {"method": method}, s.llm_errors)
+            family("llm_tokens_total", "counter", "Prompt and completion tokens")
+            for method, s in methods:
+                sample("llm_tokens_total", {"method": method, "type": "prompt"}, s.prompt_tokens)
+                sample("llm_tokens_total", {"method": method, "type": "completion"}, s.completion_tokens)
+            family("llm_json_parse_total", "counter", "JSON parse outcomes of model output")
+            for method, s in methods:
+                for result, n in sorted(s.json_results.items()):
+                    sample("llm_json_parse_total", {"method": method, "result": result}, n)
+            family("cache_lookups_total", "counter", "Cache lookups made on behalf of agent calls")
+            for method, s in methods:
+                for (cache, result), n in sorted(s.cache_lookups.items()):
+                    sample("cache_lookups_total", {"method": method, "cache": cache, "result": result}, n)
+
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+llm_metrics = LLMMetrics()
+
+
+def instrumented(method: str):
+    """Record wall time and everything noted below for one agent method"""
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def stream_wrapper(*args, **kwargs):
+                call = CallRecord(method)
+                token = _current_call.set(call)
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                finally:
+                    llm_metrics.record(call, time.monotonic() - call.started)
+                    try:
+                        _current_call.reset(token)
+                    except ValueError:
+                        pass  # finalised from another context (e.g. client disconnect)
+            return stream_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                call = CallRecord(method)
+                token = _current_call.set(call)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    llm_metrics.record(call, time.monotonic() - call.started)
+                    _current_call.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            call = CallRecord(method)
+            token = _current_call.set(call)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                llm_metrics.record(call, time.monotonic() - call.started)
+                _current_call.reset(token)
+        return sync_wrapper
+
+    return decorator
@@ -0,0 +1,182 @@
+"""
+LLM Recorder - capture real Groq exchanges and replay them offline
+
+Works as an httpx transport under the Groq SDK, so everything above it
+(scheduler, single-flight, streaming parser, JSON repair) runs unchanged:
+- record: forward to the real API and append each request/response pair to
+  a JSONL file
+- replay: answer from that file without any network access; identical
+  requests are served their recorded responses in order, so a replayed
+  load test is deterministic
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Request fields that do not change what the model would answer
+VOLATILE_FIELDS = ("user", "seed", "timeout")
+
+
+def request_key(body: bytes) -> str:
+    """Stable key for a chat completion request body"""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return hashlib.sha256(body or b"").hexdigest()
+    for field in VOLATILE_FIELDS:
+        payload.pop(field, None)
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMRecorder:
+    def __init__(self, mode: str, path: str, realtime: bool = False):
+        self.mode = mode
+        self.path = path
+        self.realtime = realtime
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, List[dict]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.stats = {"recorded": 0, "replayed": 0, "replay_misses": 0}
+        if mode == REPLAY:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._recordings[entry["key"]].append(entry)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  LLM recordings unavailable: {e}")
+        print(f"🎞️  Replaying {sum(len(v) for v in self._recordings.values())} recorded LLM responses")
+
+    # ─── Record ───────────────────────────────────────────────────────────────
+
+    def record(self, request: httpx.Request, response: httpx.Response, content: bytes, elapsed: float):
+        entry = {
+            "key": request_key(request.content),
+            "url": str(request.url.path),
+            "request": json.loads(request.content or b"{}"),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": content.decode("utf-8"),
+            "elapsed": round(elapsed, 4),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.stats["recorded"] += 1
+
+    # ─── Replay ───────────────────────────────────────────────────────────────
+
+    def lookup(self, request: httpx.Request) -> Optional[dict]:
+        key = request_key(request.content)
+        with self._lock:
+            entries = self._recordings.get(key)
+            if not entries:
+                self.stats["replay_misses"] += 1
+                return None
+            entry = entries[self._cursor[key] % len(entries)]
+            self._cursor[key] += 1
+            self.stats["replayed"] += 1
+            return entry
+
+    @staticmethod
+    def build_response(request: httpx.Request, entry: Optional[dict]) -> httpx.Response:
+        if entry is None:
+            return httpx.Response(
+                404,
+                json={"error": {"message": "No recorded response for this request", "type": "replay_miss"}},
+                request=request,
+            )
+        return httpx.Response(
+            entry["status"],
+            headers={"content-type": entry["content_type"]},
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded_keys": len(self._recordings),
+            **self.stats,
+        }
+
+
+def _response_copy(response: httpx.Response, content: bytes, request: httpx.Request) -> httpx.Response:
+    # The body has already been decoded, so drop the transfer headers that described it
+    headers = {k: v for k, v in response.headers.items()
+               if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+    return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Async transport that records through to the real API or replays from disk.
+    Recording buffers each response, so streams arrive in one piece while recording."""
+
+    def __init__(self, recorder: LLMRecorder, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.recorder = recorder
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        if self.recorder.mode == REPLAY:
+            entry = self.recorder.lookup(request)
+            if entry and self.recorder.realtime:
+                await asyncio.sleep(entry["elapsed"])
+            return self.recorder.build_response(request, entry)
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = b"".join([chunk async for chunk in response.aiter_bytes()])
+        finally:
+            await response.aclose()
+        copy = _response_copy(response, content, request)
+        self.recorder.record(request, copy, copy.content, time.monotonic() - started)
+        return copy
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class SyncRecordingTransport(httpx.BaseTransport):
+    """Blocking twin of RecordingTransport for the synchronous Groq client"""
+
+    def __init__(self, recorder: LLMRecorder, transport: Optional[httpx.BaseTransport] = None):
+        self.recorder = recorder
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        if self.recorder.mode == REPLAY:
+            entry = self.recorder.lookup(request)
+            if entry and self.recorder.realtime:
+                time.sleep(entry["elapsed"])
+            return self.recorder.build_response(request, entry)
+        started = time.monotonic()
+        response = self.transport.handle_request(request)
+        try:
+            content = b"".join(response.iter_bytes())
+        finally:
+            response.close()
+        copy = _response_copy(response, content, request)
+        self.recorder.record(request, copy, copy.content, time.monotonic() - started)
+        return copy
+
+    def close(self):
+        self.transport.close()
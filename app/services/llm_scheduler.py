@@ -0,0 +1,307 @@
+"""
+LLM Scheduler - admission control in front of every async Groq call
+
+- Bounded concurrency: at most LLM_MAX_CONCURRENCY calls in flight
+- Priority classes: waiting interactive chat is admitted before bulk plan work
+- Token buckets for requests/min and tokens/min, sized to the provider quota
+- Deadlines: a call that cannot start before its request deadline is rejected,
+  and admitted calls get their timeout clipped to the time that is left
+- Circuit breaker: consecutive failures or a slow p95 on interactive calls
+  open the breaker; callers then get AdmissionRejected and fall back to the
+  local plan engine / canned replies until a half-open probe succeeds
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Optional
+
+from app.utils.config import settings
+from app.utils.deadline import current_deadline
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class AdmissionRejected(Exception):
+    """The call was not sent to the provider; callers should use their fallback"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# ─── Token bucket ─────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float, deadline: Optional[float]):
+        if self.capacity <= 0:
+            return  # limit disabled
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            wait = (amount - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise AdmissionRejected("rate_limited")
+            await asyncio.sleep(wait)
+
+    def level(self) -> float:
+        self._refill()
+        return round(self.tokens, 1)
+
+
+# ─── Circuit breaker ──────────────────────────────────────────────────────────
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, p95_threshold: float, cooldown: float, window: int = 50):
+        self.failure_threshold = failure_threshold
+        self.p95_threshold = p95_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.last_trip_reason = None
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=window)
+
+    def _update_state(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+
+    def allow(self) -> bool:
+        self._update_state()
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency: Optional[float]):
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._latencies.clear()
+        self._probe_in_flight = False
+        if latency is not None:
+            self._latencies.append(latency)
+            if len(self._latencies) >= 10 and self.p95() > self.p95_threshold:
+                self._trip("p95_latency")
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._trip("failures")
+
+    def release_probe(self):
+        self._probe_in_flight = False
+
+    def _trip(self, reason: str):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self.last_trip_reason = reason
+        self._latencies.clear()
+        print(f"⚠️  LLM circuit breaker opened ({reason}) - serving fallbacks for {self.cooldown}s")
+
+    def p95(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def get_stats(self) -> dict:
+        self._update_state()
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "last_trip_reason": self.last_trip_reason,
+            "interactive_p95_seconds": round(self.p95(), 3),
+        }
+
+
+# ─── Scheduler ────────────────────────────────────────────────────────────────
+
+class Ticket:
+    """Handed to an admitted call; clips its timeout to the request deadline"""
+
+    def __init__(self, priority: Priority, deadline: Optional[float], queue_wait: float = 0.0):
+        self.priority = priority
+        self.deadline = deadline
+        self.started = time.monotonic()
+        self.queue_wait = queue_wait
+        self.first_token_latency: Optional[float] = None
+
+    def timeout(self, default: float) -> float:
+        if self.deadline is None:
+            return default
+        return max(0.1, min(default, self.deadline - time.monotonic()))
+
+    def mark_first_token(self):
+        if self.first_token_latency is None:
+            self.first_token_latency = time.monotonic() - self.started
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        breaker: CircuitBreaker,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.breaker = breaker
+        self.active = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self.stats = {"admitted": 0, "completed": 0, "failed": 0, "rejected": {}}
+        # Smoothed wall time of a completed interactive call, for "time saved" estimates
+        self.interactive_latency: Optional[float] = None
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority, estimated_tokens: int):
+        """Hold a slot for one provider call; raises AdmissionRejected instead of calling"""
+        entered = time.monotonic()
+        deadline = current_deadline()
+        if deadline is not None and deadline <= time.monotonic():
+            self._reject("deadline_exceeded")
+        if not self.breaker.allow():
+            self._reject("circuit_open")
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            await self._acquire_slot(priority, deadline)
+            try:
+                await self.request_bucket.acquire(1, deadline)
+                await self.token_bucket.acquire(estimated_tokens, deadline)
+            except BaseException:
+                self._release_slot()
+                raise
+        except BaseException as e:
+            if probe:
+                self.breaker.release_probe()
+            if isinstance(e, AdmissionRejected):
+                self._reject(e.reason)
+            raise
+
+        self.stats["admitted"] += 1
+        ticket = Ticket(priority, deadline, queue_wait=time.monotonic() - entered)
+        try:
+            yield ticket
+        except (asyncio.CancelledError, GeneratorExit):
+            # Caller went away; says nothing about provider health
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except BaseException:
+            self.stats["failed"] += 1
+            self.breaker.record_failure()
+            raise
+        else:
+            self.stats["completed"] += 1
+            latency = ticket.first_token_latency or (time.monotonic() - ticket.started)
+            # Only interactive calls feed the p95 check; plan generation is slow by design
+            self.breaker.record_success(latency if priority == Priority.INTERACTIVE else None)
+            if priority == Priority.INTERACTIVE:
+                elapsed = time.monotonic() - ticket.started
+                previous = self.interactive_latency
+                self.interactive_latency = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+        finally:
+            self._release_slot()
+
+    # ─── Slots ────────────────────────────────────────────────────────────────
+
+    async def _acquire_slot(self, priority: Priority, deadline: Optional[float]):
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected("queue_full")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        timeout = None if deadline is None else deadline - time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected("deadline_exceeded")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the caller was cancelled
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the highest-priority waiter
+                future.set_result(True)
+                return
+        self.active -= 1
+
+    def _reject(self, reason: str):
+        self.stats["rejected"][reason] = self.stats["rejected"].get(reason, 0) + 1
+        raise AdmissionRejected(reason)
+
+    def get_stats(self) -> dict:
+        waiting = [entry for entry in self._waiters if not entry[2].done()]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queue_depth": len(waiting),
+            "queue_depth_by_priority": {
+                p.name.lower(): sum(1 for entry in waiting if entry[0] == p) for p in Priority
+            },
+            "request_bucket_level": self.request_bucket.level(),
+            "token_bucket_level": self.token_bucket.level(),
+            "circuit_breaker": self.breaker.get_stats(),
+            "interactive_latency_seconds": (
+                round(self.interactive_latency, 3) if self.interactive_latency is not None else None
+            ),
+            **self.stats,
+        }
+
+
+# Global scheduler instance
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        p95_threshold=settings.LLM_BREAKER_P95_SECONDS,
+        cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+    ),
+)
@@ -0,0 +1,287 @@
+"""
+Plan Cache - profile-keyed cache for generated workout and nutrition plans
+
+Plans depend on a handful of low-cardinality profile fields, so requests are
+normalised into bucketed keys (age in 5-year bands, weight/height in 5-unit
+bands, free-text medical fields hashed) and served from:
+- an in-memory LRU tier
+- a SQLite-backed persistent tier that survives restarts, opened on first
+  use; async callers reach it through get_async/set_async, which keep the
+  disk I/O in a worker thread
+Both tiers honour a TTL and a maximum size.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.utils.config import settings
+
+
+# Fields each plan kind actually feeds into its prompt
+WORKOUT_FIELDS = (
+    "age", "gender", "height", "weight", "fitness_level", "fitness_goal",
+    "workout_place", "workout_preference", "available_minutes", "workout_time",
+    "medical_history", "injuries", "health_conditions",
+)
+NUTRITION_FIELDS = (
+    "age", "gender", "height", "weight", "fitness_goal", "diet_preference",
+    "allergies", "total_calories", "target_calories",
+)
+PLAN_FIELDS = {"workout": WORKOUT_FIELDS, "nutrition": NUTRITION_FIELDS}
+
+BANDED_FIELDS = {"age": 5, "weight": 5, "height": 5}
+HASHED_FIELDS = {"medical_history", "injuries", "health_conditions", "allergies"}
+EMPTY_TEXT = {"", "none", "no", "nil", "n/a", "na", "null"}
+LAST_ACCESS_RESOLUTION_SECONDS = 300
+
+
+def _band(value, width: int):
+    try:
+        return int(float(value) // width) * width
+    except (TypeError, ValueError):
+        return None
+
+
+def _hash_text(value) -> Optional[str]:
+    text = " ".join(str(value or "").lower().split())
+    if text in EMPTY_TEXT:
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _normalize_scalar(value):
+    if isinstance(value, str):
+        value = value.strip().lower().replace(" ", "_")
+        return value or None
+    return value
+
+
+def normalize_profile(kind: str, user_data: dict) -> dict:
+    """Reduce user_data to the bucketed fields that determine a plan"""
+    normalized = {}
+    for field in PLAN_FIELDS[kind]:
+        value = user_data.get(field)
+        if field in BANDED_FIELDS:
+            value = _band(value, BANDED_FIELDS[field])
+        elif field in HASHED_FIELDS:
+            value = _hash_text(value)
+        else:
+            value = _normalize_scalar(value)
+        normalized[field] = value
+    return normalized
+
+
+def make_cache_key(kind: str, user_data: dict) -> str:
+    payload = json.dumps(normalize_profile(kind, user_data), sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class PlanCache:
+    """Two-tier (LRU memory + SQLite) cache for generated plans"""
+
+    def __init__(self, db_path: str, ttl_seconds: int, memory_entries: int, max_entries: int):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()        # memory tier and stats
+        self._disk_lock = threading.Lock()   # SQLite connection
+        self._conn = None
+        self._disk_disabled = False
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier on first use (under the disk lock), so importing creates no file"""
+        if self._conn is not None or self._disk_disabled:
+            return self._conn
+        try:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS plan_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    plan TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_plan_cache_last_access ON plan_cache (last_access)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            print(f"⚠️  Plan cache persistence disabled: {e}")
+            self._disk_disabled = True
+        return self._conn
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def get(self, kind: str, user_data: dict) -> Optional[dict]:
+        key = make_cache_key(kind, user_data)
+        plan = self._from_memory(key)
+        return plan if plan is not None else self._from_disk(key)
+
+    async def get_async(self, kind: str, user_data: dict) -> Optional[dict]:
+        """get() for the event loop: the SQLite tier is read in a worker thread"""
+        key = make_cache_key(kind, user_data)
+        plan = self._from_memory(key)
+        return plan if plan is not None else await asyncio.to_thread(self._from_disk, key)
+
+    def set(self, kind: str, user_data: dict, plan: dict):
+        key, payload, now = make_cache_key(kind, user_data), json.dumps(plan), time.time()
+        self._to_memory(key, payload, now)
+        self._to_disk(key, kind, payload, now)
+
+    async def set_async(self, kind: str, user_data: dict, plan: dict):
+        """set() for the event loop: the SQLite tier is written in a worker thread"""
+        key, payload, now = make_cache_key(kind, user_data), json.dumps(plan), time.time()
+        self._to_memory(key, payload, now)
+        await asyncio.to_thread(self._to_disk, key, kind, payload, now)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM plan_cache")
+                conn.commit()
+
+    def get_stats(self) -> dict:
+        with self._disk_lock:
+            disk_entries = self._disk_count()
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = lookups - self.stats["misses"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # ─── Tiers ────────────────────────────────────────────────────────────────
+
+    def _from_memory(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, payload = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+        return json.loads(payload)
+
+    def _from_disk(self, key: str) -> Optional[dict]:
+        with self._disk_lock:
+            row = self._disk_get(key, time.time())
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            created_at, payload = row
+            self._memory_put(key, created_at, payload)
+            self.stats["disk_hits"] += 1
+        return json.loads(payload)
+
+    def _to_memory(self, key: str, payload: str, now: float):
+        with self._lock:
+            self._memory_put(key, now, payload)
+            self.stats["writes"] += 1
+
+    def _to_disk(self, key: str, kind: str, payload: str, now: float):
+        with self._disk_lock:
+            evicted = self._disk_put(key, kind, payload, now)
+        with self._lock:
+            self.stats["evictions"] += evicted
+
+    def _memory_put(self, key: str, created_at: float, payload: str):
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT created_at, plan, last_access FROM plan_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[0] > self.ttl_seconds:
+                conn.execute("DELETE FROM plan_cache WHERE cache_key = ?", (key,))
+                conn.commit()
+                return None
+            # last_access only orders disk evictions, so a coarse timestamp is
+            # enough and most hits skip the write and commit
+            if now - row[2] > LAST_ACCESS_RESOLUTION_SECONDS:
+                conn.execute("UPDATE plan_cache SET last_access = ? WHERE cache_key = ?", (now, key))
+                conn.commit()
+            return row[:2]
+        except sqlite3.Error as e:
+            print(f"Plan cache read error: {e}")
+            return None
+
+    def _disk_put(self, key: str, kind: str, payload: str, now: float) -> int:
+        conn = self._connection()
+        if conn is None:
+            return 0
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO plan_cache (cache_key, kind, plan, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, payload, now, now),
+            )
+            evicted = self._disk_evict(conn, now)
+            conn.commit()
+            return evicted
+        except sqlite3.Error as e:
+            print(f"Plan cache write error: {e}")
+            return 0
+
+    def _disk_evict(self, conn: sqlite3.Connection, now: float) -> int:
+        expired = conn.execute(
+            "DELETE FROM plan_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._disk_count() - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM plan_cache WHERE cache_key IN "
+                "(SELECT cache_key FROM plan_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+        return max(expired, 0) + max(overflow, 0)
+
+    def _disk_count(self) -> int:
+        conn = self._connection()
+        if conn is None:
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM plan_cache").fetchone()[0]
+
+
+# Global plan cache instance
+plan_cache = PlanCache(
+    db_path=settings.PLAN_CACHE_PATH,
+    ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+    memory_entries=settings.PLAN_CACHE_MEMORY_ENTRIES,
+    max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+)
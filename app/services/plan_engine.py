@@ -0,0 +1,563 @@
+"""
+ArogyaMitra Plan Engine - deterministic, rule-based plan generation
+
+Builds 7-day workout and Indian nutrition plans locally, in the same shape the
+LLM returns (weekly_schedule / weekly_meals), from app/data/plan_catalogue.json:
+- an exercise catalogue annotated with muscle groups, equipment, difficulty and MET
+- an Indian meal catalogue annotated with diet type and macros
+The catalogue is loaded once, on first use, into read-only structures, and the
+filtered exercise pools and meal candidates are memoised per level, place,
+diet and allergies.
+A constraint-based scheduler fills each day to the user's goal, level, place,
+time budget, diet and allergies. Output is deterministic for a given profile.
+"""
+
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.services.plan_cache import EMPTY_TEXT
+
+DAYS_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def parse_days(days: List[str]) -> List[str]:
+    """Normalise requested day names, keeping week order; ValueError on anything unknown"""
+    requested = {d.strip().title() for d in days}
+    unknown = requested - set(DAYS_ORDER)
+    if not requested or unknown:
+        raise ValueError(f"Invalid days: {sorted(unknown) or 'none given'}")
+    return [day for day in DAYS_ORDER if day in requested]
+
+
+LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3}
+
+# Equipment reachable at each workout place
+PLACE_EQUIPMENT = {
+    "home": {"none", "resistance_band", "jump_rope"},
+    "outdoor": {"none", "pull_up_bar", "jump_rope"},
+    "gym": {"none", "dumbbells", "barbell", "bench", "machine", "cable", "kettlebell", "pull_up_bar", "jump_rope"},
+}
+PLACE_EQUIPMENT["mixed"] = PLACE_EQUIPMENT["home"] | PLACE_EQUIPMENT["gym"]
+
+
+# Weekly splits per goal: (focus, categories); no categories means rest
+REST = ("Rest Day", [])
+WEEKLY_SPLITS = {
+    "weight_loss": [
+        ("Full Body HIIT", ["cardio", "lower", "upper_push", "core"]),
+        ("Cardio & Core", ["cardio", "core"]),
+        ("Lower Body & Cardio", ["lower", "cardio"]),
+        ("Active Recovery", ["mobility", "cardio"]),
+        ("Upper Body & Core", ["upper_push", "upper_pull", "core"]),
+        ("Full Body Circuit", ["lower", "upper_push", "cardio", "core"]),
+        REST,
+    ],
+    "muscle_gain": [
+        ("Chest & Triceps", ["upper_push"]),
+        ("Back & Biceps", ["upper_pull"]),
+        ("Legs & Glutes", ["lower"]),
+        REST,
+        ("Shoulders & Core", ["upper_push", "core"]),
+        ("Full Body Strength", ["lower", "upper_pull", "upper_push"]),
+        REST,
+    ],
+    "strength_training": [
+        ("Lower Body Strength", ["lower"]),
+        ("Upper Body Push", ["upper_push"]),
+        REST,
+        ("Lower Body & Core", ["lower", "core"]),
+        ("Upper Body Pull", ["upper_pull"]),
+        ("Full Body Strength", ["lower", "upper_push", "upper_pull"]),
+        REST,
+    ],
+    "endurance": [
+        ("Cardio Endurance", ["cardio"]),
+        ("Full Body Circuit", ["lower", "upper_push", "core"]),
+        ("Cardio Intervals", ["cardio", "core"]),
+        ("Active Recovery", ["mobility"]),
+        ("Lower Body Endurance", ["lower", "cardio"]),
+        ("Long Cardio Day", ["cardio"]),
+        REST,
+    ],
+    "general_fitness": [
+        ("Full Body Strength", ["upper_push", "lower", "core"]),
+        ("Cardio & Core", ["cardio", "core"]),
+        REST,
+        ("Upper Body and Cardio", ["upper_push", "cardio"]),
+        ("Lower Body and Core", ["lower", "core"]),
+        ("Back and Biceps", ["upper_pull", "core"]),
+        ("Cardio Day", ["cardio"]),
+    ],
+}
+WEEKLY_SPLITS["maintenance"] = WEEKLY_SPLITS["general_fitness"]
+
+# (sets, reps, rest_seconds) per goal for rep-based work
+GOAL_VOLUME = {
+    "weight_loss": (3, "12-15", 45),
+    "muscle_gain": (4, "8-12", 75),
+    "strength_training": (4, "6-8", 90),
+    "endurance": (3, "15-20", 45),
+    "general_fitness": (3, "10-12", 60),
+    "maintenance": (3, "10-12", 60),
+}
+TIMED_WORK_SECONDS = {1: 30, 2: 45, 3: 60}
+SECONDS_PER_REP = 3
+WARMUP_MINUTES = 5
+COOLDOWN_MINUTES = 5
+MAX_EXERCISES_PER_DAY = 8
+
+WARMUPS = {
+    "home": "5-minute jogging in place, arm circles and jumping jacks",
+    "outdoor": "5-minute brisk walk followed by leg swings",
+    "gym": "5 minutes on the treadmill or cycle plus dynamic stretches",
+    "mixed": "5 minutes light cardio and dynamic stretching",
+}
+COOLDOWNS = {
+    "cardio": "5 minutes walking and deep breathing",
+    "mobility": "5 minutes gentle yoga and deep breathing",
+    "default": "5 minutes full body stretching",
+}
+
+TIME_SLOT_STARTS = {"morning": (6, 0), "afternoon": (12, 30), "evening": (18, 0), "night": (20, 0)}
+
+DIET_RANK = {"vegan": 0, "vegetarian": 1, "eggetarian": 2, "non_vegetarian": 3}
+
+MEAL_SPLIT = {"breakfast": 0.25, "lunch": 0.35, "dinner": 0.28, "snack": 0.12}
+MEAL_TIMES = {"breakfast": "7:00 AM", "lunch": "12:30 PM", "dinner": "7:30 PM", "snack": "4:30 PM"}
+
+ALLERGEN_SYNONYMS = {
+    "nut": ["peanut", "almond", "walnut", "cashew"],
+    "nuts": ["peanut", "almond", "walnut", "cashew"],
+    "peanut": ["peanut"],
+    "dairy": ["milk", "paneer", "curd", "ghee", "yogurt", "butter", "cheese"],
+    "lactose": ["milk", "paneer", "curd", "yogurt", "cheese"],
+    "milk": ["milk", "paneer", "curd", "yogurt"],
+    "gluten": ["wheat", "semolina", "roti", "bread", "oats", "paratha"],
+    "wheat": ["wheat", "semolina", "roti", "bread", "paratha"],
+    "egg": ["egg"],
+    "eggs": ["egg"],
+    "fish": ["fish"],
+    "seafood": ["fish", "prawn"],
+    "soy": ["soy", "tofu"],
+}
+
+NUTRITION_TIPS = {
+    "weight_loss": ["Fill half your plate with vegetables", "Prefer roti or millets over refined rice",
+                    "Drink a glass of water before each meal"],
+    "muscle_gain": ["Include a protein source in every meal", "Eat a carb + protein meal within 1 hour of training",
+                    "Add dal, paneer, eggs or chicken to reach your protein target"],
+    "default": ["Stay hydrated with 2.5-3L water daily", "Choose whole grains and seasonal vegetables",
+                "Keep fried snacks to once a week"],
+}
+
+
+# ─── Catalogue ────────────────────────────────────────────────────────────────
+
+CATALOGUE_PATH = Path(__file__).resolve().parent.parent / "data" / "plan_catalogue.json"
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def catalogue() -> Mapping[str, tuple]:
+    """{"exercises": (...), "meals": (...)}, read from disk once"""
+    try:
+        with open(CATALOGUE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  Plan catalogue unavailable: {e}")
+        data = {"exercises": [], "meals": []}
+    for ex in data["exercises"]:
+        ex["youtube_search"] = f"{ex['name'].lower()} exercise form"
+    return _freeze(data)
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def is_free_text_empty(value) -> bool:
+    return " ".join(str(value or "").lower().split()) in EMPTY_TEXT
+
+
+def is_common_profile(user_data: dict) -> bool:
+    """Profiles without free-text medical constraints are safe to plan locally"""
+    return all(
+        is_free_text_empty(user_data.get(field))
+        for field in ("medical_history", "injuries", "health_conditions", "current_health_conditions")
+    )
+
+
+def _level(user_data: dict) -> int:
+    return LEVELS.get(str(user_data.get("fitness_level") or "beginner").lower(), 1)
+
+
+def _goal(user_data: dict) -> str:
+    goal = str(user_data.get("fitness_goal") or "general_fitness").lower().replace(" ", "_")
+    return goal if goal in WEEKLY_SPLITS else "general_fitness"
+
+
+def _place(user_data: dict) -> str:
+    place = str(user_data.get("workout_place") or user_data.get("workout_preference") or "home").lower()
+    return place if place in PLACE_EQUIPMENT else "home"
+
+
+def _diet(user_data: dict) -> str:
+    diet = str(user_data.get("diet_preference") or "vegetarian").lower().replace("-", "_").replace(" ", "_")
+    return diet if diet in DIET_RANK else "vegetarian"
+
+
+def _to_float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _format_clock(total_minutes: int) -> str:
+    hours, minutes = divmod(total_minutes % (24 * 60), 60)
+    suffix = "AM" if hours < 12 else "PM"
+    return f"{(hours % 12) or 12}:{minutes:02d} {suffix}"
+
+
+def _preferred_time(user_data: dict) -> str:
+    preferred = str(user_data.get("workout_time") or "morning").lower()
+    return preferred if preferred in TIME_SLOT_STARTS else "morning"
+
+
+def _available_minutes(user_data: dict) -> int:
+    return int(_to_float(user_data.get("available_minutes") or user_data.get("available_minutes_per_day"), 30))
+
+
+def _time_slot(user_data: dict, duration: int) -> str:
+    hour, minute = TIME_SLOT_STARTS[_preferred_time(user_data)]
+    start = hour * 60 + minute
+    return f"{_format_clock(start)} - {_format_clock(start + duration)}"
+
+
+def _reps_midpoint(reps: str) -> int:
+    numbers = [int(n) for n in re.findall(r"\d+", reps)]
+    return sum(numbers) // len(numbers) if numbers else 10
+
+
+# ─── Workout engine ───────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=None)
+def _exercise_pool(category: str, level: int, place: str) -> Tuple[Mapping, ...]:
+    equipment = PLACE_EQUIPMENT[place]
+    pool = [
+        ex for ex in catalogue()["exercises"]
+        if ex["category"] == category and ex["level"] <= level and set(ex["equipment"]) <= equipment
+    ]
+    # Hardest suitable movements first, then alphabetical for a stable order
+    return tuple(sorted(pool, key=lambda ex: (-ex["level"], ex["name"])))
+
+
+def _prescribe(ex: Mapping, goal: str, level: int, weight_kg: float) -> dict:
+    sets, reps, rest = GOAL_VOLUME.get(goal, GOAL_VOLUME["general_fitness"])
+    if ex["category"] == "mobility":
+        sets, rest = 2, 15
+    if ex["timed"]:
+        work = TIMED_WORK_SECONDS[level]
+        if ex["name"] == "Brisk Walking/Jogging":
+            sets, work, rest = 1, 15 * 60, 0
+        reps = f"{work} seconds"
+    else:
+        work = _reps_midpoint(reps) * SECONDS_PER_REP
+    minutes = sets * (work + rest) / 60
+    return {
+        "name": ex["name"],
+        "sets": sets,
+        "reps": reps,
+        "rest_seconds": rest,
+        "description": ex["description"],
+        "muscle_groups": list(ex["muscle_groups"]),
+        "equipment": [e for e in ex["equipment"] if e != "none"],
+        "youtube_search": ex["youtube_search"],
+        "duration_minutes": max(1, round(minutes)),
+        "calories_burned": round(ex["met"] * weight_kg * minutes / 60, 1),
+        "difficulty": {1: "beginner", 2: "intermediate", 3: "advanced"}[ex["level"]],
+    }
+
+
+def _schedule_day(day_index: int, categories: List[str], budget: int, goal: str, level: int,
+                  place: str, weight_kg: float) -> List[dict]:
+    pools = {c: _exercise_pool(c, level, place) for c in categories}
+    cursors = {c: (day_index * 2) % len(pools[c]) if pools[c] else 0 for c in categories}
+    chosen, used, spent = [], set(), 0
+    exhausted = set()
+    while len(chosen) < MAX_EXERCISES_PER_DAY and len(exhausted) < len(categories):
+        for category in categories:
+            if category in exhausted or len(chosen) >= MAX_EXERCISES_PER_DAY:
+                continue
+            pool = pools[category]
+            candidate = None
+            for _ in range(len(pool)):
+                ex = pool[cursors[category] % len(pool)]
+                cursors[category] += 1
+                if ex["name"] not in used:
+                    candidate = ex
+                    break
+            if candidate is None:
+                exhausted.add(category)
+                continue
+            prescribed = _prescribe(candidate, goal, level, weight_kg)
+            if chosen and spent + prescribed["duration_minutes"] > budget:
+                exhausted.add(category)
+                continue
+            chosen.append(prescribed)
+            used.add(candidate["name"])
+            spent += prescribed["duration_minutes"]
+    return chosen
+
+
+def build_workout_plan(user_data: dict) -> dict:
+    """Build a 7-day workout plan matching the LLM weekly_schedule shape"""
+    goal, level, place = _goal(user_data), _level(user_data), _place(user_data)
+    weight_kg = _to_float(user_data.get("weight"), 70.0)
+    available = _available_minutes(user_data)
+    budget = max(10, available - WARMUP_MINUTES - COOLDOWN_MINUTES)
+
+    split = list(WEEKLY_SPLITS[goal])
+    if level == 1 and sum(1 for _, cats in split if not cats) < 2:
+        # Beginners get a second recovery day at the end of the week
+        split[-1] = REST
+
+    weekly_schedule = {}
+    for index, day in enumerate(DAYS_ORDER):
+        focus, categories = split[index]
+        if not categories:
+            weekly_schedule[day] = {
+                "focus": "Rest Day",
+                "duration_minutes": 0,
+                "time_slot": "",
+                "is_rest": True,
+                "warmup": None,
+                "exercises": [],
+                "cooldown": None,
+            }
+            continue
+        exercises = _schedule_day(index, categories, budget, goal, level, place, weight_kg)
+        duration = WARMUP_MINUTES + COOLDOWN_MINUTES + sum(e["duration_minutes"] for e in exercises)
+        cooldown_key = categories[0] if categories[0] in COOLDOWNS else "default"
+        weekly_schedule[day] = {
+            "focus": focus,
+            "duration_minutes": duration,
+            "time_slot": _time_slot(user_data, duration),
+            "is_rest": False,
+            "warmup": {"description": WARMUPS[place], "duration_minutes": WARMUP_MINUTES},
+            "exercises": exercises,
+            "cooldown": {"description": COOLDOWNS[cooldown_key], "duration_minutes": COOLDOWN_MINUTES},
+        }
+
+    goal_label = goal.replace("_", " ").title()
+    return {
+        "plan_title": f"{goal_label} Plan - {place.title()}",
+        "plan_description": (
+            f"{goal_label} plan for a {['', 'beginner', 'intermediate', 'advanced'][level]} "
+            f"training at {place}, about {available} minutes a day"
+        ),
+        "weekly_schedule": weekly_schedule,
+        "generated_by": "plan_engine",
+    }
+
+
+# ─── Nutrition engine ─────────────────────────────────────────────────────────
+
+def calorie_target(user_data: dict) -> int:
+    """Explicit target if given, otherwise Mifflin-St Jeor adjusted for the goal"""
+    explicit = user_data.get("target_calories") or user_data.get("total_calories")
+    if explicit:
+        return int(explicit)
+    weight = _to_float(user_data.get("weight"), 70.0)
+    height = _to_float(user_data.get("height"), 170.0)
+    age = _to_float(user_data.get("age"), 25.0)
+    is_female = str(user_data.get("gender") or "").lower().startswith("f")
+    bmr = 10 * weight + 6.25 * height - 5 * age + (-161 if is_female else 5)
+    tdee = bmr * 1.45
+    adjustment = {"weight_loss": -450, "muscle_gain": 300}.get(_goal(user_data), 0)
+    target = int(round((tdee + adjustment) / 50.0) * 50)
+    return max(1200, min(3500, target))
+
+
+def _allergen_terms(allergies) -> List[str]:
+    if is_free_text_empty(allergies):
+        return []
+    terms = []
+    for token in re.split(r"[,;/]|\band\b", str(allergies).lower()):
+        token = token.strip()
+        if not token or token in EMPTY_TEXT:
+            continue
+        terms.extend(ALLERGEN_SYNONYMS.get(token, [token.rstrip("s")]))
+    return terms
+
+
+def _meal_allowed(meal: Mapping, diet: str, allergens: Tuple[str, ...]) -> bool:
+    if DIET_RANK[meal["diet"]] > DIET_RANK[diet]:
+        return False
+    text = " ".join((meal["name"], *meal["ingredients"])).lower()
+    return not any(term in text for term in allergens)
+
+
+@lru_cache(maxsize=256)
+def _meal_candidates(diet: str, allergens: Tuple[str, ...]) -> Mapping[str, Tuple[Mapping, ...]]:
+    """Allowed catalogue meals per meal type"""
+    by_type: Dict[str, List[Mapping]] = {t: [] for t in MEAL_SPLIT}
+    for meal in catalogue()["meals"]:
+        if _meal_allowed(meal, diet, allergens):
+            by_type[meal["meal_type"]].append(meal)
+    return MappingProxyType({t: tuple(meals) for t, meals in by_type.items()})
+
+
+def _pick_meal(candidates: Sequence[Mapping], target: float, day_index: int, high_protein: bool) -> Optional[Mapping]:
+    if not candidates:
+        return None
+
+    def score(meal):
+        s = abs(meal["calories"] - target)
+        if high_protein:
+            s -= 3 * meal["protein_g"]
+        return (s, meal["name"])
+
+    ranked = sorted(candidates, key=score)
+    top = ranked[:min(4, len(ranked))]
+    return top[day_index % len(top)]
+
+
+def _portion(meal: Mapping, target: float, meal_time: str) -> dict:
+    factor = max(0.75, min(1.75, target / meal["calories"])) if meal["calories"] else 1.0
+    return {
+        "name": meal["name"],
+        "calories": int(round(meal["calories"] * factor)),
+        "protein_g": round(meal["protein_g"] * factor, 1),
+        "carbs_g": round(meal["carbs_g"] * factor, 1),
+        "fat_g": round(meal["fat_g"] * factor, 1),
+        "ingredients": list(meal["ingredients"]),
+        "meal_time": meal_time,
+    }
+
+
+def build_nutrition_plan(user_data: dict) -> dict:
+    """Build a 7-day Indian meal plan matching the LLM weekly_meals shape"""
+    diet = _diet(user_data)
+    target = calorie_target(user_data)
+    high_protein = _goal(user_data) in ("muscle_gain", "strength_training")
+    by_type = _meal_candidates(diet, tuple(_allergen_terms(user_data.get("allergies"))))
+
+    weekly_meals = {}
+    ingredient_counts: Counter = Counter()
+    for index, day in enumerate(DAYS_ORDER):
+        day_plan = {}
+        for meal_type in ("breakfast", "lunch", "dinner"):
+            slot_target = target * MEAL_SPLIT[meal_type]
+            meal = _pick_meal(by_type[meal_type], slot_target, index, high_protein)
+            if meal:
+                day_plan[meal_type] = _portion(meal, slot_target, MEAL_TIMES[meal_type])
+                ingredient_counts.update(meal["ingredients"])
+
+        snack_budget = target * MEAL_SPLIT["snack"]
+        snack_count = 3 if snack_budget > 300 else 2 if snack_budget > 150 else 1
+        snacks, remaining = [], list(by_type["snack"])
+        for n in range(snack_count):
+            snack = _pick_meal(remaining, snack_budget / snack_count, index + n, high_protein)
+            if not snack:
+                break
+            remaining.remove(snack)
+            snacks.append({"name": snack["name"], "calories": snack["calories"], "meal_time": ""})
+            ingredient_counts.update(snack["ingredients"])
+        day_plan["snacks"] = snacks
+        weekly_meals[day] = day_plan
+
+    grocery_list = [
+        {"item": item, "quantity": f"{count} servings", "weekly_count": count}
+        for item, count in ingredient_counts.most_common(15)
+    ]
+    tips = NUTRITION_TIPS.get(_goal(user_data), NUTRITION_TIPS["default"])
+    return {
+        "plan_title": f"🇮🇳 {diet.replace('_', ' ').title()} Indian Nutrition Plan",
+        "total_calories": target,
+        "weekly_meals": weekly_meals,
+        "grocery_list": grocery_list,
+        "nutritional_tips": list(tips),
+        "generated_by": "plan_engine",
+    }
+
+
+# ─── Variants ─────────────────────────────────────────────────────────────────
+
+# Variants are built for banded profiles; the exact per-user numbers are
+# applied to each copy by personalize()
+REFERENCE_WEIGHT_KG = 70.0
+MINUTE_BAND, MINUTE_RANGE = 15, (15, 120)
+CALORIE_BAND, CALORIE_RANGE = 200, (1200, 3400)
+
+
+def _snap(value: float, width: int, bounds: Tuple[int, int]) -> int:
+    return max(bounds[0], min(bounds[1], int(round(value / width)) * width))
+
+
+def variant_profile(kind: str, user_data: dict) -> dict:
+    """The banded profile a shared variant is built from"""
+    if kind == "workout":
+        return {
+            "fitness_goal": _goal(user_data),
+            "fitness_level": {v: k for k, v in LEVELS.items()}[_level(user_data)],
+            "workout_place": _place(user_data),
+            "weight": REFERENCE_WEIGHT_KG,
+            "available_minutes": _snap(_available_minutes(user_data), MINUTE_BAND, MINUTE_RANGE),
+        }
+    return {
+        "fitness_goal": _goal(user_data),
+        "diet_preference": _diet(user_data),
+        "allergies": user_data.get("allergies"),
+        "target_calories": _snap(calorie_target(user_data), CALORIE_BAND, CALORIE_RANGE),
+    }
+
+
+def variant_key(kind: str, user_data: dict) -> tuple:
+    """Every banded input the builder reads; equal keys share one variant"""
+    profile = variant_profile(kind, user_data)
+    if kind == "workout":
+        return (kind, profile["fitness_goal"], _level(profile), profile["workout_place"], profile["available_minutes"])
+    return (
+        kind,
+        profile["fitness_goal"],
+        profile["diet_preference"],
+        tuple(_allergen_terms(profile["allergies"])),
+        profile["target_calories"],
+    )
+
+
+def personalize(kind: str, plan: dict, user_data: dict) -> dict:
+    """Scale a variant copy to this user: calories burned by body weight and
+    time slots by preferred time for workouts, portions by the exact calorie
+    target for nutrition"""
+    if kind == "workout":
+        ratio = _to_float(user_data.get("weight"), REFERENCE_WEIGHT_KG) / REFERENCE_WEIGHT_KG
+        for day in plan["weekly_schedule"].values():
+            if day["is_rest"]:
+                continue
+            day["time_slot"] = _time_slot(user_data, day["duration_minutes"])
+            for exercise in day["exercises"]:
+                exercise["calories_burned"] = round(exercise["calories_burned"] * ratio, 1)
+        return plan
+    target = calorie_target(user_data)
+    ratio = target / plan["total_calories"]
+    plan["total_calories"] = target
+    for day in plan["weekly_meals"].values():
+        for meal_type in ("breakfast", "lunch", "dinner"):
+            meal = day.get(meal_type)
+            if meal:
+                meal["calories"] = int(round(meal["calories"] * ratio))
+                for nutrient in ("protein_g", "carbs_g", "fat_g"):
+                    meal[nutrient] = round(meal[nutrient] * ratio, 1)
+    return plan
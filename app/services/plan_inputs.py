@@ -0,0 +1,46 @@
+"""
+Plan Inputs - the user_data dict every plan generation path starts from
+
+Fields given with the request win, then the latest health assessment, then
+the user's profile, then defaults. The /generate endpoints, regenerate-days
+and plan speculation at assessment time all build their inputs here, so a
+speculative plan is keyed on exactly what a later /generate will ask for.
+"""
+
+from typing import Optional
+
+from app.models.health import HealthAssessment
+from app.models.user import User
+
+
+def workout_user_data(current_user: User, assessment: Optional[HealthAssessment] = None, **request) -> dict:
+    a = assessment or HealthAssessment()
+    r = request.get
+    return {
+        "age": r("age") or current_user.age or 25,
+        "gender": r("gender") or current_user.gender or "Male",
+        "height": r("height") or current_user.height or 170,
+        "weight": r("weight") or current_user.weight or 70,
+        "fitness_level": r("fitness_level") or current_user.fitness_level or "beginner",
+        "fitness_goal": r("fitness_goal") or a.fitness_goal or (current_user.fitness_goal.value if current_user.fitness_goal else "general_fitness"),
+        "workout_preference": r("workout_preference") or a.workout_place or (current_user.workout_preference.value if current_user.workout_preference else "home"),
+        "medical_history": r("medical_history") or a.medical_history or "None",
+        "injuries": r("injuries") or a.injuries or "None",
+        "available_minutes": r("available_minutes") or a.available_minutes_per_day or 45,
+        "workout_time": r("workout_time") or a.workout_time or "Morning",
+    }
+
+
+def nutrition_user_data(current_user: User, assessment: Optional[HealthAssessment] = None, **request) -> dict:
+    a = assessment or HealthAssessment()
+    r = request.get
+    return {
+        "age": r("age") or current_user.age or 25,
+        "gender": r("gender") or current_user.gender or "Male",
+        "weight": r("weight") or current_user.weight or 70,
+        "height": r("height") or current_user.height or 170,
+        "fitness_goal": r("fitness_goal") or a.fitness_goal or (current_user.fitness_goal.value if current_user.fitness_goal else "general_fitness"),
+        "diet_preference": r("diet_preference") or a.diet_preference or (current_user.diet_preference.value if current_user.diet_preference else "vegetarian"),
+        "allergies": r("allergies") or a.allergies or "None",
+        "target_calories": r("target_calories"),
+    }
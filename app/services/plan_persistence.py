@@ -0,0 +1,233 @@
+"""
+Plan Persistence - store generated workout and nutrition plans
+
+Shared by the synchronous /generate endpoints and the background job workers
+so both write identical WorkoutPlan/Exercise and NutritionPlan/Meal rows.
+replace_*_days rewrite only the chosen days of an existing plan.
+Plans are normalised to the canonical schema (see plan_schema) before
+anything is written, so stored plan_data always has the same shape.
+
+Each save is one transaction of a few statements: deactivate the old plan,
+insert the new one, then insert all of its rows in a single executemany
+INSERT ... RETURNING. The returned rows become the plan's loaded collection,
+so callers serialise the plan without reading it back.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.workout import WorkoutPlan, Exercise
+from app.models.nutrition import NutritionPlan, Meal
+from app.services.plan_engine import DAYS_ORDER
+from app.services.plan_schema import normalize_plan, normalize_days
+
+
+MEAL_TYPE_TIMES = {
+    "Breakfast": "7:00 AM",
+    "Lunch": "12:30 PM",
+    "Dinner": "7:30 PM",
+    "Snack": "",
+    "Snack 1": "",
+    "Snack 2": "",
+}
+
+
+# ─── Row builders ─────────────────────────────────────────────────────────────
+
+def _exercise_rows(plan_id: int, day: str, day_data: dict, user_data: dict) -> List[dict]:
+    if day_data.get("is_rest"):
+        return []
+    return [
+        dict(
+            workout_plan_id=plan_id,
+            day_of_week=day,
+            name=ex_data.get("name", "Exercise"),
+            description=ex_data.get("description", ""),
+            sets=ex_data.get("sets", 3),
+            reps=str(ex_data.get("reps", "12")),
+            rest_seconds=ex_data.get("rest_seconds", 60),
+            duration_minutes=ex_data.get("duration_minutes"),
+            calories_burned=ex_data.get("calories_burned"),
+            difficulty=ex_data.get("difficulty", user_data["fitness_level"]),
+            youtube_url=ex_data.get("youtube_url"),
+            muscle_groups=ex_data.get("muscle_groups", []),
+            equipment=ex_data.get("equipment", []),
+        )
+        for ex_data in day_data.get("exercises", [])
+    ]
+
+
+def _meal_entries(day_meals: dict) -> List[tuple]:
+    """(meal_type, meal_data) pairs from a canonical
+    {"breakfast": {...}, "lunch": {...}, "snacks": [...]} day"""
+    entries = []
+    for key, value in day_meals.items():
+        if isinstance(value, dict):
+            entries.append((key.replace("_", " ").title(), value))
+        elif isinstance(value, list):
+            snacks = [m for m in value if isinstance(m, dict)]
+            for index, meal_data in enumerate(snacks, start=1):
+                entries.append(("Snack" if len(snacks) == 1 else f"Snack {index}", meal_data))
+    return entries
+
+
+def _meal_rows(plan_id: int, day: str, day_meals: dict) -> List[dict]:
+    return [
+        dict(
+            nutrition_plan_id=plan_id,
+            day_of_week=day,
+            meal_type=meal_type,
+            name=meal_data.get("name", "Meal"),
+            meal_name=meal_data.get("name", "Meal"),
+            description=meal_data.get("description", ""),
+            calories=meal_data.get("calories", 0),
+            protein_g=meal_data.get("protein_g", 0),
+            carbs_g=meal_data.get("carbs_g", 0),
+            fat_g=meal_data.get("fat_g", 0),
+            fiber_g=meal_data.get("fiber_g", 0),
+            ingredients=meal_data.get("ingredients", []),
+            recipe_steps=meal_data.get("recipe_steps", []),
+            prep_time_minutes=meal_data.get("prep_time_minutes", 15),
+            meal_time=meal_data.get("meal_time") or MEAL_TYPE_TIMES.get(meal_type, ""),
+        )
+        for meal_type, meal_data in _meal_entries(day_meals)
+    ]
+
+
+def _bulk_insert(db: Session, model, rows: List[dict]) -> list:
+    """Insert every row in one batched INSERT ... RETURNING; returns them as loaded objects ordered by id"""
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning:
+        # RETURNING order isn't guaranteed, but ids follow the VALUES order
+        objects = db.scalars(insert(model).returning(model), rows).all()
+    else:
+        # Drivers without batched RETURNING: the unit of work still batches what it can
+        objects = [model(**row) for row in rows]
+        db.add_all(objects)
+        db.flush()
+    return sorted(objects, key=lambda o: o.id)
+
+
+# ─── Full plans ───────────────────────────────────────────────────────────────
+
+def save_workout_plan(db: Session, user_id: int, user_data: dict, plan_data: dict) -> WorkoutPlan:
+    """Deactivate the user's current workout plan and store the new one"""
+    plan_data = normalize_plan("workout", plan_data)
+    db.execute(
+        update(WorkoutPlan)
+        .where(WorkoutPlan.user_id == user_id, WorkoutPlan.is_active == True)
+        .values(is_active=False)
+    )
+
+    new_plan = WorkoutPlan(
+        user_id=user_id,
+        title=f"AI Workout Plan - Week {1}",
+        description=f"Personalized {user_data['fitness_goal'].replace('_', ' ').title()} plan",
+        fitness_goal=user_data["fitness_goal"],
+        fitness_level=user_data["fitness_level"],
+        workout_preference=user_data["workout_preference"],
+        plan_data=plan_data,
+        is_active=True,
+    )
+    db.add(new_plan)
+    db.flush()
+
+    # Parse exercises from plan_data and save them
+    weekly_schedule = plan_data["weekly_schedule"]
+    rows = [
+        row
+        for day in DAYS_ORDER
+        for row in _exercise_rows(new_plan.id, day, weekly_schedule.get(day, {}), user_data)
+    ]
+    exercises = _bulk_insert(db, Exercise, rows)
+
+    db.commit()
+    set_committed_value(new_plan, "exercises", exercises)
+    return new_plan
+
+
+def save_nutrition_plan(db: Session, user_id: int, user_data: dict, plan_data: dict) -> NutritionPlan:
+    """Deactivate the user's current nutrition plan and store the new one"""
+    plan_data = normalize_plan("nutrition", plan_data)
+    db.execute(
+        update(NutritionPlan)
+        .where(NutritionPlan.user_id == user_id, NutritionPlan.is_active == True)
+        .values(is_active=False)
+    )
+
+    # Calculate calorie target
+    target_calories = (
+        user_data.get("target_calories")
+        or plan_data.get("total_calories")
+        or plan_data.get("daily_calories", 2000)
+    )
+
+    new_plan = NutritionPlan(
+        user_id=user_id,
+        title="AI Indian Nutrition Plan",
+        description=f"Personalized {user_data['diet_preference']} meal plan for {user_data['fitness_goal'].replace('_', ' ')}",
+        target_calories=target_calories,
+        target_protein=plan_data.get("macros", {}).get("protein_g", 120),
+        target_carbs=plan_data.get("macros", {}).get("carbs_g", 250),
+        target_fat=plan_data.get("macros", {}).get("fat_g", 65),
+        diet_preference=user_data["diet_preference"],
+        plan_data=plan_data,
+        is_active=True,
+    )
+    db.add(new_plan)
+    db.flush()
+
+    # Parse meals from plan_data
+    weekly_meals = plan_data["weekly_meals"]
+    rows = [row for day in DAYS_ORDER for row in _meal_rows(new_plan.id, day, weekly_meals.get(day, {}))]
+    meals = _bulk_insert(db, Meal, rows)
+
+    db.commit()
+    set_committed_value(new_plan, "meals", meals)
+    return new_plan
+
+
+# ─── Single days ──────────────────────────────────────────────────────────────
+
+def replace_workout_days(db: Session, plan: WorkoutPlan, user_data: dict, days: Dict[str, dict]) -> WorkoutPlan:
+    """Swap the given days of an existing plan: plan_data slice plus that day's Exercise rows"""
+    days = normalize_days("workout", days)
+    kept = [e for e in plan.exercises if e.day_of_week not in days]
+    db.execute(
+        delete(Exercise)
+        .where(Exercise.workout_plan_id == plan.id, Exercise.day_of_week.in_(list(days)))
+        .execution_options(synchronize_session=False)
+    )
+    rows = [row for day, day_data in days.items() for row in _exercise_rows(plan.id, day, day_data, user_data)]
+    exercises = sorted(kept + _bulk_insert(db, Exercise, rows), key=lambda e: e.id)
+
+    plan_data = dict(plan.plan_data or {})
+    plan_data["weekly_schedule"] = {**(plan_data.get("weekly_schedule") or {}), **days}
+    plan.plan_data = normalize_plan("workout", plan_data)  # reassign so the JSON column is flagged dirty
+    db.commit()
+    set_committed_value(plan, "exercises", exercises)
+    return plan
+
+
+def replace_nutrition_days(db: Session, plan: NutritionPlan, days: Dict[str, dict]) -> NutritionPlan:
+    """Swap the given days of an existing plan: plan_data slice plus that day's Meal rows"""
+    days = normalize_days("nutrition", days)
+    kept = [m for m in plan.meals if m.day_of_week not in days]
+    db.execute(
+        delete(Meal)
+        .where(Meal.nutrition_plan_id == plan.id, Meal.day_of_week.in_(list(days)))
+        .execution_options(synchronize_session=False)
+    )
+    rows = [row for day, day_meals in days.items() for row in _meal_rows(plan.id, day, day_meals)]
+    meals = sorted(kept + _bulk_insert(db, Meal, rows), key=lambda m: m.id)
+
+    plan_data = dict(plan.plan_data or {})
+    plan_data["weekly_meals"] = {**(plan_data.get("weekly_meals") or {}), **days}
+    plan.plan_data = normalize_plan("nutrition", plan_data)  # reassign so the JSON column is flagged dirty
+    db.commit()
+    set_committed_value(plan, "meals", meals)
+    return plan
@@ -0,0 +1,61 @@
+"""
+Plan Queries - read workout and nutrition plans together with their rows
+- A plan and its Exercise/Meal rows load in two statements: the plan query
+  plus one selectinload IN query for the children, however many plans match
+- Views that only need some days pass them, and only those rows are loaded
+  into the plan's collection
+- by_day() groups loaded rows by day_of_week in memory, so weekly views no
+  longer query once per day
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.workout import WorkoutPlan, Exercise
+from app.models.nutrition import NutritionPlan, Meal
+
+# kind -> (plan model, child collection, child model)
+PLAN_MODELS = {
+    "workout": (WorkoutPlan, WorkoutPlan.exercises, Exercise),
+    "nutrition": (NutritionPlan, NutritionPlan.meals, Meal),
+}
+
+
+def plans_query(kind: str, days: Optional[List[str]] = None):
+    """SELECT for plans of this kind with their children eager-loaded"""
+    model, children, child = PLAN_MODELS[kind]
+    loader = children if days is None else children.and_(child.day_of_week.in_(days))
+    return select(model).options(selectinload(loader))
+
+
+async def active_plan(db: AsyncSession, kind: str, user_id: int, days: Optional[List[str]] = None):
+    """The user's active plan with its rows (only those days when given), or None"""
+    model = PLAN_MODELS[kind][0]
+    return await db.scalar(
+        plans_query(kind, days)
+        .filter(model.user_id == user_id, model.is_active == True)
+    )
+
+
+async def plan_history(db: AsyncSession, kind: str, user_id: int, limit: int = 10) -> list:
+    """The user's most recent plans, newest first, each with all of its rows"""
+    model = PLAN_MODELS[kind][0]
+    return (
+        await db.scalars(
+            plans_query(kind)
+            .filter(model.user_id == user_id)
+            .order_by(model.created_at.desc())
+            .limit(limit)
+        )
+    ).all()
+
+
+def by_day(rows) -> Dict[str, list]:
+    """{day_of_week: rows} keeping the loaded order within each day"""
+    grouped: Dict[str, list] = {}
+    for row in rows:
+        grouped.setdefault(row.day_of_week, []).append(row)
+    return grouped
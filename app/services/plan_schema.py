@@ -0,0 +1,341 @@
+"""
+Plan Schema - one canonical shape for workout and nutrition plans
+
+Model output, engine plans and plans stored by older versions all pass
+through the same pydantic models before they are used or persisted:
+- key variants are folded into one name (is_rest_day -> is_rest,
+  warm_up -> warmup, cool_down -> cooldown, recommended_time -> time_slot)
+- day keys are normalised ("monday", "Mon") and list-shaped weeks become
+  {day: data}; nutrition days given as a list of meals become the
+  {"breakfast": {...}, "lunch": {...}, "dinner": {...}, "snacks": [...]} shape
+- type errors are repaired locally ("3 sets" -> 3, "350 kcal" -> 350, a
+  string or list warm-up -> {"description": ...}, numbers and dicts where
+  text belongs -> text) and missing fields get defaults,
+  so nothing has to be re-generated just because the JSON was sloppy
+"""
+
+import math
+import re
+from typing import Annotated, Any, Dict, List, Optional, Union
+
+from pydantic import AliasChoices, BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter, model_validator
+
+from app.services.plan_engine import DAYS_ORDER
+
+_DAY_PREFIXES = {day[:3].lower(): day for day in DAYS_ORDER}
+
+# Canonical workout day key -> variants seen in model output and older plans
+WORKOUT_DAY_ALIASES = {
+    "is_rest": ("is_rest_day", "rest_day"),
+    "warmup": ("warm_up", "warm-up"),
+    "cooldown": ("cool_down", "cool-down"),
+    "time_slot": ("recommended_time", "time"),
+}
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_TRUE_WORDS = {"true", "yes", "y", "1", "rest"}
+
+
+# ─── Coercion helpers ─────────────────────────────────────────────────────────
+
+def _first_number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        match = _NUMBER.search(value.replace(",", ""))
+        return float(match.group()) if match else None
+    return None
+
+
+def _as_int(value) -> Optional[int]:
+    number = _first_number(value)
+    return None if number is None else int(round(number))
+
+
+def _as_float(value) -> Optional[float]:
+    number = _first_number(value)
+    return None if number is None else round(number, 1)
+
+
+def _as_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        parts = [_as_text(v) for v in value]
+        return ", ".join(p for p in parts if p) or None
+    if isinstance(value, dict):
+        for key in ("description", "name", "text"):
+            if value.get(key) is not None:
+                return _as_text(value[key])
+        return _as_text(list(value.values()))
+    return str(value)
+
+
+def _as_bool(value) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_WORDS
+    return bool(value)
+
+
+def _as_str_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, dict):
+        value = [value]
+    if not isinstance(value, list):
+        return [str(value)]
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("item") or item.get("description")
+        if item not in (None, ""):
+            items.append(str(item))
+    return items
+
+
+def _or_default(coerce, default):
+    """Validator that coerces, falling back to default when nothing usable is left"""
+    def validate(value):
+        coerced = coerce(value)
+        return default if coerced is None else coerced
+    return BeforeValidator(validate)
+
+
+def Int(default: int):
+    return Annotated[int, _or_default(_as_int, default)]
+
+
+def Float(default: float):
+    return Annotated[float, _or_default(_as_float, default)]
+
+
+def Text(default: str):
+    return Annotated[str, _or_default(_as_text, default)]
+
+
+def Bool(default: bool):
+    return Annotated[bool, _or_default(_as_bool, default)]
+
+
+OptionalInt = Annotated[Optional[int], BeforeValidator(_as_int)]
+OptionalFloat = Annotated[Optional[float], BeforeValidator(_as_float)]
+OptionalText = Annotated[Optional[str], BeforeValidator(_as_text)]
+StrList = Annotated[List[str], BeforeValidator(_as_str_list)]
+
+
+def _day_name(key) -> Optional[str]:
+    return _DAY_PREFIXES.get(str(key).strip()[:3].lower())
+
+
+def _as_week(value) -> dict:
+    """{Day: data} in week order from a dict with loose keys or a list of days"""
+    if isinstance(value, list):
+        value = {
+            item.get("day") or item.get("day_of_week"): {k: v for k, v in item.items() if k not in ("day", "day_of_week")}
+            for item in value if isinstance(item, dict)
+        }
+    if not isinstance(value, dict):
+        return {}
+    week = {}
+    for key, data in value.items():
+        day = _day_name(key)
+        if day and data not in (None, "", [], {}):
+            week[day] = data
+    return {day: week[day] for day in DAYS_ORDER if day in week}
+
+
+# ─── Workout ──────────────────────────────────────────────────────────────────
+
+class Segment(BaseModel):
+    """Warm-up or cool-down"""
+    model_config = ConfigDict(extra="allow")
+
+    description: Text("") = ""
+    duration_minutes: Int(5) = 5
+
+
+def _as_segment(value):
+    if isinstance(value, bool) or value in (None, "", [], {}):
+        return None
+    if isinstance(value, (int, float)):
+        return {"duration_minutes": value}
+    if isinstance(value, dict):
+        return value
+    # A string or a list of steps ("Jumping jacks", "Arm circles") is the description
+    text = _as_text(value)
+    return {"description": text} if text else None
+
+
+class ExerciseSpec(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: Text("Exercise") = "Exercise"
+    sets: Int(3) = 3
+    reps: Text("12") = "12"
+    rest_seconds: Int(60) = 60
+    description: Text("") = ""
+    muscle_groups: StrList = Field(default_factory=list)
+    equipment: StrList = Field(default_factory=list)
+    youtube_search: OptionalText = None
+    youtube_url: OptionalText = None
+    duration_minutes: OptionalInt = None
+    calories_burned: OptionalFloat = None
+    difficulty: OptionalText = None
+
+
+def _as_exercises(value) -> list:
+    if isinstance(value, dict):
+        value = list(value.values()) if all(isinstance(v, dict) for v in value.values()) else [value]
+    if not isinstance(value, list):
+        return []
+    return [{"name": item} if isinstance(item, str) else item for item in value if isinstance(item, (dict, str))]
+
+
+class WorkoutDay(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    focus: Text("Workout") = "Workout"
+    duration_minutes: Int(45) = 45
+    time_slot: Text("") = ""
+    is_rest: Bool(False) = False
+    warmup: Annotated[Optional[Segment], BeforeValidator(_as_segment)] = None
+    exercises: Annotated[List[ExerciseSpec], BeforeValidator(_as_exercises)] = Field(default_factory=list)
+    cooldown: Annotated[Optional[Segment], BeforeValidator(_as_segment)] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _rest_day(cls, data):
+        if isinstance(data, str):
+            data = {"focus": data}
+        if not isinstance(data, dict):
+            return {}
+        data = dict(data)
+        for canonical, variants in WORKOUT_DAY_ALIASES.items():
+            for variant in variants:
+                if variant in data:
+                    data.setdefault(canonical, data.pop(variant))
+        resting = data.get("is_rest")
+        if resting is None and not data.get("exercises"):
+            resting = "rest" in str(data.get("focus", "")).lower()
+        if _as_bool(resting):
+            data["is_rest"] = True
+            data.setdefault("focus", "Rest Day")
+            data.setdefault("duration_minutes", 0)
+        return data
+
+
+class WorkoutPlanSchema(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    plan_title: Text("Personalized Workout Plan") = "Personalized Workout Plan"
+    plan_description: Text("") = ""
+    weekly_schedule: Annotated[Dict[str, WorkoutDay], BeforeValidator(_as_week)] = Field(default_factory=dict)
+
+
+# ─── Nutrition ────────────────────────────────────────────────────────────────
+
+class MealSpec(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: Text("Meal") = "Meal"
+    calories: Int(0) = 0
+    protein_g: Float(0) = 0
+    carbs_g: Float(0) = 0
+    fat_g: Float(0) = 0
+    ingredients: StrList = Field(default_factory=list)
+    meal_time: Text("") = ""
+
+
+def _meal_key(meal_type) -> str:
+    key = re.sub(r"[^a-z0-9]+", "_", str(meal_type or "meal").lower()).strip("_")
+    return "snacks" if "snack" in key else key
+
+
+def _as_meal_day(value) -> dict:
+    """{"breakfast": meal, ..., "snacks": [meals]} from either day shape"""
+    if isinstance(value, list):
+        pairs = [
+            (_meal_key(m.get("meal_type")), {k: v for k, v in m.items() if k != "meal_type"})
+            for m in value if isinstance(m, dict)
+        ]
+    elif isinstance(value, dict):
+        pairs = [(_meal_key(key), meal) for key, meal in value.items()]
+    else:
+        return {}
+    day: Dict[str, Any] = {}
+    for key, meal in pairs:
+        meals = [m for m in (meal if isinstance(meal, list) else [meal]) if isinstance(m, (dict, str))]
+        meals = [{"name": m} if isinstance(m, str) else m for m in meals]
+        if key == "snacks":
+            day.setdefault("snacks", []).extend(meals)
+        elif meals and key not in day:
+            day[key] = meals[0]
+    return day
+
+
+NutritionDay = Annotated[Dict[str, Union[MealSpec, List[MealSpec]]], BeforeValidator(_as_meal_day)]
+
+
+class GroceryItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    item: Text("") = Field("", validation_alias=AliasChoices("item", "name"))
+    quantity: Text("") = ""
+    weekly_count: Int(1) = 1
+
+
+def _as_grocery(value) -> list:
+    if not isinstance(value, list):
+        return []
+    return [{"item": item} if isinstance(item, str) else item for item in value if isinstance(item, (dict, str))]
+
+
+class NutritionPlanSchema(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    plan_title: Text("Indian Nutrition Plan") = "Indian Nutrition Plan"
+    total_calories: OptionalInt = None
+    weekly_meals: Annotated[Dict[str, NutritionDay], BeforeValidator(_as_week)] = Field(default_factory=dict)
+    grocery_list: Annotated[List[GroceryItem], BeforeValidator(_as_grocery)] = Field(default_factory=list)
+    nutritional_tips: StrList = Field(default_factory=list)
+
+
+# ─── Public API ───────────────────────────────────────────────────────────────
+
+PLAN_MODELS = {"workout": WorkoutPlanSchema, "nutrition": NutritionPlanSchema}
+DAY_ADAPTERS = {"workout": TypeAdapter(WorkoutDay), "nutrition": TypeAdapter(NutritionDay)}
+WEEK_ADAPTERS = {
+    "workout": TypeAdapter(Annotated[Dict[str, WorkoutDay], BeforeValidator(_as_week)]),
+    "nutrition": TypeAdapter(Annotated[Dict[str, NutritionDay], BeforeValidator(_as_week)]),
+}
+
+
+def _dump(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {k: _dump(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_dump(v) for v in value]
+    return value
+
+
+def normalize_plan(kind: str, plan: dict) -> dict:
+    """Canonical copy of a whole plan; unknown top-level keys are kept"""
+    return PLAN_MODELS[kind].model_validate(plan).model_dump()
+
+
+def normalize_days(kind: str, days) -> Dict[str, dict]:
+    """Canonical {Day: data} for some or all days of a plan"""
+    return _dump(WEEK_ADAPTERS[kind].validate_python(days))
+
+
+def normalize_day(kind: str, day_data) -> dict:
+    """Canonical data for a single day, e.g. one read back from an older stored plan"""
+    return _dump(DAY_ADAPTERS[kind].validate_python(day_data))
@@ -0,0 +1,114 @@
+"""
+Plan Speculation - start plan generation before the user asks for it
+
+Submitting a health assessment already tells us everything the /generate
+endpoints will use, so workout and nutrition plans are generated in the
+background right away and staged in memory per (user, kind):
+- /generate, /generate/stream and background jobs with the same profile key
+  take the staged plan, waiting for it if generation is still in flight
+- a different profile key means the inputs changed: the staged plan is
+  dropped and generation starts afresh
+- staged plans nobody claims expire after a TTL
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.health import HealthAssessment
+from app.services.plan_cache import make_cache_key
+from app.utils.config import settings
+from app.utils.deadline import deadline_scope
+
+
+def latest_assessment(db: Session, user_id: int) -> Optional[HealthAssessment]:
+    return (
+        db.query(HealthAssessment)
+        .filter(HealthAssessment.user_id == user_id)
+        .order_by(HealthAssessment.created_at.desc(), HealthAssessment.id.desc())
+        .first()
+    )
+
+
+@dataclass
+class StagedPlan:
+    key: str
+    task: asyncio.Task
+    created_at: float
+
+
+class PlanSpeculator:
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._staged: Dict[Tuple[int, str], StagedPlan] = {}
+        self.stats = {
+            "started": 0,
+            "claimed_ready": 0,
+            "claimed_in_flight": 0,
+            "discarded_changed": 0,
+            "expired": 0,
+            "failed": 0,
+        }
+
+    def speculate(self, user_id: int, kind: str, user_data: dict, generate: Callable[[dict], Awaitable[dict]]):
+        """Start generating in the background; replaces anything staged for this user and kind"""
+        self._purge_expired()
+        self._discard((user_id, kind))
+        task = asyncio.create_task(self._generate(generate, dict(user_data)))
+        # Unclaimed failures are expected; keep asyncio from logging them
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._staged[(user_id, kind)] = StagedPlan(make_cache_key(kind, user_data), task, time.monotonic())
+        self.stats["started"] += 1
+
+    async def claim(self, user_id: int, kind: str, user_data: dict) -> Optional[dict]:
+        """The staged plan for exactly these inputs, or None to generate normally"""
+        staged = self._staged.pop((user_id, kind), None)
+        if staged is None:
+            return None
+        if staged.key != make_cache_key(kind, user_data):
+            staged.task.cancel()
+            self.stats["discarded_changed"] += 1
+            return None
+        if time.monotonic() - staged.created_at > self.ttl_seconds:
+            staged.task.cancel()
+            self.stats["expired"] += 1
+            return None
+        self.stats["claimed_ready" if staged.task.done() else "claimed_in_flight"] += 1
+        try:
+            return await asyncio.shield(staged.task)
+        except Exception as e:
+            print(f"Speculative {kind} plan failed: {e}")
+            self.stats["failed"] += 1
+            return None
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "staged": len(self._staged),
+            "in_flight": sum(1 for s in self._staged.values() if not s.task.done()),
+        }
+
+    @staticmethod
+    async def _generate(generate: Callable[[dict], Awaitable[dict]], user_data: dict) -> dict:
+        # Not bound to the submitting request's deadline
+        with deadline_scope(None):
+            return await generate(user_data)
+
+    def _discard(self, key: Tuple[int, str]):
+        staged = self._staged.pop(key, None)
+        if staged is not None:
+            staged.task.cancel()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key, staged in list(self._staged.items()):
+            if now - staged.created_at > self.ttl_seconds:
+                self._discard(key)
+                self.stats["expired"] += 1
+
+
+# Global speculator instance
+plan_speculator = PlanSpeculator(ttl_seconds=settings.PLAN_SPECULATION_TTL_SECONDS)
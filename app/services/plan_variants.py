@@ -0,0 +1,102 @@
+"""
+Plan Variants - precomputed engine plans served as cheap copies
+
+- Variants are keyed on the categorical profile fields plus banded minutes
+  and calorie targets (plan_engine.variant_key), so many users share one
+- Each variant is built once and kept frozen as a pickle; every caller gets
+  its own copy from pickle.loads, so the shared plan can never be mutated,
+  and plan_engine.personalize() then scales that copy to the user's weight,
+  workout time and exact calorie target
+- precompute() builds every goal/level/place/minutes workout variant and
+  every goal/diet/calories nutrition variant at startup; profiles with
+  allergies are built on first use and kept in an LRU
+"""
+
+import itertools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from app.services import plan_engine
+from app.utils.config import settings
+
+BUILDERS = {"workout": plan_engine.build_workout_plan, "nutrition": plan_engine.build_nutrition_plan}
+
+
+class PlanVariants:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._variants: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "precomputed": 0, "evictions": 0, "build_seconds_total": 0.0}
+
+    def get(self, kind: str, user_data: dict) -> dict:
+        """A private copy of the engine plan, personalised for this profile"""
+        key = plan_engine.variant_key(kind, user_data)
+        with self._lock:
+            frozen = self._variants.get(key)
+            if frozen is not None:
+                self._variants.move_to_end(key)
+                self.stats["hits"] += 1
+        if frozen is None:
+            frozen = self._build(kind, key, plan_engine.variant_profile(kind, user_data))
+            with self._lock:
+                self.stats["misses"] += 1
+        return plan_engine.personalize(kind, pickle.loads(frozen), user_data)
+
+    def precompute(self) -> int:
+        """Build every goal/level/place/minutes and goal/diet/calories variant"""
+        started = time.monotonic()
+        goals = list(plan_engine.WEEKLY_SPLITS)
+        minutes = range(plan_engine.MINUTE_RANGE[0], plan_engine.MINUTE_RANGE[1] + 1, plan_engine.MINUTE_BAND)
+        calories = range(plan_engine.CALORIE_RANGE[0], plan_engine.CALORIE_RANGE[1] + 1, plan_engine.CALORIE_BAND)
+        profiles = [
+            ("workout", {"fitness_goal": goal, "fitness_level": level, "workout_place": place,
+                         "available_minutes": available})
+            for goal, level, place, available in itertools.product(
+                goals, plan_engine.LEVELS, plan_engine.PLACE_EQUIPMENT, minutes)
+        ] + [
+            ("nutrition", {"fitness_goal": goal, "diet_preference": diet, "target_calories": target})
+            for goal, diet, target in itertools.product(goals, plan_engine.DIET_RANK, calories)
+        ]
+        built = 0
+        for kind, user_data in profiles:
+            key = plan_engine.variant_key(kind, user_data)
+            profile = plan_engine.variant_profile(kind, user_data)
+            with self._lock:
+                if key in self._variants:
+                    continue
+            self._build(kind, key, profile)
+            built += 1
+        with self._lock:
+            self.stats["precomputed"] += built
+        print(f"🗂️  Precomputed {built} fallback plan variants in {time.monotonic() - started:.2f}s")
+        return built
+
+    def _build(self, kind: str, key: Tuple, user_data: dict) -> bytes:
+        started = time.perf_counter()
+        frozen = pickle.dumps(BUILDERS[kind](user_data), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.stats["build_seconds_total"] += time.perf_counter() - started
+            self._variants[key] = frozen
+            while len(self._variants) > self.max_entries:
+                self._variants.popitem(last=False)
+                self.stats["evictions"] += 1
+        return frozen
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **{k: v for k, v in self.stats.items() if k != "build_seconds_total"},
+                "variants": len(self._variants),
+                "bytes": sum(len(v) for v in self._variants.values()),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "build_seconds_total": round(self.stats["build_seconds_total"], 4),
+            }
+
+
+# Global plan variant store
+plan_variants = PlanVariants(max_entries=settings.PLAN_VARIANTS_MAX_ENTRIES)
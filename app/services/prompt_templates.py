@@ -0,0 +1,264 @@
+"""
+Prompt Templates - compiled once, rendered with only the per-user fields
+- Each template is a static system prefix (role, rules and the JSON schema the
+  model must follow) plus a short user part with named fields
+- The prefix is byte-identical on every call, so provider-side prompt caching
+  can reuse it; only the user part changes between users
+- Text is dedented and its fields validated once at import; rendering is a
+  single format_map over the compact text, with no indentation sent upstream
+- Renders are counted per name@version with estimated static and variable
+  prompt tokens (~4 chars each, the same estimate the scheduler charges)
+"""
+
+import inspect
+import string
+from typing import Dict, Tuple
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _compile(text: str) -> Tuple[str, Tuple[str, ...]]:
+    """Validated str.format template and its field names"""
+    fields = []
+    for _, field, spec, conversion in string.Formatter().parse(text):
+        if spec or conversion:
+            raise ValueError(f"Template fields take no format spec or conversion: {field}")
+        if field:
+            fields.append(field)
+    return text, tuple(fields)
+
+
+class PromptTemplate:
+    def __init__(self, name: str, version: int, system: str, user: str):
+        self.name = name
+        self.version = version
+        self.key = f"{name}@v{version}"
+        self.system = inspect.cleandoc(system)
+        self.system_tokens = estimate_tokens(self.system)
+        self._format, self.fields = _compile(inspect.cleandoc(user))
+        self.renders = 0
+        self.variable_chars = 0
+
+    def render(self, **values) -> Tuple[str, str]:
+        """(system prefix, user part); every field must be given"""
+        user = self._format.format_map(values)
+        # Plain counters: a lost increment under threads only skews the estimate
+        self.renders += 1
+        self.variable_chars += len(user)
+        return self.system, user
+
+
+class PromptStats:
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        if template.key in self._templates:
+            raise ValueError(f"Duplicate prompt template {template.key}")
+        self._templates[template.key] = template
+        return template
+
+    def get_stats(self) -> dict:
+        result = {}
+        for key, t in sorted(self._templates.items()):
+            variable = t.variable_chars / CHARS_PER_TOKEN / t.renders if t.renders else 0.0
+            total = t.system_tokens + variable
+            result[key] = {
+                "renders": t.renders,
+                "fields": list(t.fields),
+                "system_tokens": t.system_tokens,
+                "avg_variable_tokens": round(variable, 1),
+                "avg_prompt_tokens": round(total, 1),
+                "static_share": round(t.system_tokens / total, 4) if total else 0.0,
+            }
+        return result
+
+
+# Global prompt render statistics
+prompt_stats = PromptStats()
+
+
+def _template(name: str, version: int, system: str, user: str) -> PromptTemplate:
+    return prompt_stats.register(PromptTemplate(name, version, system, user))
+
+
+# ─── Plans ────────────────────────────────────────────────────────────────────
+
+WORKOUT_DAY_SCHEMA = """{"focus": "...", "duration_minutes": 45, "time_slot": "6:00 AM - 7:00 AM", "is_rest": false,
+     "warmup": {"description": "...", "duration_minutes": 5},
+     "exercises": [{"name": "...", "sets": 3, "reps": "12-15", "rest_seconds": 60, "description": "...", "muscle_groups": ["chest"], "youtube_search": "..."}],
+     "cooldown": {"description": "...", "duration_minutes": 5}}"""
+
+NUTRITION_DAY_SCHEMA = """{"breakfast": {"name": "Dosa with Sambar", "calories": 350, "protein_g": 12, "carbs_g": 55, "fat_g": 8, "ingredients": ["Dosa", "Sambar"], "meal_time": "7:00 AM"},
+     "lunch": {"name": "...", "calories": 450, "protein_g": 20, "carbs_g": 65, "fat_g": 12, "ingredients": [], "meal_time": "12:30 PM"},
+     "dinner": {"name": "...", "calories": 400, "protein_g": 18, "carbs_g": 50, "fat_g": 10, "ingredients": [], "meal_time": "7:30 PM"},
+     "snacks": [{"name": "...", "calories": 100, "meal_time": ""}]}"""
+
+WORKOUT_PROFILE = """
+    - Age: {age}
+    - Gender: {gender}
+    - Height: {height} cm
+    - Weight: {weight} kg
+    - Fitness Level: {fitness_level}
+    - Goal: {fitness_goal}
+    - Workout Location: {workout_place}
+    - Available Time: {available_minutes} minutes/day
+    - Preferred Time: {workout_time}
+    - Medical History: {medical_history}
+    - Injuries: {injuries}
+    - Health Conditions: {health_conditions}"""
+
+NUTRITION_PROFILE = """
+    - Age: {age}, Gender: {gender}
+    - Weight: {weight} kg, BMI: {bmi}
+    - Goal: {fitness_goal}
+    - Diet Type: {diet_preference}
+    - Target Calories: {calorie_target}
+    - Allergies: {allergies}"""
+
+WORKOUT_PLAN = _template("workout_plan", 2, f"""
+    You are ArogyaMitra's expert fitness coach. Generate detailed, safe,
+    personalized workout plans. Always respond with valid JSON only.
+    Structure workouts with warm-up, main exercises, cool-down.
+
+    Return ONLY valid JSON with this structure, with an entry for every day Monday to Sunday:
+    {{"plan_title": "...", "plan_description": "...",
+     "weekly_schedule": {{"Monday": {WORKOUT_DAY_SCHEMA}, "Tuesday": {{...}}, ...}}}}
+""", """
+    Generate a complete 7-day workout plan for this user:""" + WORKOUT_PROFILE)
+
+NUTRITION_PLAN = _template("nutrition_plan", 2, f"""
+    You are ArogyaMitra's expert nutritionist specializing in Indian cuisine.
+    Generate balanced, culturally appropriate meal plans. Always respond with valid JSON only.
+
+    Return ONLY valid JSON with this structure, with an entry for every day Monday to Sunday
+    and total_calories set to the user's target:
+    {{"plan_title": "...", "total_calories": 1800,
+     "weekly_meals": {{"Monday": {NUTRITION_DAY_SCHEMA}, "Tuesday": {{...}}, ...}},
+     "grocery_list": [{{"item": "Brown Rice", "quantity": "500g", "weekly_count": 2}}],
+     "nutritional_tips": ["..."]}}
+""", """
+    Generate a 7-day traditional Indian nutrition plan:""" + NUTRITION_PROFILE)
+
+WORKOUT_OUTLINE = _template("workout_outline", 1, """
+    You are ArogyaMitra's expert fitness coach. Outline balanced, safe weekly
+    workout plans. Always respond with valid JSON only.
+
+    Return ONLY a short weekly outline as valid JSON, one entry per day Monday to Sunday:
+    {"plan_title": "...", "plan_description": "...",
+     "days": {"Monday": {"focus": "Upper Body Strength", "is_rest": false}, "Tuesday": {...}, ...}}
+""", """
+    Outline a complete 7-day workout plan for this user:""" + WORKOUT_PROFILE)
+
+NUTRITION_OUTLINE = _template("nutrition_outline", 1, """
+    You are ArogyaMitra's expert nutritionist specializing in Indian cuisine.
+    Outline balanced, culturally appropriate weekly meal plans. Always respond with valid JSON only.
+
+    Return ONLY a short weekly outline as valid JSON, one entry per day Monday to Sunday:
+    {"plan_title": "...", "total_calories": 1800, "nutritional_tips": ["..."],
+     "days": {"Monday": {"theme": "South Indian, high protein"}, "Tuesday": {...}, ...}}
+""", """
+    Outline a 7-day traditional Indian nutrition plan:""" + NUTRITION_PROFILE)
+
+WORKOUT_DAYS = _template("workout_days", 1, f"""
+    You are ArogyaMitra's expert fitness coach. Rewrite single days of an existing
+    workout plan. Always respond with valid JSON only.
+
+    Return ONLY valid JSON with one entry for each requested day:
+    {{"weekly_schedule": {{"<Day>": {WORKOUT_DAY_SCHEMA}}}}}
+""", """
+    Regenerate only these days of the user's plan: {days}
+    Reason: {reason}
+    - Age: {age}, Gender: {gender}
+    - Fitness Level: {fitness_level}
+    - Goal: {fitness_goal}
+    - Workout Location: {workout_place}
+    - Available Time: {available_minutes} minutes/day
+    - Injuries: {injuries}
+    Rest of the week (keep the week balanced around it): {week}""")
+
+NUTRITION_DAYS = _template("nutrition_days", 1, f"""
+    You are ArogyaMitra's expert nutritionist specializing in Indian cuisine.
+    Rewrite single days of an existing meal plan. Always respond with valid JSON only.
+
+    Return ONLY valid JSON with one entry for each requested day:
+    {{"weekly_meals": {{"<Day>": {NUTRITION_DAY_SCHEMA}}}}}
+""", """
+    Regenerate only these days of the user's plan: {days}
+    Reason: {reason}
+    - Goal: {fitness_goal}
+    - Diet Type: {diet_preference}
+    - Target Calories: {calorie_target}
+    - Allergies: {allergies}
+    Rest of the week (keep the week balanced around it): {week}""")
+
+ADJUST_PLAN = _template("adjust_plan", 2, """
+    You are ArogyaMitra's adaptive fitness AI. Modify workout plans dynamically based on user circumstances.
+    Create an adjusted plan that accommodates their situation.
+    Return JSON with adjusted_plan and recommendations.
+""", """
+    The user needs their plan adjusted:
+    Reason: {reason}
+    Duration: {duration_days} days
+    Current Plan Summary: {plan_summary}""")
+
+# ─── Analysis ─────────────────────────────────────────────────────────────────
+
+HEALTH_ASSESSMENT = _template("health_assessment", 2, """
+    You are an expert health analyst. Provide insights based on user data.
+    Return JSON with summary, risk_factors, and recommendations.
+""", """
+    Analyze this health profile: {profile}""")
+
+PROGRESS = _template("progress", 2, """
+    You analyze fitness progress and provide insights.
+    Return JSON with: insights, achievements, recommendations, motivational_message
+""", """
+    Analyze this fitness progress and provide insights:
+    User: {full_name}, Goal: {fitness_goal}
+    Progress Data: {progress}""")
+
+SUMMARY = _template("conversation_summary", 2, """
+    You compress fitness coaching conversations into short factual summaries.
+    Keep the user's goals, constraints, injuries, preferences and any advice already given. Plain text only.
+""", """
+    Current summary of the conversation so far:
+    {previous_summary}
+
+    New messages to fold in:
+    {transcript}
+
+    Write an updated summary in at most {max_words} words.""")
+
+# ─── Chat ─────────────────────────────────────────────────────────────────────
+# The user part is the profile, sent as a second system message after the
+# static persona so the persona prefix stays cacheable
+
+COACH = _template("coach", 2, """
+    You are ArogyaMitra's AI Fitness Coach. You are warm, motivating, and knowledgeable.
+    Provide personalized fitness advice. Be encouraging, use emojis sparingly. Keep responses concise.
+""", """
+    User Profile:
+    - Name: {full_name}
+    - Age: {age}, Gender: {gender}
+    - Fitness Level: {fitness_level}
+    - Goal: {fitness_goal}
+    - Total Workouts: {total_workouts}""")
+
+AROMI = _template("aromi", 2, """
+    You are AROMI, ArogyaMitra's personal health companion. You are friendly, warm and adaptive.
+
+    🙏 Namaste! You speak naturally and use Indian cultural references when appropriate.
+
+    You can access their workout and nutrition plans and adapt advice dynamically.
+    If user mentions traveling, adjust workout suggestions to travel-friendly exercises.
+    If user mentions injuries/tiredness, suggest rest and recovery.
+    Be concise, warm, and motivating. Use emojis appropriately.
+""", """
+    User: {full_name}
+    Fitness Goal: {fitness_goal}
+    Fitness Level: {fitness_level}""")
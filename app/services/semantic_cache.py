@@ -0,0 +1,252 @@
+"""
+Semantic Cache - reuse coach/AROMI answers for rephrased questions
+
+- Messages are embedded on the CPU with a signed hashing-trick vectoriser
+  (unigrams plus half-weight bigrams, L2-normalised), so no model is loaded
+- Entries are scoped by profile bucket (chat kind, goal, level, diet, status);
+  a lookup is one NumPy matrix-vector product over that bucket
+- Entries expire after a TTL and the least recently used are evicted once the
+  cache is full
+- The user's name is swapped for a placeholder before storing, so a cached
+  answer never greets the next user by someone else's name
+"""
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.services.faq_index import tokenize
+from app.utils.config import settings
+
+NAME_PLACEHOLDER = "\x00name\x00"
+BIGRAM_WEIGHT = 0.5
+
+
+def _bucket_value(value) -> str:
+    value = getattr(value, "value", value)
+    return str(value or "").strip().lower().replace(" ", "_")
+
+
+def profile_bucket(kind: str, user_data: dict) -> Tuple[str, ...]:
+    """Profile fields that change what a good answer looks like"""
+    return (
+        kind,
+        _bucket_value(user_data.get("fitness_goal")),
+        _bucket_value(user_data.get("fitness_level")),
+        _bucket_value(user_data.get("diet_preference")),
+        _bucket_value(user_data.get("user_status")),
+    )
+
+
+def _first_name(user_data: dict) -> str:
+    return (user_data.get("name") or user_data.get("full_name") or "").split(" ")[0].strip()
+
+
+class HashingVectorizer:
+    """Fixed-width signed feature hashing; stateless, so nothing to fit or persist"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def terms(self, text: str) -> List[str]:
+        return tokenize(text)
+
+    def transform(self, terms: List[str]):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = [(term, 1.0) for term in terms]
+        features += [(f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(terms, terms[1:])]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+@dataclass
+class CachedReply:
+    entry_id: int
+    bucket: Tuple[str, ...]
+    message: str
+    response: str
+    row: int
+
+
+class _Bucket:
+    """Row-major vector matrix for one profile bucket; rows are swap-removed"""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.created = np.zeros(16, dtype=np.float64)
+        self.entries: List[CachedReply] = []
+
+    def add(self, entry: CachedReply, vector, now: float):
+        if len(self.entries) == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.created = np.concatenate([self.created, np.zeros_like(self.created)])
+        entry.row = len(self.entries)
+        self.vectors[entry.row] = vector
+        self.created[entry.row] = now
+        self.entries.append(entry)
+
+    def remove(self, entry: CachedReply):
+        last = self.entries.pop()
+        if last is not entry:
+            self.vectors[entry.row] = self.vectors[last.row]
+            self.created[entry.row] = self.created[last.row]
+            last.row = entry.row
+            self.entries[entry.row] = last
+
+    def best_match(self, vector, oldest: float) -> Tuple[Optional[CachedReply], float]:
+        count = len(self.entries)
+        if not count:
+            return None, 0.0
+        similarities = self.vectors[:count] @ vector
+        similarities[self.created[:count] < oldest] = -1.0
+        row = int(np.argmax(similarities))
+        return self.entries[row], float(similarities[row])
+
+
+class SemanticCache:
+    def __init__(self, dim: int, threshold: float, ttl_seconds: int, max_entries: int, min_terms: int):
+        self.enabled = np is not None
+        if not self.enabled:
+            print("⚠️  NumPy not installed - semantic chat cache disabled")
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.min_terms = min_terms
+        self._buckets: Dict[Tuple[str, ...], _Bucket] = {}
+        self._lru: "OrderedDict[int, CachedReply]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "writes": 0,
+            "refreshed": 0,
+            "evictions": 0,
+            "expired": 0,
+            "lookup_seconds_total": 0.0,
+        }
+
+    def _embed(self, message: str):
+        """Vector for the message, or None when it is too short to stand alone"""
+        terms = self.vectorizer.terms(message)
+        if len(terms) < self.min_terms:
+            return None
+        return self.vectorizer.transform(terms)
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def get(self, kind: str, message: str, user_data: dict) -> Optional[str]:
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        vector = self._embed(message)
+        if vector is None:
+            self.stats["skipped"] += 1
+            return None
+        bucket_key = profile_bucket(kind, user_data)
+        now = time.time()
+        with self._lock:
+            self.stats["lookups"] += 1
+            bucket = self._buckets.get(bucket_key)
+            entry, similarity = bucket.best_match(vector, now - self.ttl_seconds) if bucket else (None, 0.0)
+            hit = entry is not None and similarity >= self.threshold
+            if hit:
+                self._lru.move_to_end(entry.entry_id)
+            self.stats["hits" if hit else "misses"] += 1
+            self.stats["lookup_seconds_total"] += time.perf_counter() - started
+        if not hit:
+            return None
+        return entry.response.replace(NAME_PLACEHOLDER, _first_name(user_data) or "Friend")
+
+    def set(self, kind: str, message: str, user_data: dict, response: str):
+        if not self.enabled or not response:
+            return
+        vector = self._embed(message)
+        if vector is None:
+            return
+        name = _first_name(user_data)
+        if name:
+            response = re.sub(rf"\b{re.escape(name)}\b", NAME_PLACEHOLDER, response)
+        bucket_key = profile_bucket(kind, user_data)
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            bucket = self._buckets.setdefault(bucket_key, _Bucket(self.dim))
+            existing, similarity = bucket.best_match(vector, now - self.ttl_seconds)
+            if existing is not None and similarity >= self.threshold:
+                # Same question already cached: keep the fresher answer
+                bucket.remove(existing)
+                del self._lru[existing.entry_id]
+                self.stats["refreshed"] += 1
+            entry = CachedReply(self._next_id, bucket_key, message, response, row=-1)
+            self._next_id += 1
+            bucket.add(entry, vector, now)
+            self._lru[entry.entry_id] = entry
+            self.stats["writes"] += 1
+            while len(self._lru) > self.max_entries:
+                _, oldest = self._lru.popitem(last=False)
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._lru.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {
+                **{k: v for k, v in self.stats.items() if k != "lookup_seconds_total"},
+                "enabled": self.enabled,
+                "entries": len(self._lru),
+                "buckets": len(self._buckets),
+                "threshold": self.threshold,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "avg_lookup_ms": round(self.stats["lookup_seconds_total"] / lookups * 1000, 3) if lookups else 0.0,
+            }
+
+    # ─── Eviction ─────────────────────────────────────────────────────────────
+
+    def _drop(self, entry: CachedReply):
+        bucket = self._buckets[entry.bucket]
+        bucket.remove(entry)
+        if not bucket.entries:
+            del self._buckets[entry.bucket]
+
+    def _purge_expired(self, now: float):
+        # _lru is in access order, not creation order, so scan each bucket's timestamps
+        oldest = now - self.ttl_seconds
+        for bucket in list(self._buckets.values()):
+            count = len(bucket.entries)
+            expired = [bucket.entries[row] for row in np.flatnonzero(bucket.created[:count] < oldest)]
+            for entry in expired:
+                self._drop(entry)
+                del self._lru[entry.entry_id]
+                self.stats["expired"] += 1
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache(
+    dim=settings.SEMANTIC_CACHE_DIM,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    min_terms=settings.SEMANTIC_CACHE_MIN_TERMS,
+)
@@ -4,6 +4,14 @@ from typing import List
 class Settings(BaseSettings):
     PROJECT_NAME: str = "ArogyaMitra"
     DATABASE_URL: str = "sqlite:///./arogyamitra.db"
+    # "production" runs SQLite in WAL mode with tuned pragmas on every pooled
+    # connection and queues writers one at a time; "default" keeps stock SQLite
+    DATABASE_PROFILE: str = "default"
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
     SECRET_KEY: str = "your-super-secret-key-change-this"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -11,6 +19,74 @@ class Settings(BaseSettings):
     PORT: int = 8000
     
     GROQ_API_KEY: str = ""
+    GROQ_TIMEOUT_SECONDS: float = 30.0
+    GROQ_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GROQ_PLAN_TIMEOUT_SECONDS: float = 60.0
+    GROQ_CHAT_TIMEOUT_SECONDS: float = 20.0
+    GROQ_MAX_RETRIES: int = 1
+    GROQ_MAX_CONNECTIONS: int = 200
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    GROQ_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    # Point at scripts/fake_groq_server.py (e.g. http://127.0.0.1:8900) for offline load tests
+    GROQ_BASE_URL: str = ""
+
+    # "record" appends real LLM exchanges to LLM_RECORDINGS_PATH; "replay" serves them offline
+    LLM_RECORD_MODE: str = ""
+    LLM_RECORDINGS_PATH: str = "./llm_recordings.jsonl"
+    LLM_REPLAY_REALTIME: bool = False
+
+    # LLM admission control; quotas default to Groq's free tier for llama-3.3-70b
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_QUEUE: int = 200
+    LLM_REQUESTS_PER_MINUTE: float = 30
+    LLM_TOKENS_PER_MINUTE: float = 12000
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_P95_SECONDS: float = 15.0
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    REQUEST_DEADLINE_SECONDS: float = 90.0
+
+    # Serve profiles without medical free text from the local plan engine
+    PLAN_ENGINE_PRIMARY: bool = False
+    # Build every goal/level/place engine plan at startup and serve copies
+    PLAN_VARIANTS_PRECOMPUTE: bool = True
+    PLAN_VARIANTS_MAX_ENTRIES: int = 2048
+    # Answer short greetings/thanks with canned replies instead of the LLM
+    INTENT_LOCAL_ROUTING: bool = True
+    # Answer confidently matched FAQ questions from app/data/faq.json
+    FAQ_LOCAL_ANSWERS: bool = True
+    FAQ_MIN_CONFIDENCE: float = 0.6
+
+    # Reuse chat answers for rephrased questions from similar profiles
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_DIM: int = 2048
+    SEMANTIC_CACHE_THRESHOLD: float = 0.8
+    SEMANTIC_CACHE_TTL_SECONDS: int = 24 * 3600
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 5000
+    SEMANTIC_CACHE_MIN_TERMS: int = 3
+
+    # Outline the week, then generate each day as a parallel sub-prompt
+    PLAN_FANOUT_ENABLED: bool = False
+    PLAN_FANOUT_CONCURRENCY: int = 7
+
+    PLAN_CACHE_ENABLED: bool = True
+    PLAN_CACHE_PATH: str = "./plan_cache.db"
+    PLAN_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    PLAN_CACHE_MEMORY_ENTRIES: int = 256
+    PLAN_CACHE_MAX_ENTRIES: int = 5000
+
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1200
+    CHAT_SUMMARY_TOKEN_BUDGET: int = 300
+    CHAT_STORED_MESSAGES: int = 20  # per session; unsummarised messages are kept beyond this
+
+    PLAN_JOB_WORKERS: int = 4
+    PLAN_JOB_MAX_ATTEMPTS: int = 2
+    PLAN_JOB_RETRY_BACKOFF_SECONDS: float = 5.0  # doubled after each failed attempt
+    PLAN_JOB_HEARTBEAT_SECONDS: float = 15.0
+    PLAN_JOB_SUBSCRIBE_TIMEOUT_SECONDS: float = 300.0
+
+    # Generate plans in the background as soon as a health assessment is submitted
+    PLAN_SPECULATION_ENABLED: bool = True
+    PLAN_SPECULATION_TTL_SECONDS: int = 30 * 60
     
     GOOGLE_CALENDAR_CLIENT_ID: str = ""
     GOOGLE_CALENDAR_CLIENT_SECRET: str = ""
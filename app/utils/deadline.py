@@ -0,0 +1,60 @@
+"""
+Request deadlines - propagate the HTTP request's time budget to LLM calls
+
+DeadlineMiddleware stamps every request with an absolute deadline (from the
+X-Request-Timeout header in seconds, or REQUEST_DEADLINE_SECONDS). Code deeper
+in the call stack reads it through a context variable, so nothing has to pass
+it along explicitly. Work started outside a request has no deadline.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.utils.config import settings
+
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[float]:
+    """Absolute deadline on the time.monotonic() clock, or None"""
+    return _request_deadline.get()
+
+
+def remaining_seconds() -> Optional[float]:
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run a block with its own budget; None lifts the deadline (e.g. background work)"""
+    token = _request_deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    def __init__(self, app, default_seconds: float = settings.REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        seconds = self.default_seconds
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-timeout":
+                try:
+                    seconds = max(0.0, min(float(value), self.default_seconds))
+                except ValueError:
+                    pass
+                break
+        with deadline_scope(seconds):
+            await self.app(scope, receive, send)
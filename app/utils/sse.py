@@ -0,0 +1,18 @@
+import json
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(generator, background=None) -> StreamingResponse:
+    return StreamingResponse(generator, media_type="text/event-stream", headers=SSE_HEADERS, background=background)
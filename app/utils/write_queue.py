@@ -0,0 +1,151 @@
+"""
+Write Queue - one writing session at a time, served in arrival order
+- SQLite allows a single writer; left alone, concurrent writers spin in the
+  busy handler and the unlucky ones fail with "database is locked"
+- A session joins the queue at its first write (flush or bulk
+  UPDATE/DELETE/INSERT) and leaves when its transaction ends, so read-only
+  sessions never wait and each write transaction runs alone
+- One queue gates every writer to the database: sync sessions in worker
+  threads wait on an Event, AsyncSessions wait on a future on their event
+  loop (never blocking it), and both sit in the same FIFO
+- Waiting is a FIFO instead of SQLite's sleep/retry polling; a writer that
+  waits longer than the timeout gets an OperationalError, the same error
+  SQLite would raise
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+
+def _timed_out() -> OperationalError:
+    return OperationalError("write queue", {}, TimeoutError("database write queue timed out"))
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class WriteQueue:
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._lock = threading.Lock()
+        self._waiting = deque()   # (session, wake) in arrival order
+        self._holder = None
+        self.stats = {"writes": 0, "waited": 0, "timeouts": 0, "max_depth": 0,
+                      "sync_writes": 0, "async_writes": 0,
+                      "wait_seconds_total": 0.0, "max_wait_seconds": 0.0}
+
+    # ─── Turn taking ──────────────────────────────────────────────────────────
+
+    def _try_take(self, session: Session, asynchronous: bool) -> bool:
+        """Under the lock: True when the session already holds or just got the turn"""
+        if self._holder is session:
+            return True
+        if self._holder is None and not self._waiting:
+            self._holder = session
+            self._count(asynchronous)
+            return True
+        return False
+
+    def _count(self, asynchronous: bool, waited: float = None):
+        self.stats["writes"] += 1
+        self.stats["async_writes" if asynchronous else "sync_writes"] += 1
+        if waited is not None:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+
+    def _enqueue(self, session: Session, wake):
+        entry = (session, wake)
+        self._waiting.append(entry)
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._waiting))
+        return entry
+
+    def _give_up(self, session: Session, entry, asynchronous: bool, started: float):
+        """Wait ended by timeout: keep the turn if it was handed over meanwhile"""
+        with self._lock:
+            if self._holder is session:
+                self._count(asynchronous, time.monotonic() - started)
+                return
+            self._waiting.remove(entry)
+            self.stats["timeouts"] += 1
+        raise _timed_out()
+
+    def acquire(self, session: Session):
+        """Thread side: block the calling worker thread until it is this session's turn"""
+        with self._lock:
+            if self._try_take(session, False):
+                return
+            turn = threading.Event()
+            entry = self._enqueue(session, turn.set)
+        started = time.monotonic()
+        if not turn.wait(self.timeout_seconds):
+            return self._give_up(session, entry, False, started)
+        with self._lock:
+            self._count(False, time.monotonic() - started)
+
+    def acquire_async(self, session: Session):
+        """Event loop side: runs in SQLAlchemy's greenlet and awaits the turn without blocking the loop"""
+        with self._lock:
+            if self._try_take(session, True):
+                return
+            loop = asyncio.get_running_loop()
+            turn = loop.create_future()
+            entry = self._enqueue(session, lambda: loop.call_soon_threadsafe(_resolve, turn))
+        started = time.monotonic()
+        try:
+            await_only(asyncio.wait_for(turn, self.timeout_seconds))
+        except asyncio.TimeoutError:
+            return self._give_up(session, entry, True, started)
+        with self._lock:
+            self._count(True, time.monotonic() - started)
+
+    def release(self, session: Session):
+        with self._lock:
+            if self._holder is not session:
+                return
+            self._holder = None
+            if self._waiting:
+                waiter, wake = self._waiting.popleft()
+                self._holder = waiter
+                wake()
+
+    # ─── Wiring ───────────────────────────────────────────────────────────────
+
+    def attach(self, target, asynchronous: bool = False):
+        """Queue every write made through a sessionmaker or Session class;
+        asynchronous=True for the sync_session_class behind AsyncSessions"""
+        acquire = self.acquire_async if asynchronous else self.acquire
+
+        @event.listens_for(target, "before_flush")
+        def _before_flush(session, flush_context, instances):
+            acquire(session)
+
+        @event.listens_for(target, "do_orm_execute")
+        def _before_bulk_write(orm_execute_state):
+            if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+                acquire(orm_execute_state.session)
+
+        @event.listens_for(target, "after_transaction_end")
+        def _after_transaction_end(session, transaction):
+            if transaction.parent is None:
+                self.release(session)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **{k: v for k, v in self.stats.items() if not k.endswith("seconds_total")},
+                "queued": len(self._waiting),
+                "writing": self._holder is not None,
+                "avg_wait_ms": round(self.stats["wait_seconds_total"] / self.stats["waited"] * 1000, 2)
+                if self.stats["waited"] else 0.0,
+                "max_wait_seconds": round(self.stats["max_wait_seconds"], 4),
+            }
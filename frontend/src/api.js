@@ -1,19 +1,67 @@
 const BASE_URL = import.meta.env.VITE_API_BASE || "http://127.0.0.1:8000";
 
-async function apiFetch(path, options = {}) {
+function buildRequest(path, options = {}) {
   const url = path.startsWith("http") ? path : `${BASE_URL}${path}`;
   const token = localStorage.getItem("auth_token") || null;
   const headers = { "Content-Type": "application/json", ...(options.headers || {}) };
   if (token) headers["Authorization"] = `Bearer ${token}`;
 
   const init = {
-    headers,
     ...options,
+    headers,
   };
+  return { url, init };
+}
+
+async function apiFetch(path, options = {}) {
+  const { url, init } = buildRequest(path, options);
   const res = await fetch(url, init);
   const contentType = res.headers.get("content-type") || "";
   if (contentType.includes("application/json")) return res.json();
   return res.text();
 }
 
-export { BASE_URL, apiFetch };
+// Consume a Server-Sent Events endpoint (e.g. /api/ai-coach/chat/stream).
+// onEvent(event, data) fires for every frame; resolves with the full text.
+async function apiStream(path, options = {}, onEvent = () => {}) {
+  const { url, init } = buildRequest(path, options);
+  init.headers["Accept"] = "text/event-stream";
+  const res = await fetch(url, init);
+  if (!res.ok || !res.body) {
+    throw new Error(`Stream request failed: ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let text = "";
+
+  const dispatch = (frame) => {
+    let event = "message";
+    const dataLines = [];
+    for (const line of frame.split("\n")) {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) dataLines.push(line.slice(5).trimStart());
+    }
+    if (!dataLines.length) return;
+    let data = dataLines.join("\n");
+    try { data = JSON.parse(data); } catch { /* plain-text payload */ }
+    if (event === "token" && data && data.token) text += data.token;
+    onEvent(event, data);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let idx;
+    while ((idx = buffer.indexOf("\n\n")) !== -1) {
+      dispatch(buffer.slice(0, idx));
+      buffer = buffer.slice(idx + 2);
+    }
+  }
+  if (buffer.trim()) dispatch(buffer);
+  return text;
+}
+
+export { BASE_URL, apiFetch, apiStream };
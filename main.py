@@ -7,9 +7,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.database import engine, Base
-from app.routers import auth, users, workouts, nutrition, progress, health_assessment, ai_coach, aromi, admin, calendar_sync
+from app.database import init_db
+from app.routers import auth, users, workouts, nutrition, progress, health_assessment, ai_coach, aromi, admin, calendar_sync, jobs
 from app.utils.config import settings
+from app.utils.deadline import DeadlineMiddleware
 
 
 @asynccontextmanager
@@ -19,12 +20,19 @@ async def lifespan(app: FastAPI):
     print("🤖 Created by: Srinivas")
     print("🎯 Mission: Transforming Lives Through AI-Powered Fitness")
     print(f"🚀 Launching on: http://localhost:{settings.PORT}")
-    Base.metadata.create_all(bind=engine)
+    init_db()
     from app.services.ai_agent import ai_agent
     print("🤖 Initializing AI Agent...")
     print("✅ AI Agent initialized successfully!")
+    if settings.PLAN_VARIANTS_PRECOMPUTE:
+        from app.services.plan_variants import plan_variants
+        plan_variants.precompute()
+    from app.services.job_queue import plan_job_queue
+    await plan_job_queue.start()
     yield
     # Shutdown
+    await plan_job_queue.stop()
+    await ai_agent.aclose()
     print("👋 ArogyaMitra shutting down...")
 
 
@@ -44,6 +52,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stamp each request with a deadline that LLM calls honour
+app.add_middleware(DeadlineMiddleware)
+
 # Include Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -55,6 +66,7 @@ app.include_router(ai_coach.router, prefix="/api/ai-coach", tags=["AI Coach"])
 app.include_router(aromi.router, prefix="/api/aromi", tags=["AROMI AI Coach"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(calendar_sync.router, prefix="/api/calendar", tags=["Google Calendar"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Generation Jobs"])
 
 print("✅ Auth router loaded")
 print("✅ Users router loaded")
@@ -65,6 +77,7 @@ print("✅ Admin router loaded")
 print("✅ Chat router loaded")
 print("✅ Health Assessment router loaded")
 print("✅ AROMI AI Coach router loaded")
+print("✅ Generation Jobs router loaded")
 
 
 @app.get("/")
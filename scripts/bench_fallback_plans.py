@@ -0,0 +1,98 @@
+"""
+Fallback plan benchmark - engine build vs precomputed variant per call
+
+Measures:
+- import time of the plan engine and the first catalogue load
+- time to precompute every goal/level/place/minutes and goal/diet/calories
+  variant
+- per-call cost of building a plan with the engine vs serving a personalised
+  variant copy, with every call drawn from a fresh realistic profile
+  (continuous age, height and weight, varied minutes, workout times and
+  allergies), and the variant hit rate over those profiles
+
+Usage:
+    python scripts/bench_fallback_plans.py --calls 2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+GOALS = ["weight_loss", "muscle_gain", "general_fitness", "endurance", "flexibility"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+PLACES = ["home", "gym", "outdoor"]
+DIETS = ["vegetarian", "vegan", "eggetarian", "non_vegetarian"]
+# Most users report no allergies
+ALLERGIES = ["None"] * 16 + ["", "peanuts", "dairy", "gluten"]
+
+
+def random_profile(rng: random.Random) -> dict:
+    return {
+        "age": rng.randint(18, 65),
+        "gender": rng.choice(["Male", "Female"]),
+        "height": round(rng.gauss(168, 9), 1),
+        "weight": round(min(140, max(40, rng.gauss(72, 14))), 1),
+        "fitness_level": rng.choice(LEVELS),
+        "fitness_goal": rng.choice(GOALS),
+        "workout_preference": rng.choice(PLACES),
+        "available_minutes": rng.choice([20, 25, 30, 40, 45, 50, 60, 75, 90]),
+        "workout_time": rng.choice(["Morning", "Afternoon", "Evening", "Night"]),
+        "diet_preference": rng.choice(DIETS),
+        "allergies": rng.choice(ALLERGIES),
+    }
+
+
+def timed(fn, calls: list) -> list:
+    samples = []
+    for kind, profile in calls:
+        started = time.perf_counter()
+        fn(kind, profile)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<18} mean {statistics.mean(samples):8.1f} µs   p50 {statistics.median(samples):8.1f} µs   p95 {p95:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="plans requested per method")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    from app.services import plan_engine
+    imported = time.perf_counter()
+    plan_engine.catalogue()
+    loaded = time.perf_counter()
+    from app.services.plan_variants import PlanVariants
+    variants = PlanVariants(max_entries=4096)
+    precompute_started = time.perf_counter()
+    variants.precompute()
+    precomputed = time.perf_counter()
+
+    print(f"engine import      {(imported - started) * 1000:8.1f} ms")
+    print(f"catalogue load     {(loaded - imported) * 1000:8.1f} ms")
+    print(f"precompute         {(precomputed - precompute_started) * 1000:8.1f} ms")
+
+    rng = random.Random(args.seed)
+    calls = [(rng.choice(["workout", "nutrition"]), random_profile(rng)) for _ in range(args.calls)]
+    builders = {"workout": plan_engine.build_workout_plan, "nutrition": plan_engine.build_nutrition_plan}
+
+    report("engine build", timed(lambda kind, profile: builders[kind](profile), calls))
+    report("variant copy", timed(variants.get, calls))
+    stats = variants.get_stats()
+    print(f"variants {stats['variants']} ({stats['precomputed']} precomputed), hit rate {stats['hit_rate']:.1%} "
+          f"over {len(calls)} distinct profiles, {stats['bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
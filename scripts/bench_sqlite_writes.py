@@ -0,0 +1,209 @@
+"""
+SQLite write benchmark - default engine vs the production profile
+
+Runs the same mixed workload against a fresh database file per profile:
+- writer threads (like the job workers, on sync sessions) each repeat the
+  complete-exercise transaction (mark the exercise done, add a progress
+  record, recount the user's workouts, bump streak points, commit)
+- async writers (like request handlers, on AsyncSessions sharing one event
+  loop) repeat the same transaction at the same time
+- reader threads keep loading the active plan and today's exercises
+
+In the production profile both kinds of writer go through the one shared
+write queue, so neither has to rely on busy_timeout against the other.
+
+Reports committed writes per second, commit latency, "database is locked"
+failures and reads per second completed alongside the writers.
+
+Usage:
+    python scripts/bench_sqlite_writes.py --writers 8 --async-writers 8 --writes 200 --readers 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.database import (  # noqa: E402
+    Base, create_async_db_engine, create_async_session_factory, create_db_engine, create_session_factory,
+    uses_production_sqlite,
+)
+from app.models import Exercise, ProgressRecord, User, WorkoutPlan, WorkoutStatus  # noqa: E402
+from app.utils.config import settings  # noqa: E402
+from app.utils.write_queue import WriteQueue  # noqa: E402
+
+
+def seed(session_factory, users: int) -> list:
+    db = session_factory()
+    exercise_ids = []
+    for i in range(users):
+        user = User(email=f"bench{i}@x.com", username=f"bench{i}", hashed_password="x", full_name="Bench User",
+                    is_active=True, total_workouts=0, streak_points=0)
+        db.add(user)
+        db.flush()
+        plan = WorkoutPlan(user_id=user.id, title="Bench Plan", is_active=True, plan_data={})
+        db.add(plan)
+        db.flush()
+        exercise = Exercise(workout_plan_id=plan.id, day_of_week="Monday", name="Squat", sets=3, reps="12")
+        db.add(exercise)
+        db.flush()
+        exercise_ids.append((user.id, plan.id, exercise.id))
+    db.commit()
+    db.close()
+    return exercise_ids
+
+
+def complete_exercise(session_factory, user_id: int, exercise_id: int):
+    db = session_factory()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+        exercise.status = WorkoutStatus.COMPLETED
+        exercise.completed_at = datetime.now()
+        db.add(ProgressRecord(user_id=user_id, exercise_id=exercise_id, record_type="workout",
+                              calories_burned=14, workout_duration_minutes=10, exercises_completed=1))
+        records = db.query(ProgressRecord).filter(
+            ProgressRecord.user_id == user_id, ProgressRecord.record_type == "workout").all()
+        user.total_workouts = len(records) + 1
+        user.streak_points = (user.streak_points or 0) + 10
+        db.commit()
+    finally:
+        db.close()
+
+
+async def complete_exercise_async(session_factory, user_id: int, exercise_id: int):
+    async with session_factory() as db:
+        user = await db.scalar(select(User).filter(User.id == user_id))
+        exercise = await db.scalar(select(Exercise).filter(Exercise.id == exercise_id))
+        exercise.status = WorkoutStatus.COMPLETED
+        exercise.completed_at = datetime.now()
+        db.add(ProgressRecord(user_id=user_id, exercise_id=exercise_id, record_type="workout",
+                              calories_burned=14, workout_duration_minutes=10, exercises_completed=1))
+        records = (await db.scalars(select(ProgressRecord).filter(
+            ProgressRecord.user_id == user_id, ProgressRecord.record_type == "workout"))).all()
+        user.total_workouts = len(records) + 1
+        user.streak_points = (user.streak_points or 0) + 10
+        await db.commit()
+
+
+def load_today(session_factory, user_id: int, plan_id: int):
+    db = session_factory()
+    try:
+        db.query(WorkoutPlan).filter(WorkoutPlan.user_id == user_id, WorkoutPlan.is_active == True).first()
+        db.query(Exercise).filter(Exercise.workout_plan_id == plan_id, Exercise.day_of_week == "Monday").all()
+    finally:
+        db.close()
+
+
+def run_profile(profile: str, args) -> dict:
+    path = Path(tempfile.mkdtemp()) / f"bench_{profile}.db"
+    url = f"sqlite:///{path}"
+    engine = create_db_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    queue = WriteQueue(settings.SQLITE_BUSY_TIMEOUT_MS / 1000) if uses_production_sqlite(url, profile) else None
+    session_factory = create_session_factory(engine, queue)
+    async_engine = create_async_db_engine(url, profile)
+    async_session_factory = create_async_session_factory(async_engine, queue)
+    targets = seed(session_factory, args.writers + args.async_writers)
+    thread_targets, async_targets = targets[:args.writers], targets[args.writers:]
+
+    latencies, failures, reads = [], [0], [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer(user_id, exercise_id):
+        for _ in range(args.writes):
+            started = time.perf_counter()
+            try:
+                complete_exercise(session_factory, user_id, exercise_id)
+            except OperationalError:
+                with lock:
+                    failures[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    async def async_writer(user_id, exercise_id):
+        for _ in range(args.writes):
+            started = time.perf_counter()
+            try:
+                await complete_exercise_async(async_session_factory, user_id, exercise_id)
+            except OperationalError:
+                failures[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    async def async_writers():
+        await asyncio.gather(*[async_writer(u, e) for u, _, e in async_targets])
+        await async_engine.dispose()
+
+    def reader(user_id, plan_id):
+        while not done.is_set():
+            load_today(session_factory, user_id, plan_id)
+            with lock:
+                reads[0] += 1
+
+    writers = [threading.Thread(target=writer, args=(u, e)) for u, _, e in thread_targets]
+    if async_targets:
+        writers.append(threading.Thread(target=asyncio.run, args=(async_writers(),)))
+    readers = [threading.Thread(target=reader, args=targets[i % len(targets)][:2]) for i in range(args.readers)]
+    started = time.perf_counter()
+    for t in writers + readers:
+        t.start()
+    for t in writers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for t in readers:
+        t.join()
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+
+    latencies.sort()
+    return {
+        "writes_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "locked": failures[0],
+        "reads_per_second": reads[0] / elapsed,
+        "queue": queue.get_stats() if queue else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="concurrent writer threads (sync sessions)")
+    parser.add_argument("--async-writers", type=int, default=8, help="concurrent writers on AsyncSessions")
+    parser.add_argument("--writes", type=int, default=200, help="transactions per writer")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+    args = parser.parse_args()
+
+    print(f"{args.writers} thread + {args.async_writers} async writers x {args.writes} transactions, "
+          f"{args.readers} readers")
+    for profile in args.profiles:
+        r = run_profile(profile, args)
+        print(f"{profile:<11} {r['writes_per_second']:8.1f} writes/s   p50 {r['p50_ms']:7.2f} ms   "
+              f"p95 {r['p95_ms']:7.2f} ms   locked {r['locked']:4d}   {r['reads_per_second']:8.1f} reads/s")
+        if r["queue"]:
+            q = r["queue"]
+            print(f"{'':<11} write queue: {q['sync_writes']} sync + {q['async_writes']} async writes, "
+                  f"max depth {q['max_depth']}, avg wait {q['avg_wait_ms']} ms, timeouts {q['timeouts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Plan schema check - sloppy model JSON must normalise, never raise
+
+Feeds plan_schema the shapes models actually send where the schema expects
+something else, and checks each one comes back in the canonical shape:
+- warm-ups and cool-downs given as a list of steps, a number or a dict
+- dicts, numbers and lists where text belongs (names, descriptions, reps),
+  and NaN/Infinity where numbers belong
+- whole plans through ArogyaMitraAgent._complete_plan, which must repair
+  them or fall back to the engine plan instead of raising
+
+Usage:
+    python scripts/check_plan_schema.py
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# (name, workout day as the model sent it, {field: expected value after normalising})
+WORKOUT_DAYS = [
+    ("list warm-up", {"warmup": ["Jumping jacks", "Arm circles"], "exercises": [{"name": "Squat"}]},
+     {"warmup": {"description": "Jumping jacks, Arm circles", "duration_minutes": 5}}),
+    ("list of dict cool-down", {"cooldown": [{"description": "Hamstring stretch"}, {"name": "Child's pose"}],
+                                "exercises": [{"name": "Squat"}]},
+     {"cooldown": {"description": "Hamstring stretch, Child's pose", "duration_minutes": 5}}),
+    ("number warm-up", {"warm_up": 10, "exercises": [{"name": "Squat"}]},
+     {"warmup": {"description": "", "duration_minutes": 10}}),
+    ("dict description", {"warmup": {"description": {"text": "Light jog"}}, "exercises": [{"name": "Squat"}]},
+     {"warmup": {"description": "Light jog", "duration_minutes": 5}}),
+    ("empty list warm-up", {"warmup": [], "exercises": [{"name": "Squat"}]}, {"warmup": None}),
+    ("number focus", {"focus": 5, "exercises": [{"name": "Squat"}]}, {"focus": "5"}),
+]
+
+# (name, exercise as the model sent it, {field: expected value})
+EXERCISES = [
+    ("dict name", {"name": {"en": "Push-up"}}, {"name": "Push-up"}),
+    ("number reps", {"name": "Plank", "reps": 30}, {"reps": "30"}),
+    ("list description", {"name": "Lunge", "description": ["Step forward", "Lower the knee"]},
+     {"description": "Step forward, Lower the knee"}),
+    ("dict description", {"name": "Lunge", "description": {"steps": "Step forward"}}, {"description": "Step forward"}),
+    ("number muscle groups", {"name": "Row", "muscle_groups": 3}, {"muscle_groups": ["3"]}),
+    ("NaN and infinite numbers", {"name": "Squat", "sets": float("nan"), "calories_burned": float("inf")},
+     {"sets": 3, "calories_burned": None}),
+]
+
+# (name, meal as the model sent it, {field: expected value})
+MEALS = [
+    ("dict name", {"name": {"name": "Poha"}, "calories": "300 kcal"}, {"name": "Poha", "calories": 300}),
+    ("number meal time", {"name": "Upma", "meal_time": 8}, {"meal_time": "8"}),
+    ("list name", {"name": ["Dal", "Rice"]}, {"name": "Dal, Rice"}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    os.environ["GROQ_API_KEY"] = ""
+
+    from app.services import plan_engine
+    from app.services.ai_agent import ai_agent
+    from app.services.plan_schema import normalize_day
+
+    failures = 0
+
+    def check(label: str, produce, expected: dict):
+        nonlocal failures
+        try:
+            result = produce()
+            wrong = {k: result.get(k) for k, v in expected.items() if result.get(k) != v}
+        except Exception as e:
+            wrong = {"raised": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+        failures += bool(wrong)
+        print(f"{'❌' if wrong else '✅'} {label}" + (f": {wrong}" if wrong else ""))
+
+    for name, day, expected in WORKOUT_DAYS:
+        check(f"workout day: {name}", lambda: normalize_day("workout", day), expected)
+    for name, exercise, expected in EXERCISES:
+        check(f"exercise: {name}",
+              lambda: normalize_day("workout", {"exercises": [exercise]})["exercises"][0], expected)
+    for name, meal, expected in MEALS:
+        check(f"meal: {name}", lambda: normalize_day("nutrition", {"lunch": meal})["lunch"], expected)
+
+    profile = {"fitness_goal": "weight_loss", "weight": 70}
+    plan = plan_engine.build_workout_plan(profile)
+    plan["weekly_schedule"]["Monday"]["warmup"] = ["Jumping jacks", "Arm circles"]
+    plan["weekly_schedule"]["Tuesday"]["cooldown"] = [{"description": "Stretch"}]
+    plan["weekly_schedule"]["Wednesday"]["exercises"][0]["description"] = {"text": "Keep the back straight"}
+    check("agent: workout plan with list and dict fields",
+          lambda: ai_agent._complete_plan("workout", plan, profile)[0]["weekly_schedule"]["Monday"],
+          {"warmup": {"description": "Jumping jacks, Arm circles", "duration_minutes": 5}})
+    check("agent: reply that is not a plan object falls back to the engine",
+          lambda: ai_agent._complete_plan("workout", ["Monday: squats"], profile)[0],
+          {"generated_by": "plan_engine"})
+
+    if failures:
+        print(f"{failures} shapes did not normalise")
+        sys.exit(1)
+    print("Every shape normalised to the canonical plan schema")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Query count check - plan endpoints must not issue N+1 queries or per-row writes
+
+Seeds a throwaway database with one user and several generated workout and
+nutrition plans (through the API, so rows are exactly what /generate
+writes), then calls the plan endpoints and counts the SQL statements each
+one sends. An endpoint fails when it exceeds its budget:
+
+- reads: 1 statement to load the current user from the token, 1 for the
+  plan(s) and 1 selectinload IN query for all of their rows, no matter how
+  many plans, days or rows there are
+- /generate: the user and latest assessment lookups, then one transaction
+  that deactivates the old plan, inserts the new one and inserts all of its
+  rows in one executemany statement; the response is built without reading
+  the plan back
+
+Usage:
+    python scripts/check_query_counts.py
+    python scripts/check_query_counts.py --plans 5 --verbose
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# (method, path, statement budget)
+ENDPOINTS = [
+    ("POST", "/api/workouts/generate", 5),
+    ("POST", "/api/nutrition/generate", 5),
+    ("GET", "/api/workouts/current", 3),
+    ("GET", "/api/workouts/today", 3),
+    ("GET", "/api/workouts/week", 3),
+    ("GET", "/api/workouts/history", 3),
+    ("GET", "/api/nutrition/current", 3),
+    ("GET", "/api/nutrition/today", 3),
+    ("GET", "/api/nutrition/week", 3),
+    ("GET", "/api/nutrition/grocery-list", 3),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", type=int, default=3, help="plans of each kind to generate for the user")
+    parser.add_argument("--verbose", action="store_true", help="print every statement")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'query_counts.db'}"
+    os.environ["PLAN_CACHE_PATH"] = str(workdir / "plan_cache.db")
+    os.environ["GROQ_API_KEY"] = ""  # engine fallback plans: no network, same rows
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main as app_main
+    from app.database import SessionLocal, async_engine
+    from app.models.user import User
+    from app.utils.auth import create_access_token
+
+    statements = []
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    failures = 0
+    with TestClient(app_main.app) as client:
+        db = SessionLocal()
+        db.add(User(email="counts@example.com", username="counts", hashed_password="x",
+                    full_name="Query Count", is_active=True))
+        db.commit()
+        db.close()
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": "counts"})}
+        for _ in range(args.plans):
+            for kind in ("workouts", "nutrition"):
+                client.post(f"/api/{kind}/generate", json={}, headers=headers).raise_for_status()
+
+        for method, path, budget in ENDPOINTS:
+            statements.clear()
+            response = client.request(method, path, headers=headers, json={} if method == "POST" else None)
+            response.raise_for_status()
+            count = len(statements)
+            ok = count <= budget
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {method} {path}: {count} queries (budget {budget})")
+            if args.verbose or not ok:
+                for statement in statements:
+                    print("      " + " ".join(statement.split())[:160])
+
+    if failures:
+        print(f"{failures} endpoints exceed their query budget")
+        sys.exit(1)
+    print("All plan endpoints are within their query budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Query plan check - the hot router queries must be answered from an index
+
+Brings a database up to the current schema (create_all + migrations), then
+EXPLAINs the queries the routers run on every request and fails when any of
+them scans a whole table or misses the composite index meant for it.
+
+- SQLite: a "SCAN <table>" step fails the check
+- Postgres: sequential scans are disabled for the session, so any
+  "Seq Scan" left in the plan means no usable index exists
+
+Usage:
+    python scripts/check_query_plans.py                      # temporary SQLite file
+    python scripts/check_query_plans.py --database-url postgresql://localhost/arogyamitra
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+USER_ID = 1
+PLAN_ID = 1
+
+
+def hot_queries(db) -> list:
+    """(label, query, index expected in the plan or None) mirroring the routers"""
+    from app.models import (
+        ChatSession, Exercise, HealthAssessment, Meal, NutritionPlan, ProgressRecord, WorkoutPlan,
+    )
+
+    since = datetime.now() - timedelta(days=30)
+    return [
+        ("active workout plan", db.query(WorkoutPlan).filter(
+            WorkoutPlan.user_id == USER_ID, WorkoutPlan.is_active == True),
+         "ix_workout_plans_user_id_is_active"),
+        ("workout plan history", db.query(WorkoutPlan).filter(
+            WorkoutPlan.user_id == USER_ID).order_by(WorkoutPlan.created_at.desc()).limit(10),
+         "ix_workout_plans_user_id_is_active"),
+        ("active nutrition plan", db.query(NutritionPlan).filter(
+            NutritionPlan.user_id == USER_ID, NutritionPlan.is_active == True),
+         "ix_nutrition_plans_user_id_is_active"),
+        ("today's exercises", db.query(Exercise).filter(
+            Exercise.workout_plan_id == PLAN_ID, Exercise.day_of_week == "Monday"),
+         "ix_exercises_workout_plan_id_day_of_week"),
+        ("plan exercises", db.query(Exercise).filter(Exercise.workout_plan_id == PLAN_ID),
+         "ix_exercises_workout_plan_id_day_of_week"),
+        ("today's meals", db.query(Meal).filter(
+            Meal.nutrition_plan_id == PLAN_ID, Meal.day_of_week == "Monday"),
+         "ix_meals_nutrition_plan_id_day_of_week"),
+        ("plan meals", db.query(Meal).filter(Meal.nutrition_plan_id == PLAN_ID),
+         "ix_meals_nutrition_plan_id_day_of_week"),
+        ("own exercise", db.query(Exercise).join(WorkoutPlan).filter(
+            Exercise.id == 1, WorkoutPlan.user_id == USER_ID), None),
+        ("progress overview", db.query(ProgressRecord).filter(
+            ProgressRecord.user_id == USER_ID, ProgressRecord.created_at >= since),
+         "ix_progress_records_user_id_record_type_created_at"),
+        ("progress chart", db.query(ProgressRecord).filter(
+            ProgressRecord.user_id == USER_ID,
+            ProgressRecord.record_type == "workout",
+            ProgressRecord.created_at >= since,
+        ).order_by(ProgressRecord.created_at),
+         "ix_progress_records_user_id_record_type_created_at"),
+        ("user stats", db.query(ProgressRecord).filter(
+            ProgressRecord.user_id == USER_ID, ProgressRecord.record_type == "nutrition"),
+         "ix_progress_records_user_id_record_type_created_at"),
+        ("coach sessions", db.query(ChatSession).filter(
+            ChatSession.user_id == USER_ID, ChatSession.session_type == "ai_coach",
+        ).order_by(ChatSession.created_at.desc()).limit(10),
+         "ix_chat_sessions_user_id_session_type_is_active_created_at"),
+        ("active AROMI session", db.query(ChatSession).filter(
+            ChatSession.user_id == USER_ID, ChatSession.session_type == "aromi", ChatSession.is_active == True,
+        ).order_by(ChatSession.created_at.desc()),
+         "ix_chat_sessions_user_id_session_type_is_active_created_at"),
+        ("latest assessment", db.query(HealthAssessment).filter(
+            HealthAssessment.user_id == USER_ID).order_by(HealthAssessment.created_at.desc()),
+         "ix_health_assessments_user_id_created_at"),
+    ]
+
+
+def explain(conn, sql: str) -> list:
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    return [row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql)]
+
+
+def full_scans(dialect: str, plan: list) -> list:
+    if dialect == "sqlite":
+        return [step for step in plan if step.startswith("SCAN ") and "CONSTANT ROW" not in step]
+    return [step.strip() for step in plan if "Seq Scan" in step]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to a throwaway SQLite file")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'query_plans.db'}"
+    from app.database import SessionLocal, engine, init_db
+    init_db()
+
+    failures = 0
+    db = SessionLocal()
+    try:
+        with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            for label, query, index in hot_queries(db):
+                sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                plan = explain(conn, sql)
+                problems = full_scans(conn.dialect.name, plan)
+                if index and not any(index in step for step in plan):
+                    problems.append(f"{index} not used")
+                failures += bool(problems)
+                print(f"{'❌' if problems else '✅'} {label}" + (f": {'; '.join(problems)}" if problems else ""))
+                if args.verbose or problems:
+                    for step in plan:
+                        print(f"      {step}")
+    finally:
+        db.close()
+
+    if failures:
+        print(f"{failures} hot queries are not index-backed")
+        sys.exit(1)
+    print("All hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
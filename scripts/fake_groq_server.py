@@ -0,0 +1,226 @@
+"""
+Fake Groq - a local OpenAI/Groq-compatible chat completions server for load tests
+
+Serves POST /openai/v1/chat/completions (plain and streaming) with:
+- log-normal time-to-first-token, then a steady token rate
+- injected 500s, 429s and hung requests at configurable rates
+- plan prompts answered with real plan JSON from the local plan engine, so the
+  parsing and persistence paths do the same work as with the real model
+
+Usage:
+    python scripts/fake_groq_server.py --port 8900 --ttft-median-ms 800 --tokens-per-second 250
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8900 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+
+from app.services import plan_engine  # noqa: E402
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_CHUNK = 3
+
+CHAT_SENTENCES = [
+    "Consistency beats intensity, so aim for steady sessions you can repeat every week.",
+    "Pair each meal with a protein source like dal, paneer, eggs or sprouts.",
+    "Keep a water bottle nearby and sip through the day.",
+    "On busy days a brisk 20-minute walk still counts.",
+    "Sleep 7-8 hours - recovery is when your muscles actually grow.",
+    "Warm up for five minutes before you load any exercise.",
+    "Track how you feel after workouts and adjust the intensity.",
+    "Small daily habits add up to big changes over a few months.",
+]
+
+PROFILE_PATTERNS = {
+    "age": r"Age:\s*(\d+)",
+    "weight": r"Weight:\s*([\d.]+)",
+    "fitness_level": r"Fitness Level:\s*(\w+)",
+    "fitness_goal": r"Goal:\s*(\w+)",
+    "workout_preference": r"Workout Location:\s*(\w+)",
+    "diet_preference": r"Diet Type:\s*(\w+)",
+}
+
+
+class FakeGroqConfig:
+    def __init__(self, args):
+        self.ttft_median = args.ttft_median_ms / 1000
+        self.ttft_sigma = args.ttft_sigma
+        self.tokens_per_second = args.tokens_per_second
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.hang_rate = args.hang_rate
+        self.hang_seconds = args.hang_seconds
+        self.random = random.Random(args.seed)
+
+    def time_to_first_token(self) -> float:
+        return self.ttft_median * math.exp(self.random.gauss(0, self.ttft_sigma))
+
+    def token_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+
+def _profile_from_prompt(text: str) -> dict:
+    profile = {}
+    for field, pattern in PROFILE_PATTERNS.items():
+        match = re.search(pattern, text)
+        if match:
+            profile[field] = match.group(1).lower()
+    return profile
+
+
+def _outline(plan: dict) -> dict:
+    if "weekly_schedule" in plan:
+        days = {day: {"focus": d.get("focus", "Workout"), "is_rest": bool(d.get("is_rest") or d.get("is_rest_day"))}
+                for day, d in plan["weekly_schedule"].items()}
+        return {"plan_title": "Weekly Plan", "plan_description": "Outline", "days": days}
+    days = {day: {"theme": (d.get("lunch") or {}).get("name", "Balanced Indian meals")}
+            for day, d in plan["weekly_meals"].items()}
+    return {"plan_title": "Meal Plan", "total_calories": plan.get("total_calories", 1800), "days": days}
+
+
+def completion_text(messages: list, max_tokens: int, rng: random.Random) -> str:
+    """Plan JSON for plan prompts (whole week, outline or just the requested days),
+    a short coaching reply otherwise"""
+    text = "\n".join(str(m.get("content") or "") for m in messages)
+    # Plan requests are told which JSON schema to return in the system message;
+    # chat personas only mention plans in prose ("workout and nutrition plans")
+    system = "\n".join(str(m.get("content") or "") for m in messages if m.get("role") == "system")
+    plan = None
+    if '"weekly_schedule"' in system or ('"days"' in system and '"is_rest"' in system):
+        plan = plan_engine.build_workout_plan(_profile_from_prompt(text))
+    elif '"weekly_meals"' in system or ('"days"' in system and '"theme"' in system):
+        plan = plan_engine.build_nutrition_plan(_profile_from_prompt(text))
+    if plan is not None:
+        requested = re.search(r"Regenerate only these days of the user's plan: ([A-Za-z, ]+)", text)
+        if requested:
+            container = "weekly_schedule" if "weekly_schedule" in plan else "weekly_meals"
+            days = [day.strip() for day in requested.group(1).split(",")]
+            return json.dumps({container: {day: plan[container][day] for day in days if day in plan[container]}})
+        if "short weekly outline" in text:
+            return json.dumps(_outline(plan))
+        return json.dumps(plan)
+    if "JSON" in text:
+        return json.dumps({
+            "insights": ["Steady progress this week"],
+            "recommendations": rng.sample(CHAT_SENTENCES, 3),
+            "motivational_message": rng.choice(CHAT_SENTENCES),
+        })
+    words = " ".join(rng.sample(CHAT_SENTENCES, 4)).split(" ")
+    return " ".join(words[: max(8, max_tokens * CHARS_PER_TOKEN // 6)])
+
+
+def _chunks(content: str):
+    size = TOKENS_PER_CHUNK * CHARS_PER_TOKEN
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+
+def create_app(config: FakeGroqConfig) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    stats = {"requests": 0, "streams": 0, "errors_500": 0, "errors_429": 0, "hangs": 0}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        roll = config.random.random()
+        if roll < config.error_rate:
+            stats["errors_500"] += 1
+            return JSONResponse({"error": {"message": "Injected server error", "type": "internal_error"}}, 500)
+        if roll < config.error_rate + config.rate_limit_rate:
+            stats["errors_429"] += 1
+            return JSONResponse(
+                {"error": {"message": "Injected rate limit", "type": "rate_limit_exceeded"}},
+                429,
+                headers={"retry-after": "1"},
+            )
+        if roll < config.error_rate + config.rate_limit_rate + config.hang_rate:
+            stats["hangs"] += 1
+            await asyncio.sleep(config.hang_seconds)
+
+        model = body.get("model", "llama-3.3-70b-versatile")
+        content = completion_text(body.get("messages", []), body.get("max_tokens") or 1024, config.random)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        ttft = config.time_to_first_token()
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft + config.token_delay(completion_tokens))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+
+        stats["streams"] += 1
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await asyncio.sleep(ttft)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in _chunks(content):
+                yield chunk({"content": piece})
+                await asyncio.sleep(config.token_delay(TOKENS_PER_CHUNK))
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-median-ms", type=float, default=800.0, help="median time to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.4, help="log-normal spread of time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="0 sends the whole reply at once")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with a 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction that stall before answering")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None, help="fix the latency/error sequence")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(FakeGroqConfig(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()